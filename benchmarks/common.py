@@ -0,0 +1,36 @@
+import os
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+
+# Добавляем корень проекта в путь Python
+sys.path.append(str(Path(__file__).parent.parent))
+
+def use_scratch_db(path: str = None) -> str:
+    """Направить приложение на отдельную базу до импорта database.connection.
+
+    Явный path важнее LINGUATUNE_DB_PATH; без обоих база создается во
+    временном каталоге.
+    """
+    if path:
+        os.environ["LINGUATUNE_DB_PATH"] = os.path.abspath(path)
+    elif "LINGUATUNE_DB_PATH" not in os.environ:
+        os.environ["LINGUATUNE_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    return os.environ["LINGUATUNE_DB_PATH"]
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+def latency_summary(latencies) -> dict:
+    """Задержки в миллисекундах: среднее, p50, p95, p99"""
+    if not latencies:
+        return {"mean": 0, "p50": 0, "p95": 0, "p99": 0}
+    return {
+        "mean": round(statistics.mean(latencies) * 1000, 2),
+        "p50": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99": round(percentile(latencies, 0.99) * 1000, 2)
+    }
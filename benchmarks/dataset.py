@@ -0,0 +1,258 @@
+"""Генератор синтетических данных для нагрузочных тестов.
+
+Заполняет отдельную базу SQLite: языки из набора base, исполнители,
+песни с текстами реального объема (1–4 КиБ), пользователи и история
+изученных песен. Результат воспроизводим: одинаковые параметры и seed
+дают одинаковую базу.
+
+    python -m benchmarks.dataset --songs 100000 --users 1000000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import use_scratch_db
+
+DEFAULTS = {
+    "songs": 20000,
+    "users": 50000,
+    "learned": 10,
+    "seed": 42
+}
+
+# Меняется вместе со схемой или с тем, какие таблицы заполняет генератор:
+# базу прежней версии с теми же параметрами нельзя переиспользовать
+DATASET_VERSION = 4
+
+# Постоянный путь по умолчанию: база переиспользуется между прогонами
+DEFAULT_DB = os.path.join(tempfile.gettempdir(), "linguatune_bench.db")
+
+# Пароль всех синтетических пользователей. scrypt для миллиона строк
+# считался бы часами, поэтому хэш вычисляется один раз и переиспользуется
+PASSWORD = "password"
+ADMIN_EMAIL = "admin@bench.linguatune"
+# Слов в "словаре" каждого языка
+DICTIONARY_WORDS = 1500
+# Пакет строк на один executemany
+CHUNK_ROWS = 10000
+
+SYLLABLES = {
+    "en": ["la", "love", "night", "heart", "dream", "fire", "sky", "way", "time", "rain", "light", "home"],
+    "es": ["co", "ra", "zón", "no", "che", "ma", "ri", "po", "sa", "vi", "da", "sol"],
+    "fr": ["mour", "nuit", "cœur", "ciel", "ré", "ve", "lu", "mi", "è", "re", "pa", "ri"],
+    "de": ["herz", "nacht", "lie", "be", "stern", "traum", "feu", "er", "welt", "zeit", "ge", "hen"],
+    "it": ["cuo", "re", "not", "te", "a", "mo", "ri", "so", "le", "ve", "ni", "ta"],
+    "ko": ["사", "랑", "밤", "하", "늘", "꿈", "별", "마", "음", "길", "빛", "비"],
+    "ja": ["あ", "い", "こ", "ろ", "よ", "る", "ゆ", "め", "そ", "ら", "ほ", "し"],
+    "ru": ["лю", "бовь", "ночь", "серд", "це", "не", "бо", "мечта", "звез", "да", "свет", "путь"]
+}
+TRANSLATION_SYLLABLES = ["лю", "бовь", "ночь", "серд", "це", "не", "бо", "свет", "путь", "до", "ро", "га"]
+DIFFICULTIES = ["beginner", "intermediate", "advanced"]
+GENRES = ["Pop", "Rock", "Folk", "Jazz", "Hip Hop", "Electronic", "Chanson", "Indie"]
+
+def _dictionary(rng: random.Random, syllables, size: int):
+    # Из 12 слогов по 1–4 получается ~22 тыс. разных слов, size должен быть меньше
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(syllables) for _ in range(rng.randint(1, 4))))
+    return sorted(words)
+
+def _lyrics(rng: random.Random, words) -> str:
+    # 20–60 строк по 4–9 слов: 1–4 КиБ, как у настоящих песен
+    return "\n".join(
+        " ".join(rng.choice(words) for _ in range(rng.randint(4, 9)))
+        for _ in range(rng.randint(20, 60))
+    )
+
+def _insert(connection, table, rows) -> int:
+    """executemany пачками по CHUNK_ROWS; rows — итератор словарей"""
+    total = 0
+    sql = None
+    chunk = []
+    for row in rows:
+        if sql is None:
+            columns = list(row)
+            sql = (
+                f"INSERT INTO {table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})"
+            )
+        chunk.append(tuple(row[column] for column in columns))
+        if len(chunk) >= CHUNK_ROWS:
+            connection.exec_driver_sql(sql, chunk)
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        connection.exec_driver_sql(sql, chunk)
+        total += len(chunk)
+    return total
+
+def generate_dataset(songs: int, users: int, learned: int, seed: int) -> dict:
+    """Заполнить базу из LINGUATUNE_DB_PATH (должна быть пустой)"""
+    from sqlmodel import Session, select
+    from database.connection import create_db_and_tables, engine
+    from database.content_packs import load_pack
+    from database.passwords import hash_password_sync
+    from database.stats import rebuild_stats
+    from database.vocabulary import rebuild_vocabulary_index
+    from database.reviews import backfill_reviews
+    from models.languages import Language
+
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    create_db_and_tables()
+
+    with Session(engine) as session:
+        load_pack(session, "base")
+        languages = session.exec(select(Language.id, Language.name, Language.code)).all()
+
+    dictionaries = {
+        code: _dictionary(rng, SYLLABLES.get(code, SYLLABLES["en"]), DICTIONARY_WORDS)
+        for _, _, code in languages
+    }
+    translation_words = _dictionary(rng, TRANSLATION_SYLLABLES, DICTIONARY_WORDS)
+    password_hash = hash_password_sync(PASSWORD)
+    now = datetime.now()
+
+    artist_count = max(1, songs // 20)
+    artists = [
+        (f"Bench Artist {number}", languages[number % len(languages)])
+        for number in range(artist_count)
+    ]
+
+    def artist_rows():
+        for name, (_, language_name, _) in artists:
+            yield {
+                "name": name,
+                "country": "Benchland",
+                "language": language_name,
+                "genres": json.dumps(rng.sample(GENRES, 2)),
+                "bio": " ".join(rng.choice(translation_words) for _ in range(30))
+            }
+
+    def song_rows():
+        for number in range(songs):
+            name, (language_id, language_name, code) = artists[number % artist_count]
+            words = dictionaries[code]
+            lyrics = _lyrics(rng, words)
+            yield {
+                "title": f"Bench Song {number}",
+                "artist": name,
+                "language": language_name,
+                "language_id": language_id,
+                "lyrics_original": lyrics,
+                "lyrics_translation": _lyrics(rng, translation_words),
+                "difficulty": rng.choice(DIFFICULTIES),
+                "vocabulary": json.dumps(rng.sample(words, rng.randint(5, 10)), ensure_ascii=False),
+                "duration": rng.randint(120, 360),
+                "genre": rng.choice(GENRES),
+                "year": rng.randint(1960, 2024)
+            }
+
+    def user_rows():
+        yield {
+            "email": ADMIN_EMAIL,
+            "password": password_hash,
+            "full_name": "Bench Admin",
+            "username": "bench_admin",
+            "current_language": languages[0][1]
+        }
+        for number in range(users):
+            yield {
+                "email": f"user{number}@bench.linguatune",
+                "password": password_hash,
+                "full_name": f"Bench User {number}",
+                "username": f"bench_user_{number}",
+                "current_language": languages[number % len(languages)][1]
+            }
+
+    with engine.begin() as connection:
+        # Скорость важнее надежности: базу всегда можно сгенерировать заново
+        connection.exec_driver_sql("PRAGMA synchronous=OFF")
+        first_song_id = (connection.exec_driver_sql("SELECT COALESCE(MAX(id), 0) FROM song").scalar() or 0) + 1
+        first_user_id = (connection.exec_driver_sql("SELECT COALESCE(MAX(id), 0) FROM user").scalar() or 0) + 1
+
+        counts = {
+            "artists": _insert(connection, "artist", artist_rows()),
+            "songs": _insert(connection, "song", song_rows()),
+            "users": _insert(connection, "user", user_rows())
+        }
+        connection.exec_driver_sql(
+            "INSERT INTO admin (user_email, role, permissions, created_at) VALUES (?, ?, ?, ?)",
+            (ADMIN_EMAIL, "superadmin", json.dumps({
+                "manage_users": True, "manage_content": True, "view_stats": True, "backup": True
+            }), now.isoformat(" "))
+        )
+
+        song_ids = range(first_song_id, first_song_id + songs)
+
+        def progress_rows():
+            # Пропускаем администратора (первый пользователь)
+            for user_id in range(first_user_id + 1, first_user_id + 1 + users):
+                count = min(songs, rng.randint(0, learned * 2))
+                for song_id in rng.sample(song_ids, count):
+                    learned_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+                    yield {"user_id": user_id, "song_id": song_id, "learned_at": learned_at.isoformat(" ")}
+
+        counts["learned_songs"] = _insert(connection, "user_song_progress", progress_rows())
+
+    with Session(engine) as session:
+        rebuild_stats(session)
+        counts["vocabulary_rows"] = rebuild_vocabulary_index(session)
+        # Карточки повторения строятся по словарному индексу
+        counts["review_items"] = backfill_reviews(session)
+        session.commit()
+
+    counts["seconds"] = round(time.perf_counter() - started, 1)
+    return counts
+
+def dataset_params(args) -> dict:
+    return {name: getattr(args, name) for name in DEFAULTS}
+
+def ensure_dataset(db_path: str, params: dict, reuse: bool = True) -> dict:
+    """Сгенерировать базу или переиспользовать готовую с теми же параметрами.
+
+    Параметры лежат рядом с базой в <db>.json.
+    """
+    meta_path = f"{db_path}.json"
+    if reuse and os.path.exists(db_path) and os.path.exists(meta_path):
+        with open(meta_path) as file:
+            meta = json.load(file)
+        if meta.get("params") == params and meta.get("version") == DATASET_VERSION:
+            meta["reused"] = True
+            return meta
+
+    for suffix in ("", "-wal", "-shm", ".json"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+    meta = {"version": DATASET_VERSION, "params": params, "counts": generate_dataset(**params)}
+    with open(meta_path, "w") as file:
+        json.dump(meta, file, indent=2)
+    meta["reused"] = False
+    return meta
+
+def add_dataset_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--db", default=DEFAULT_DB, help="Путь к эталонной базе")
+    parser.add_argument("--songs", type=int, default=DEFAULTS["songs"])
+    parser.add_argument("--users", type=int, default=DEFAULTS["users"])
+    parser.add_argument("--learned", type=int, default=DEFAULTS["learned"],
+                        help="Среднее число изученных песен на пользователя")
+    parser.add_argument("--seed", type=int, default=DEFAULTS["seed"])
+    parser.add_argument("--regenerate", action="store_true",
+                        help="Пересоздать базу, даже если параметры совпадают")
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Синтетические данные для нагрузочных тестов")
+    add_dataset_arguments(parser)
+    args = parser.parse_args()
+
+    db_path = use_scratch_db(args.db)
+    meta = ensure_dataset(db_path, dataset_params(args), reuse=not args.regenerate)
+    print(json.dumps({"db": db_path, **meta}, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,80 @@
+"""Нагрузочный тест входа: POST /auth/signin через ASGI без сети.
+
+Создает временную базу с пользователями (scrypt-хэши), запускает
+параллельные входы и печатает пропускную способность, задержки и
+состояние пула хэширования. Требуется httpx.
+
+    python -m benchmarks.login --users 50 --requests 400 --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import use_scratch_db, latency_summary
+
+async def run(args):
+    import httpx
+    from sqlmodel import Session
+    from database.connection import create_db_and_tables, engine
+    from database.passwords import hash_password_sync, password_pool_stats
+    from models.users import User
+    import main
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        for number in range(args.users):
+            session.add(User(
+                email=f"bench{number}@linguatune.com",
+                password=hash_password_sync(f"password{number}")
+            ))
+        session.commit()
+
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(args.concurrency)
+    transport = httpx.ASGITransport(app=main.app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login(number):
+            nonlocal errors
+            user = number % args.users
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/auth/signin", json={
+                    "email": f"bench{user}@linguatune.com",
+                    "password": f"password{user}"
+                })
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(login(number) for number in range(args.requests)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "logins_per_second": round(args.requests / elapsed, 1),
+        "latency_ms": latency_summary(latencies),
+        "password_pool": password_pool_stats()
+    }
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест входа")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    # Отдельная временная база, если путь не задан явно
+    use_scratch_db()
+
+    result = asyncio.run(run(args))
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,486 @@
+"""Нагрузочный прогон всех маршрутов приложения через ASGI без сети.
+
+Генерирует (или переиспользует) эталонную синтетическую базу и работает
+с ее свежей копией, поэтому записи одного прогона не влияют на следующий.
+Для каждого сценария выполняет --requests запросов с параллельностью
+--concurrency и печатает JSON: пропускная способность и задержки
+p50/p95/p99 по каждому эндпоинту. С --baseline добавляет сравнение.
+
+    python -m benchmarks.run --requests 200 --concurrency 16
+    python -m benchmarks.run --output new.json --baseline old.json
+"""
+import argparse
+import asyncio
+import fnmatch
+import itertools
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.common import use_scratch_db, latency_summary
+from benchmarks.dataset import PASSWORD, ADMIN_EMAIL, DEFAULTS, add_dataset_arguments
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# scrypt-эндпоинты (вход, регистрация, смена пароля) получают меньше запросов
+HEAVY_FRACTION = 0.1
+BULK_SONGS_PER_REQUEST = 100
+# Пользователи с заранее выбранными карточками и размер пачки ответов
+REVIEW_USERS = 200
+REVIEW_ANSWERS_PER_REQUEST = 20
+
+class Scenario:
+    """Один эндпоинт: как построить i-й запрос и какие статусы считать успехом"""
+
+    def __init__(self, name, build, client="anon", expect=(200,), heavy=False):
+        self.name = name
+        self.build = build
+        self.client = client
+        self.expect = expect
+        self.heavy = heavy
+
+# ========== ДАННЫЕ ДЛЯ ЗАПРОСОВ ==========
+class Context:
+    """Образцы ID, слов и email из сгенерированной базы"""
+
+    def __init__(self, seed: int, reserved_users: int):
+        from sqlmodel import Session, select, func
+        from database.connection import engine
+        from models.songs import Song
+        from models.languages import Language
+        from models.vocabulary import SongVocabulary
+
+        self.rng = random.Random(seed)
+        self.run_id = int(time.time())
+        self.counter = itertools.count()
+        # ID, созданные сценариями записи, для последующих PUT/DELETE
+        self.created = {
+            "music_song": [], "admin_song": [], "admin_language": [], "admin_user": [], "learned": []
+        }
+
+        with Session(engine) as session:
+            max_song = session.exec(select(func.max(Song.id))).one()
+            self.song_ids = [self.rng.randint(1, max_song) for _ in range(1000)]
+            self.languages = session.exec(select(Language.id, Language.name, Language.code)).all()
+            self.words = session.exec(
+                select(SongVocabulary.word_key).distinct().limit(500)
+            ).all()
+        # Последние пользователи набора отданы сценариям назначения админом
+        # и удаления, остальные сценарии их не трогают
+        total_users = self._user_count()
+        reserved = min(total_users // 2, reserved_users)
+        self.user_count = total_users - reserved
+        self.reserved_users = self._user_ids(self.user_count, reserved)
+        self.review_batches = self._review_batches(REVIEW_USERS)
+
+    def _user_count(self) -> int:
+        from sqlmodel import Session, select, func
+        from database.connection import engine
+        from models.users import User
+
+        with Session(engine) as session:
+            return session.exec(
+                select(func.count()).select_from(User).where(User.email.like("user%@bench.linguatune"))
+            ).one()
+
+    def _user_ids(self, first: int, count: int) -> list:
+        from sqlmodel import Session, select
+        from database.connection import engine
+        from models.users import User
+
+        emails = [f"user{number}@bench.linguatune" for number in range(first, first + count)]
+        with Session(engine) as session:
+            return list(session.exec(select(User.id).where(User.email.in_(emails))).all())
+
+    def _review_batches(self, count: int) -> list:
+        """(email, ID карточек) случайных пользователей для пачек ответов"""
+        from sqlmodel import Session, select
+        from database.connection import engine
+        from models.users import User
+        from models.reviews import VocabularyReview
+
+        emails = [f"user{self.rng.randrange(self.user_count)}@bench.linguatune" for _ in range(count)]
+        with Session(engine) as session:
+            rows = session.exec(
+                select(User.email, VocabularyReview.id)
+                .join(VocabularyReview, VocabularyReview.user_id == User.id)
+                .where(User.email.in_(emails))
+            ).all()
+        review_ids = {}
+        for email, review_id in rows:
+            review_ids.setdefault(email, []).append(review_id)
+        return [(email, ids[:REVIEW_ANSWERS_PER_REQUEST]) for email, ids in review_ids.items()]
+
+    def song_id(self) -> int:
+        return self.rng.choice(self.song_ids)
+
+    def language(self):
+        return self.rng.choice(self.languages)
+
+    def word(self) -> str:
+        return self.rng.choice(self.words)
+
+    def user_email(self) -> str:
+        return f"user{self.rng.randrange(self.user_count)}@bench.linguatune"
+
+    def unique(self, prefix: str) -> str:
+        return f"{prefix}-{self.run_id}-{next(self.counter)}"
+
+    def song_payload(self, title: str) -> dict:
+        _, name, _ = self.language()
+        return {
+            "title": title,
+            "artist": "Bench Runner",
+            "language": name,
+            "lyrics_original": "la la la\n" * 30,
+            "lyrics_translation": "ля ля ля\n" * 30,
+            "difficulty": "beginner",
+            "vocabulary": [self.word() for _ in range(5)],
+            "duration": 200
+        }
+
+    def pop(self, kind: str):
+        return self.created[kind].pop() if self.created[kind] else 0
+
+    def reserved_user(self) -> int:
+        return self.reserved_users.pop() if self.reserved_users else 0
+
+    def learned_pair(self):
+        if self.created["learned"]:
+            return self.created["learned"].pop()
+        return self.user_email(), self.song_id()
+
+def _bulk_body(ctx: Context) -> bytes:
+    return "\n".join(
+        json.dumps(ctx.song_payload(ctx.unique("bulk")), ensure_ascii=False)
+        for _ in range(BULK_SONGS_PER_REQUEST)
+    ).encode()
+
+def _review_answers(ctx: Context):
+    email, ids = ctx.rng.choice(ctx.review_batches)
+    answers = [{"id": review_id, "quality": ctx.rng.randint(0, 5)} for review_id in ids]
+    return "POST", f"/progress/user/{email}/reviews", {"json": {"answers": answers}}
+
+# ========== СЦЕНАРИИ ==========
+# Порядок важен: PUT/DELETE используют ID, созданные предыдущими POST
+SCENARIOS = [
+    # --- HTML-страницы (main.py) ---
+    Scenario("GET /", lambda ctx: ("GET", "/", {}), client="user"),
+    Scenario("GET /register", lambda ctx: ("GET", "/register", {})),
+    Scenario("GET /login", lambda ctx: ("GET", "/login", {})),
+    Scenario("GET /forgot-password", lambda ctx: ("GET", "/forgot-password", {})),
+    Scenario("GET /simple-profile", lambda ctx: ("GET", "/simple-profile", {}), expect=(301,)),
+    Scenario("GET /reset-password/{token}", lambda ctx: ("GET", "/reset-password/old", {}), expect=(301,)),
+    Scenario("GET /profile", lambda ctx: ("GET", "/profile", {}), client="user"),
+    Scenario("POST /profile/update", lambda ctx: (
+        "POST", "/profile/update", {"data": {"full_name": "Bench User", "current_language": ctx.language()[1]}}
+    ), client="user", expect=(303,)),
+    Scenario("GET /change-password", lambda ctx: ("GET", "/change-password", {}), client="user"),
+    Scenario("POST /change-password", lambda ctx: (
+        "POST", "/change-password",
+        {"data": {"current_password": PASSWORD, "new_password": PASSWORD, "confirm_password": PASSWORD}}
+    ), client="user", heavy=True),
+    Scenario("POST /auth/password/reset/request-web", lambda ctx: (
+        "POST", "/auth/password/reset/request-web",
+        {"data": {"email": ctx.user_email(), "new_password": PASSWORD, "confirm_password": PASSWORD}}
+    ), heavy=True),
+    Scenario("GET /auth/signup", lambda ctx: (
+        "GET", "/auth/signup", {"params": {"email": ctx.unique("web") + "@bench.signup", "password": PASSWORD}}
+    ), expect=(303,), heavy=True),
+    Scenario("GET /auth/signin", lambda ctx: (
+        "GET", "/auth/signin", {"params": {"email": ctx.user_email(), "password": PASSWORD}}
+    ), expect=(303,), heavy=True),
+    Scenario("GET /logout", lambda ctx: ("GET", "/logout", {}), expect=(303,)),
+    Scenario("GET /songs", lambda ctx: ("GET", "/songs", {}), client="user"),
+    Scenario("GET /songs?after", lambda ctx: ("GET", "/songs", {"params": {"after": ctx.song_id()}}), client="user"),
+    Scenario("GET /song/{id}", lambda ctx: ("GET", f"/song/{ctx.song_id()}", {}), client="user"),
+    Scenario("GET /languages", lambda ctx: ("GET", "/languages", {}), client="user"),
+    Scenario("GET /progress", lambda ctx: ("GET", "/progress", {}), client="user"),
+    Scenario("GET /songs/{language}", lambda ctx: ("GET", f"/songs/{ctx.language()[1]}", {}), client="user"),
+    Scenario("GET /learn/{id}", lambda ctx: ("GET", f"/learn/{ctx.song_id()}", {}), client="user", expect=(303,)),
+    Scenario("GET /admin/dashboard", lambda ctx: ("GET", "/admin/dashboard", {}), client="admin"),
+    Scenario("GET /metrics", lambda ctx: ("GET", "/metrics", {})),
+
+    # --- /auth ---
+    Scenario("POST /auth/signup", lambda ctx: (
+        "POST", "/auth/signup", {"json": {"email": ctx.unique("api") + "@bench.signup", "password": PASSWORD}}
+    ), heavy=True),
+    Scenario("POST /auth/signin", lambda ctx: (
+        "POST", "/auth/signin", {"json": {"email": ctx.user_email(), "password": PASSWORD}}
+    ), heavy=True),
+    Scenario("POST /auth/password/change", lambda ctx: (
+        "POST", "/auth/password/change",
+        {"params": {"email": ctx.user_email()}, "json": {"current_password": PASSWORD, "new_password": PASSWORD}}
+    ), heavy=True),
+    Scenario("GET /auth/user/{email}", lambda ctx: ("GET", f"/auth/user/{ctx.user_email()}", {})),
+    Scenario("PUT /auth/user/{email}", lambda ctx: (
+        "PUT", f"/auth/user/{ctx.user_email()}", {"json": {"full_name": "Bench User"}}
+    )),
+
+    # --- /languages ---
+    Scenario("GET /languages/", lambda ctx: ("GET", "/languages/", {})),
+    Scenario("GET /languages/id/{id}", lambda ctx: ("GET", f"/languages/id/{ctx.language()[0]}", {})),
+
+    # --- /music ---
+    Scenario("GET /music/songs", lambda ctx: ("GET", "/music/songs", {})),
+    Scenario("GET /music/songs?after", lambda ctx: ("GET", "/music/songs", {"params": {"after": ctx.song_id()}})),
+    Scenario("GET /music/search", lambda ctx: ("GET", "/music/search", {"params": {"q": ctx.word()}})),
+    Scenario("GET /music/vocabulary", lambda ctx: ("GET", "/music/vocabulary", {"params": {"prefix": ctx.word()[:2]}})),
+    Scenario("GET /music/vocabulary/{word}", lambda ctx: ("GET", f"/music/vocabulary/{ctx.word()}", {})),
+    Scenario("GET /music/songs/{language}", lambda ctx: ("GET", f"/music/songs/{ctx.language()[1]}", {})),
+    Scenario("GET /music/artists", lambda ctx: ("GET", "/music/artists", {})),
+    Scenario("POST /music/song", lambda ctx: (
+        "POST", "/music/song", {"json": ctx.song_payload(ctx.unique("music"))}
+    )),
+    Scenario("PUT /music/song/{id}", lambda ctx: (
+        "PUT", f"/music/song/{ctx.rng.choice(ctx.created['music_song'] or [0])}",
+        {"json": {"difficulty": "advanced", "duration": 210}}
+    )),
+    Scenario("DELETE /music/song/{id}", lambda ctx: ("DELETE", f"/music/song/{ctx.pop('music_song')}", {})),
+
+    # --- /progress ---
+    Scenario("POST /progress/user/{email}/learned/{id}", lambda ctx: (
+        "POST", f"/progress/user/{ctx.user_email()}/learned/{ctx.song_id()}", {}
+    )),
+    Scenario("DELETE /progress/user/{email}/learned/{id}", lambda ctx: (
+        "DELETE", "/progress/user/{}/learned/{}".format(*ctx.learned_pair()), {}
+    )),
+    Scenario("GET /progress/user/{email}", lambda ctx: ("GET", f"/progress/user/{ctx.user_email()}", {})),
+    Scenario("GET /progress/user/{email}/learned", lambda ctx: (
+        "GET", f"/progress/user/{ctx.user_email()}/learned", {}
+    )),
+    Scenario("GET /progress/user/{email}/recommendations", lambda ctx: (
+        "GET", f"/progress/user/{ctx.user_email()}/recommendations", {}
+    )),
+    Scenario("GET /progress/user/{email}/reviews/due", lambda ctx: (
+        "GET", f"/progress/user/{ctx.user_email()}/reviews/due", {}
+    )),
+    Scenario("POST /progress/user/{email}/reviews", lambda ctx: _review_answers(ctx)),
+    Scenario("GET /progress/stats/overall", lambda ctx: ("GET", "/progress/stats/overall", {})),
+
+    # --- /admin ---
+    Scenario("POST /admin/language", lambda ctx: (
+        "POST", "/admin/language", {"json": {"name": ctx.unique("lang"), "code": ctx.unique("c")}}
+    ), client="admin"),
+    Scenario("DELETE /admin/language/{id}", lambda ctx: (
+        "DELETE", f"/admin/language/{ctx.pop('admin_language')}", {}
+    ), client="admin"),
+    Scenario("POST /admin/song", lambda ctx: (
+        "POST", "/admin/song", {"json": ctx.song_payload(ctx.unique("admin"))}
+    ), client="admin"),
+    Scenario("PUT /admin/song/{id}", lambda ctx: (
+        "PUT", f"/admin/song/{ctx.rng.choice(ctx.created['admin_song'] or [0])}",
+        {"json": ctx.song_payload(ctx.unique("admin-upd"))}
+    ), client="admin"),
+    Scenario("DELETE /admin/song/{id}", lambda ctx: ("DELETE", f"/admin/song/{ctx.pop('admin_song')}", {}), client="admin"),
+    Scenario("POST /admin/songs/bulk", lambda ctx: (
+        "POST", "/admin/songs/bulk",
+        {"content": _bulk_body(ctx), "headers": {"content-type": "application/x-ndjson"}}
+    ), client="admin"),
+    Scenario("GET /admin/users", lambda ctx: ("GET", "/admin/users", {}), client="admin"),
+    Scenario("PUT /admin/user/{id}/admin", lambda ctx: (
+        "PUT", f"/admin/user/{ctx.reserved_user()}/admin", {}
+    ), client="admin"),
+    Scenario("DELETE /admin/user/{id}", lambda ctx: ("DELETE", f"/admin/user/{ctx.pop('admin_user')}", {}), client="admin"),
+    Scenario("GET /admin/stats", lambda ctx: ("GET", "/admin/stats", {}), client="admin"),
+]
+
+def _remember_created(ctx: Context, scenario: Scenario, request_url: str, response):
+    """ID из ответов нужны следующим сценариям (PUT, DELETE)"""
+    if response.status_code != 200:
+        return
+    if scenario.name == "POST /music/song":
+        ctx.created["music_song"].append(response.json()["song"]["id"])
+    elif scenario.name == "POST /admin/song":
+        ctx.created["admin_song"].append(response.json()["song"]["id"])
+    elif scenario.name == "POST /admin/language":
+        ctx.created["admin_language"].append(response.json()["language"]["id"])
+    elif scenario.name == "PUT /admin/user/{id}/admin":
+        ctx.created["admin_user"].append(int(request_url.split("/")[3]))
+    elif scenario.name == "POST /progress/user/{email}/learned/{id}":
+        _, _, _, email, _, song_id = request_url.split("/")
+        ctx.created["learned"].append((email, int(song_id)))
+
+# ========== ПРОГОН ==========
+async def run_scenario(scenario: Scenario, clients: dict, ctx: Context, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    statuses = {}
+    errors = 0
+    client = clients[scenario.client]
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            method, url, kwargs = scenario.build(ctx)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                status = response.status_code
+            except Exception as e:  # noqa: BLE001 - ошибка приложения считается ответом 500
+                print(f"❌ {scenario.name}: {e!r}")
+                response, status = None, 500
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+            if status not in scenario.expect:
+                errors += 1
+            elif response is not None:
+                _remember_created(ctx, scenario, url.split("?")[0], response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "errors": errors,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "requests_per_second": round(requests / elapsed, 1) if elapsed else 0,
+        "latency_ms": latency_summary(latencies)
+    }
+
+async def run(args) -> dict:
+    import httpx
+    import main
+
+    ctx = Context(args.seed, reserved_users=args.requests)
+    transport = httpx.ASGITransport(app=main.app)
+    clients = {
+        "anon": httpx.AsyncClient(transport=transport, base_url="http://bench"),
+        "user": httpx.AsyncClient(transport=transport, base_url="http://bench"),
+        "admin": httpx.AsyncClient(transport=transport, base_url="http://bench")
+    }
+    # Вошедшие пользователь и администратор: сессия нужна страницам и /admin
+    for name, email in (("user", "user0@bench.linguatune"), ("admin", ADMIN_EMAIL)):
+        response = await clients[name].get("/auth/signin", params={"email": email, "password": PASSWORD})
+        if response.status_code != 303:
+            raise RuntimeError(f"Не удалось войти ({email}): {response.status_code}")
+    # Прогрев: первая загрузка снимка каталога и сборка матрицы
+    # рекомендаций не должны попасть в замеры
+    await clients["anon"].get("/music/songs")
+    await clients["anon"].get("/progress/user/user0@bench.linguatune/recommendations")
+
+    results = {}
+    try:
+        for scenario in SCENARIOS:
+            if args.only and not any(fnmatch.fnmatch(scenario.name, pattern) for pattern in args.only):
+                continue
+            requests = args.requests
+            if scenario.heavy:
+                requests = max(1, int(requests * HEAVY_FRACTION))
+            if scenario.name == "POST /admin/songs/bulk":
+                requests = max(1, requests // BULK_SONGS_PER_REQUEST)
+            results[scenario.name] = await run_scenario(scenario, clients, ctx, requests, args.concurrency)
+            summary = results[scenario.name]
+            print(
+                f"⏱️ {scenario.name}: {summary['requests_per_second']} req/s, "
+                f"p95 {summary['latency_ms']['p95']} ms, ошибок {summary['errors']}",
+                flush=True
+            )
+    finally:
+        for client in clients.values():
+            await client.aclose()
+    return results
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+def compare(results: dict, baseline: dict) -> dict:
+    """Изменение (в %) пропускной способности и задержек относительно baseline"""
+    def change(new, old):
+        return round((new - old) / old * 100, 1) if old else None
+
+    diff = {}
+    for name, result in results.items():
+        old = baseline.get("endpoints", {}).get(name)
+        if not old:
+            continue
+        diff[name] = {
+            "requests_per_second": change(result["requests_per_second"], old["requests_per_second"]),
+            **{
+                key: change(result["latency_ms"][key], old["latency_ms"][key])
+                for key in ("p50", "p95", "p99")
+            }
+        }
+    return diff
+
+def prepare_database(args) -> dict:
+    """Эталонная база (в отдельном процессе) и ее рабочая копия для прогона.
+
+    Движок создается при импорте database.connection, поэтому генерация
+    идет в подпроцессе, а этот процесс сразу открывает копию.
+    """
+    reference = os.path.abspath(args.db)
+    command = [sys.executable, "-m", "benchmarks.dataset", "--db", reference]
+    for name in DEFAULTS:
+        command += [f"--{name}", str(getattr(args, name))]
+    if args.regenerate:
+        command.append("--regenerate")
+    subprocess.run(command, cwd=PROJECT_ROOT, check=True, stdout=subprocess.DEVNULL)
+    with open(f"{reference}.json") as file:
+        dataset = json.load(file)
+
+    working = f"{reference}.run"
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(working + suffix):
+            os.remove(working + suffix)
+    source = sqlite3.connect(reference)
+    target = sqlite3.connect(working)
+    source.backup(target)
+    source.close()
+    target.close()
+
+    use_scratch_db(working)
+    return dataset
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Нагрузочный прогон всех маршрутов")
+    add_dataset_arguments(parser)
+    parser.add_argument("--requests", type=int, default=200, help="Запросов на эндпоинт")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--only", action="append", help="Шаблон имени сценария, например 'GET /music/*'")
+    parser.add_argument("--output", help="Куда сохранить JSON с результатами")
+    parser.add_argument("--baseline", help="JSON прошлого прогона для сравнения")
+    args = parser.parse_args()
+
+    dataset = prepare_database(args)
+
+    started = time.perf_counter()
+    endpoints = asyncio.run(run(args))
+    report = {
+        "meta": {
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "dataset": dataset,
+            "seconds": round(time.perf_counter() - started, 1)
+        },
+        "endpoints": endpoints
+    }
+    if args.baseline:
+        with open(args.baseline) as file:
+            report["diff_percent"] = compare(endpoints, json.load(file))
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    print(text)
+
+if __name__ == "__main__":
+    main_cli()
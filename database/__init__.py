@@ -1,3 +1,9 @@
-from .connection import engine, create_db_and_tables, get_session
+from .connection import (
+    engine, async_engine, async_read_engine, create_db_and_tables,
+    get_session, get_async_session, get_async_read_session
+)
 
-__all__ = ["engine", "create_db_and_tables", "get_session"]
+__all__ = [
+    "engine", "async_engine", "async_read_engine", "create_db_and_tables",
+    "get_session", "get_async_session", "get_async_read_session"
+]
\ No newline at end of file
@@ -0,0 +1,95 @@
+import os
+import time
+from collections import OrderedDict
+from typing import FrozenSet, Optional
+
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models.admins import Admin
+from models.users import User
+
+# Права администратора (ключи Admin.permissions)
+MANAGE_USERS = "manage_users"
+MANAGE_CONTENT = "manage_content"
+VIEW_STATS = "view_stats"
+BACKUP = "backup"
+
+# Сколько секунд доверять кэшу. Назначение админом в этом процессе
+# сбрасывает запись сразу, TTL ограничивает устаревание между процессами.
+ADMIN_CACHE_TTL = float(os.getenv("LINGUATUNE_ADMIN_CACHE_TTL", "60"))
+# Кэшируются и отрицательные ответы ("не админ"), поэтому размер ограничен
+ADMIN_CACHE_MAX_ENTRIES = 1024
+
+class AdminPrincipal:
+    """Администратор с уже разобранным набором прав"""
+    __slots__ = ("user_id", "email", "role", "permissions")
+
+    def __init__(self, user_id: int, email: str, role: str, permissions: FrozenSet[str]):
+        self.user_id = user_id
+        self.email = email
+        self.role = role
+        self.permissions = permissions
+
+    def has(self, permission: str) -> bool:
+        return permission in self.permissions
+
+def _principal_from_admin(user_id: int, admin: Admin) -> AdminPrincipal:
+    permissions = frozenset(
+        name for name, allowed in (admin.permissions or {}).items() if allowed
+    )
+    return AdminPrincipal(user_id, admin.user_email, admin.role, permissions)
+
+# ID пользователя -> (время загрузки, AdminPrincipal или None)
+_principals = OrderedDict()
+# Растет при каждой инвалидации: ответ, прочитанный до нее, не кэшируем
+_generation = 0
+_cache_counters = {"hits": 0, "misses": 0}
+
+def invalidate_admin(user_id: Optional[int] = None):
+    """Сбросить кэш для одного пользователя (или целиком). Вызывать после commit"""
+    global _generation
+    _generation += 1
+    if user_id is None:
+        _principals.clear()
+    else:
+        _principals.pop(user_id, None)
+
+def load_admin_principal(session: Session, user_id: int) -> Optional[AdminPrincipal]:
+    admin = session.exec(
+        select(Admin).join(User, User.email == Admin.user_email).where(User.id == user_id)
+    ).first()
+    return _principal_from_admin(user_id, admin) if admin else None
+
+async def get_admin_principal(
+    session: AsyncSession,
+    user_id: Optional[int],
+    fresh: bool = False
+) -> Optional[AdminPrincipal]:
+    """Права вошедшего пользователя; при попадании в кэш база не читается.
+
+    fresh=True — всегда читать базу (права, отозванные в другом воркере,
+    не действуют даже в пределах ADMIN_CACHE_TTL).
+    """
+    if user_id is None:
+        return None
+
+    cached = None if fresh else _principals.get(user_id)
+    if cached is not None and time.monotonic() - cached[0] < ADMIN_CACHE_TTL:
+        _principals.move_to_end(user_id)
+        _cache_counters["hits"] += 1
+        return cached[1]
+
+    _cache_counters["misses"] += 1
+    generation = _generation
+    principal = await session.run_sync(load_admin_principal, user_id)
+    if generation != _generation:
+        return principal
+    _principals[user_id] = (time.monotonic(), principal)
+    _principals.move_to_end(user_id)
+    while len(_principals) > ADMIN_CACHE_MAX_ENTRIES:
+        _principals.popitem(last=False)
+    return principal
+
+def principal_cache_stats() -> dict:
+    return {"entries": len(_principals), **_cache_counters}
@@ -0,0 +1,276 @@
+"""Резервные копии базы через online backup API SQLite.
+
+Копирование идет шагами по BACKUP_PAGES_PER_STEP страниц с паузой между
+шагами, поэтому приложение продолжает читать и писать. Просто скопировать
+файл linguatune.db на ходу нельзя: копия может оказаться несогласованной
+(часть изменений еще лежит в -wal).
+
+    python database/backup.py create [--gzip]
+    python database/backup.py list
+    python database/backup.py restore linguatune-20250101-120000-123456.db.gz
+"""
+import argparse
+import gzip
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Добавляем родительскую директорию в путь Python
+current_dir = Path(__file__).parent
+project_root = current_dir.parent
+sys.path.append(str(project_root))
+
+from database.connection import BASE_DIR, DB_PATH, SQLITE_PRAGMAS, _env_bool, _env_int
+
+# ========== НАСТРОЙКИ ==========
+BACKUP_DIR = os.getenv("LINGUATUNE_BACKUP_DIR", f"{BASE_DIR}/backups")
+# Сколько последних копий хранить (старые удаляются после новой копии)
+BACKUP_KEEP = _env_int("LINGUATUNE_BACKUP_KEEP", 7)
+BACKUP_COMPRESS = _env_bool("LINGUATUNE_BACKUP_COMPRESS", True)
+# Страниц за шаг и пауза между шагами: в паузе работают писатели
+BACKUP_PAGES_PER_STEP = _env_int("LINGUATUNE_BACKUP_PAGES_PER_STEP", 1024)
+BACKUP_STEP_PAUSE_MS = _env_int("LINGUATUNE_BACKUP_STEP_PAUSE_MS", 5)
+# Запись в базу другим соединением начинает пошаговое копирование заново.
+# После стольких перезапусков копируем за один шаг: в режиме WAL это
+# одна читающая транзакция, писателей она не останавливает.
+BACKUP_MAX_RESTARTS = 3
+
+BACKUP_PREFIX = "linguatune-"
+BACKUP_NAME_ATTEMPTS = 10
+BACKUP_SUFFIXES = (".db", ".db.gz")
+
+# Одновременно идет только одно копирование или восстановление
+_backup_lock = threading.Lock()
+
+class BackupBusyError(RuntimeError):
+    pass
+
+class _TooManyRestarts(Exception):
+    pass
+
+# ========== КОПИРОВАНИЕ ==========
+def _connect(path: str) -> sqlite3.Connection:
+    connection = sqlite3.connect(path)
+    connection.execute(f"PRAGMA busy_timeout={SQLITE_PRAGMAS['busy_timeout']}")
+    return connection
+
+def _copy_stepwise(source: sqlite3.Connection, target: sqlite3.Connection) -> int:
+    """Пошаговая копия; возвращает число перезапусков"""
+    restarts = 0
+    remaining_before = None
+
+    def progress(status, remaining, total):
+        nonlocal restarts, remaining_before
+        if remaining_before is not None and remaining > remaining_before:
+            restarts += 1
+            if restarts > BACKUP_MAX_RESTARTS:
+                raise _TooManyRestarts()
+        remaining_before = remaining
+        # Отдаем базу остальным соединениям между шагами
+        time.sleep(BACKUP_STEP_PAUSE_MS / 1000)
+
+    try:
+        source.backup(target, pages=BACKUP_PAGES_PER_STEP, progress=progress)
+    except _TooManyRestarts:
+        source.backup(target, pages=-1)
+    return restarts
+
+def _check_database(path: str):
+    connection = sqlite3.connect(path)
+    try:
+        result = connection.execute("PRAGMA quick_check").fetchone()[0]
+    finally:
+        connection.close()
+    if result != "ok":
+        raise ValueError(f"Копия повреждена: {result}")
+
+def _backup_name(compress: bool) -> str:
+    # Микросекунды: копия и страховочная копия при восстановлении
+    # в ту же секунду не должны совпасть по имени
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    return f"{BACKUP_PREFIX}{stamp}{'.db.gz' if compress else '.db'}"
+
+def _publish_backup(temp_path: str, compress: bool) -> str:
+    """Дать готовому файлу уникальное имя копии; существующие не перезаписываются"""
+    for _ in range(BACKUP_NAME_ATTEMPTS):
+        name = _backup_name(compress)
+        try:
+            # os.link, в отличие от os.replace, не заменяет существующий файл
+            os.link(temp_path, os.path.join(BACKUP_DIR, name))
+        except FileExistsError:
+            continue
+        return name
+    raise FileExistsError("Не удалось подобрать свободное имя для резервной копии")
+
+def create_backup(compress: bool = BACKUP_COMPRESS, keep: int = BACKUP_KEEP) -> dict:
+    """Снять копию базы в BACKUP_DIR и удалить лишние старые копии.
+
+    Выполняется синхронно: из обработчиков запросов — только в потоке.
+    """
+    if not _backup_lock.acquire(blocking=False):
+        raise BackupBusyError("Резервное копирование уже выполняется")
+    try:
+        return _create_backup(compress, keep)
+    finally:
+        _backup_lock.release()
+
+def _create_backup(compress: bool, keep: int) -> dict:
+    started = time.perf_counter()
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+
+    # Пишем во временные файлы рядом: неполная копия не попадет в список
+    fd, temp_path = tempfile.mkstemp(prefix=".partial-", suffix=".db", dir=BACKUP_DIR)
+    os.close(fd)
+    packed_path = temp_path + ".gz"
+    try:
+        source = _connect(DB_PATH)
+        target = sqlite3.connect(temp_path)
+        try:
+            restarts = _copy_stepwise(source, target)
+        finally:
+            target.close()
+            source.close()
+        _check_database(temp_path)
+
+        if compress:
+            with open(temp_path, "rb") as raw, gzip.open(packed_path, "wb", compresslevel=6) as packed:
+                shutil.copyfileobj(raw, packed, 1024 * 1024)
+            name = _publish_backup(packed_path, compress)
+        else:
+            name = _publish_backup(temp_path, compress)
+    finally:
+        for leftover in (temp_path, packed_path):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+    path = os.path.join(BACKUP_DIR, name)
+
+    removed = rotate_backups(keep)
+    result = {
+        "name": name,
+        "size": os.path.getsize(path),
+        "compressed": compress,
+        "restarts": restarts,
+        "removed": removed,
+        "seconds": round(time.perf_counter() - started, 2)
+    }
+    return result
+
+# ========== СПИСОК И РОТАЦИЯ ==========
+def list_backups() -> list:
+    """Копии в BACKUP_DIR, новые первыми"""
+    if not os.path.isdir(BACKUP_DIR):
+        return []
+    backups = []
+    for name in os.listdir(BACKUP_DIR):
+        if name.startswith(BACKUP_PREFIX) and name.endswith(BACKUP_SUFFIXES):
+            stat = os.stat(os.path.join(BACKUP_DIR, name))
+            backups.append({
+                "name": name,
+                "size": stat.st_size,
+                "compressed": name.endswith(".gz"),
+                "created_at": datetime.fromtimestamp(stat.st_mtime).isoformat(timespec="seconds")
+            })
+    # В имени метка времени, сортировка по имени = по времени
+    backups.sort(key=lambda backup: backup["name"], reverse=True)
+    return backups
+
+def rotate_backups(keep: int = BACKUP_KEEP) -> list:
+    """Удалить все копии, кроме keep последних; keep <= 0 — ничего не удалять"""
+    if keep <= 0:
+        return []
+    removed = []
+    for backup in list_backups()[keep:]:
+        os.remove(os.path.join(BACKUP_DIR, backup["name"]))
+        removed.append(backup["name"])
+    return removed
+
+def backup_path(name: str) -> str:
+    """Путь к копии по имени; только имена из list_backups (без ../)"""
+    if name not in {backup["name"] for backup in list_backups()}:
+        raise FileNotFoundError(f"Резервная копия '{name}' не найдена")
+    return os.path.join(BACKUP_DIR, name)
+
+# ========== ВОССТАНОВЛЕНИЕ ==========
+def restore_backup(name: str, safety_backup: bool = True) -> dict:
+    """Заменить содержимое базы копией name.
+
+    Запись идет через backup API в ту же базу, поэтому открытые соединения
+    приложения сразу видят восстановленные данные. Кэши процесса (каталог,
+    администраторы, сессии) сбрасывает вызывающий. Перед заменой снимается
+    копия текущей базы, чтобы восстановление можно было откатить.
+    """
+    path = backup_path(name)
+    if not _backup_lock.acquire(blocking=False):
+        raise BackupBusyError("Резервное копирование уже выполняется")
+    try:
+        started = time.perf_counter()
+        # Страховочная копия не участвует в ротации: keep=0
+        safety = _create_backup(BACKUP_COMPRESS, keep=0)["name"] if safety_backup else None
+
+        temp_path = None
+        source_path = path
+        if name.endswith(".gz"):
+            fd, temp_path = tempfile.mkstemp(prefix=".restore-", suffix=".db", dir=BACKUP_DIR)
+            with os.fdopen(fd, "wb") as raw, gzip.open(path, "rb") as packed:
+                shutil.copyfileobj(packed, raw, 1024 * 1024)
+            source_path = temp_path
+        try:
+            _check_database(source_path)
+            source = sqlite3.connect(source_path)
+            target = _connect(DB_PATH)
+            try:
+                # Одним шагом: база не должна побывать наполовину восстановленной
+                source.backup(target, pages=-1)
+            finally:
+                target.close()
+                source.close()
+        finally:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+    finally:
+        _backup_lock.release()
+
+    result = {
+        "restored": name,
+        "safety_backup": safety,
+        "seconds": round(time.perf_counter() - started, 2)
+    }
+    return result
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Резервные копии базы LinguaTune")
+    commands = parser.add_subparsers(dest="command", required=True)
+    create = commands.add_parser("create", help="Снять копию")
+    create.add_argument("--gzip", dest="compress", action="store_true", default=BACKUP_COMPRESS)
+    create.add_argument("--no-gzip", dest="compress", action="store_false")
+    create.add_argument("--keep", type=int, default=BACKUP_KEEP, help="Сколько копий хранить (0 — все)")
+    commands.add_parser("list", help="Показать копии")
+    restore = commands.add_parser("restore", help="Восстановить базу из копии")
+    restore.add_argument("name")
+    restore.add_argument("--no-safety-backup", dest="safety_backup", action="store_false")
+    args = parser.parse_args()
+
+    if args.command == "create":
+        result = create_backup(args.compress, args.keep)
+        print(f"💾 Резервная копия {result['name']}: {result['size']} байт за {result['seconds']} с")
+        for name in result["removed"]:
+            print(f"🗑️ Удалена старая копия {name}")
+    elif args.command == "list":
+        for backup in list_backups():
+            print(f"{backup['name']}\t{backup['size']}\t{backup['created_at']}")
+    else:
+        # Запущенное приложение держит снимок каталога в памяти:
+        # восстанавливайте при остановленном сервере или через POST /admin/backups/{name}/restore
+        result = restore_backup(args.name, args.safety_backup)
+        print(f"♻️ База восстановлена из {result['restored']} за {result['seconds']} с")
+        if result["safety_backup"]:
+            print(f"💾 Прежняя база сохранена как {result['safety_backup']}")
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,298 @@
+import asyncio
+import time
+from array import array
+from bisect import bisect_right
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, text
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models.songs import Song
+from models.languages import Language
+from models.artists import Artist
+from database.languages import build_alias_map, resolve_alias
+from database.connection import _env_int
+
+# Каталог (песни, языки, исполнители) меняется редко, а читается на каждой
+# странице. Держим его копию в памяти процесса и перечитываем из SQLite
+# только после записи в каталог. Ревизия каталога хранится в самой базе
+# (строка catalog_revision, ее увеличивают триггеры на song, language и
+# artist), поэтому запись из любого воркера видна всем. Строку ревизии
+# процесс перечитывает не чаще раза в CATALOG_CHECK_MS, а после своей
+# записи (invalidate() в обработчиках) — сразу; весь каталог читается
+# только при смене ревизии.
+CATALOG_CHECK_MS = _env_int("LINGUATUNE_CATALOG_CHECK_MS", 500)
+
+# ========== РЕВИЗИЯ В БАЗЕ ==========
+CATALOG_TABLES = ("song", "language", "artist")
+_BUMP_REVISION = (
+    "UPDATE catalog_revision SET revision = revision + 1, "
+    "updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now') WHERE id = 1;"
+)
+CATALOG_REVISION_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS catalog_revision (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        revision INTEGER NOT NULL,
+        updated_at TEXT NOT NULL
+    )
+    """,
+    """
+    INSERT OR IGNORE INTO catalog_revision (id, revision, updated_at)
+    VALUES (1, 1, strftime('%Y-%m-%d %H:%M:%f', 'now'))
+    """
+] + [
+    # Триггеры срабатывают в транзакции записи: ревизия меняется вместе с
+    # данными при любой записи, включая пакетный импорт и миграции
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {table}_catalog_revision_{suffix} AFTER {event} ON {table} BEGIN
+        {_BUMP_REVISION}
+    END
+    """
+    for table in CATALOG_TABLES
+    for suffix, event in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE"))
+]
+
+def create_catalog_revision(session: Session) -> bool:
+    """Создать строку ревизии и триггеры. Возвращает True, если впервые"""
+    created = session.exec(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'catalog_revision'"
+    )).first() is None
+    for statement in CATALOG_REVISION_DDL:
+        session.exec(text(statement))
+    return created
+
+async def read_catalog_revision(session: AsyncSession) -> Tuple[str, datetime]:
+    """Ревизия каталога в базе: (метка для сравнения и ETag, время записи).
+
+    Номер ревизии после восстановления из копии может повториться, поэтому
+    метка включает и время последней записи.
+    """
+    revision, updated_at = (await session.exec(text(
+        "SELECT revision, updated_at FROM catalog_revision WHERE id = 1"
+    ))).one()
+    modified_at = datetime.strptime(updated_at, "%Y-%m-%d %H:%M:%S.%f").replace(tzinfo=timezone.utc)
+    return f"{revision}-{int(modified_at.timestamp() * 1000)}", modified_at
+
+# ========== КОМПАКТНЫЕ ЗАПИСИ ==========
+class CatalogRecord:
+    """Запись каталога только для чтения: атрибуты в __slots__, без ORM"""
+    __slots__ = ()
+    fields: Tuple[str, ...] = ()
+
+    def __init__(self, obj):
+        for field in self.fields:
+            value = getattr(obj, field)
+            # Списки (словарь песни, жанры) храним неизменяемыми — запись общая
+            setattr(self, field, tuple(value) if isinstance(value, list) else value)
+
+    def to_dict(self) -> dict:
+        """То же, что Model.dict(): поля в порядке модели"""
+        data = {}
+        for field in self.fields:
+            value = getattr(self, field)
+            data[field] = list(value) if isinstance(value, tuple) else value
+        return data
+
+    # Шаблоны и старый код вызывают .dict() у моделей
+    dict = to_dict
+
+# Тексты песен (1–4 КБ на песню) в снимке не храним: он есть в каждом
+# воркере и перечитывается после каждой записи. Для списков хватает начала
+# текста, целиком текст читает страница песни (load_song_lyrics).
+LYRICS_FIELDS = ("lyrics_original", "lyrics_translation")
+LYRICS_PREVIEW_CHARS = 100
+
+class SongRecord(CatalogRecord):
+    fields = tuple(field for field in Song.model_fields if field not in LYRICS_FIELDS) + tuple(
+        f"{field}_preview" for field in LYRICS_FIELDS
+    )
+    __slots__ = fields
+
+class LanguageRecord(CatalogRecord):
+    fields = tuple(Language.model_fields)
+    __slots__ = fields
+
+class ArtistRecord(CatalogRecord):
+    fields = tuple(Artist.model_fields)
+    __slots__ = fields
+
+# ========== ИНДЕКС ==========
+class CatalogIndex:
+    """Снимок каталога с вторичными индексами по языку, сложности и исполнителю"""
+    __slots__ = (
+        "version", "revision", "modified_at",
+        "songs", "song_ids", "songs_by_id",
+        "songs_by_language", "songs_by_difficulty", "songs_by_artist",
+        "languages", "languages_by_id", "language_aliases",
+        "artists", "artist_ids"
+    )
+
+    def __init__(
+        self,
+        version: int,
+        revision: str,
+        modified_at: datetime,
+        songs: List[SongRecord],
+        languages: List[LanguageRecord],
+        artists: List[ArtistRecord]
+    ):
+        # Номер снимка в этом процессе (растет с каждой загрузкой) — для
+        # кэшей в памяти; revision — ревизия в базе, общая для всех воркеров
+        self.version = version
+        self.revision = revision
+        # Время записи, после которой снимок актуален (для Last-Modified)
+        self.modified_at = modified_at
+
+        # Песни и исполнители упорядочены по ID, рядом — массив ключей для bisect
+        self.songs = songs
+        self.song_ids = array("q", (song.id for song in songs))
+        self.songs_by_id: Dict[int, SongRecord] = {song.id: song for song in songs}
+
+        # Ключ — song.language_id (песни без языка попадают под None)
+        self.songs_by_language: Dict[Optional[int], List[SongRecord]] = {}
+        self.songs_by_difficulty: Dict[str, List[SongRecord]] = {}
+        self.songs_by_artist: Dict[str, List[SongRecord]] = {}
+        for song in songs:
+            self.songs_by_language.setdefault(song.language_id, []).append(song)
+            self.songs_by_difficulty.setdefault((song.difficulty or "").lower(), []).append(song)
+            self.songs_by_artist.setdefault(song.artist, []).append(song)
+
+        self.languages = languages
+        self.languages_by_id: Dict[int, LanguageRecord] = {lang.id: lang for lang in languages}
+        self.language_aliases: Dict[str, int] = build_alias_map(languages)
+
+        self.artists = artists
+        self.artist_ids = array("q", (artist.id for artist in artists))
+
+    # ----- песни -----
+    def get_song(self, song_id: int) -> Optional[SongRecord]:
+        return self.songs_by_id.get(song_id)
+
+    def page_songs(self, limit: int, after: Optional[int] = None):
+        """Keyset-страница песен, как database.pagination.paginate"""
+        return _page(self.songs, self.song_ids, limit, after)
+
+    def songs_for_language(self, language_id: int) -> List[SongRecord]:
+        return self.songs_by_language.get(language_id, [])
+
+    def songs_for_difficulty(self, difficulty: str) -> List[SongRecord]:
+        return self.songs_by_difficulty.get((difficulty or "").lower(), [])
+
+    def songs_for_artist(self, artist: str) -> List[SongRecord]:
+        return self.songs_by_artist.get(artist, [])
+
+    def recent_songs(self, count: int) -> List[SongRecord]:
+        """Последние добавленные песни (по возрастанию ID)"""
+        return self.songs[-count:] if count > 0 else []
+
+    # ----- языки и исполнители -----
+    def get_language(self, language_id: int) -> Optional[LanguageRecord]:
+        return self.languages_by_id.get(language_id)
+
+    def resolve_language(self, text: str) -> Optional[LanguageRecord]:
+        """Язык по коду, русскому или родному названию"""
+        language_id = resolve_alias(self.language_aliases, text)
+        return self.languages_by_id.get(language_id) if language_id is not None else None
+
+    def page_artists(self, limit: int, after: Optional[int] = None):
+        return _page(self.artists, self.artist_ids, limit, after)
+
+    def artist_names_count(self) -> int:
+        """Число разных исполнителей среди песен"""
+        return len(self.songs_by_artist)
+
+def _page(records: list, keys: array, limit: int, after: Optional[int]):
+    start = bisect_right(keys, after) if after is not None else 0
+    rows = records[start:start + limit + 1]
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, rows[-1].id
+
+# ========== ЗАГРУЗКА И ИНВАЛИДАЦИЯ ==========
+_version = 0
+_catalog: Optional[CatalogIndex] = None
+# Когда ревизия снимка последний раз сверялась с базой (time.monotonic)
+_checked_at: Optional[float] = None
+# Счетчик invalidate(): сверка, начатая до записи, не должна считаться свежей
+_invalidations = 0
+_load_lock = asyncio.Lock()
+_counters = {"hits": 0, "loads": 0}
+
+def catalog_stats() -> dict:
+    """Обращения к снимку: hits — ревизия не менялась, loads — каталог перечитан"""
+    return {"version": _version, **_counters}
+
+def invalidate():
+    """Сверить ревизию с базой при следующем обращении. Вызывать после commit
+    записи в каталог: свои изменения процесс видит сразу, чужие — не позже
+    чем через CATALOG_CHECK_MS"""
+    global _checked_at, _invalidations
+    _invalidations += 1
+    _checked_at = None
+
+def _fresh(checked_at: Optional[float]) -> bool:
+    return checked_at is not None and (time.monotonic() - checked_at) * 1000 < CATALOG_CHECK_MS
+
+def _mark_checked(checked_at: float, invalidations: int):
+    global _checked_at
+    if invalidations == _invalidations:
+        _checked_at = checked_at
+
+def load_catalog(session: Session, version: int, revision: str, modified_at: datetime) -> CatalogIndex:
+    """Прочитать каталог из базы (синхронно, для session.run_sync)"""
+    columns = [getattr(Song, field) for field in Song.model_fields if field not in LYRICS_FIELDS]
+    columns += [
+        func.substr(getattr(Song, field), 1, LYRICS_PREVIEW_CHARS).label(f"{field}_preview")
+        for field in LYRICS_FIELDS
+    ]
+    songs = [SongRecord(row) for row in session.exec(select(*columns).order_by(Song.id))]
+    languages = [LanguageRecord(lang) for lang in session.exec(select(Language).order_by(Language.id))]
+    artists = [ArtistRecord(artist) for artist in session.exec(select(Artist).order_by(Artist.id))]
+    # ORM-объекты больше не нужны, не держим их в identity map сессии
+    session.expunge_all()
+    return CatalogIndex(version, revision, modified_at, songs, languages, artists)
+
+def load_song_lyrics(session: Session, song_id: int) -> Optional[dict]:
+    """Полные тексты одной песни (их нет в снимке каталога)"""
+    row = session.exec(
+        select(Song.lyrics_original, Song.lyrics_translation).where(Song.id == song_id)
+    ).first()
+    return dict(zip(LYRICS_FIELDS, row)) if row else None
+
+async def get_catalog(session: AsyncSession) -> CatalogIndex:
+    """Актуальный снимок каталога; весь каталог читается только при смене ревизии"""
+    global _catalog, _version
+    catalog = _catalog
+    if catalog is not None and _fresh(_checked_at):
+        _counters["hits"] += 1
+        return catalog
+
+    checked_at, invalidations = time.monotonic(), _invalidations
+    revision, modified_at = await read_catalog_revision(session)
+
+    if catalog is not None and catalog.revision == revision:
+        _mark_checked(checked_at, invalidations)
+        _counters["hits"] += 1
+        return catalog
+
+    async with _load_lock:
+        # Пока ждали блокировку, каталог мог перечитать другой запрос
+        if _catalog is not None and _catalog.revision == revision:
+            _mark_checked(checked_at, invalidations)
+            _counters["hits"] += 1
+            return _catalog
+        # Другой запрос сверил ревизию позже нас: его снимок не старше нашего
+        if _catalog is not None and _checked_at is not None and _checked_at > checked_at:
+            _counters["hits"] += 1
+            return _catalog
+        _counters["loads"] += 1
+        # Ревизия прочитана до данных: если во время загрузки случится
+        # запись, снимок получит старую ревизию и будет перечитан
+        _version += 1
+        _catalog = await session.run_sync(load_catalog, _version, revision, modified_at)
+        _mark_checked(checked_at, invalidations)
+        return _catalog
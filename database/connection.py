@@ -1,18 +1,141 @@
 from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 import os
+import time
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATABASE_URL = f"sqlite:///{BASE_DIR}/linguatune.db"
 
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+# ========== ПРОФИЛЬ ДВИЖКА (настраивается переменными окружения) ==========
+DB_PATH = os.getenv("LINGUATUNE_DB_PATH", f"{BASE_DIR}/linguatune.db")
+DB_ECHO = _env_bool("LINGUATUNE_DB_ECHO", False)
+
+# Пул для записи: SQLite все равно сериализует писателей, большой пул не нужен
+DB_POOL_SIZE = _env_int("LINGUATUNE_DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = _env_int("LINGUATUNE_DB_MAX_OVERFLOW", 5)
+DB_POOL_TIMEOUT = _env_int("LINGUATUNE_DB_POOL_TIMEOUT", 30)
+# Пул только для чтения: в режиме WAL читатели не блокируют писателя
+DB_READ_POOL_SIZE = _env_int("LINGUATUNE_DB_READ_POOL_SIZE", 10)
+DB_READ_MAX_OVERFLOW = _env_int("LINGUATUNE_DB_READ_MAX_OVERFLOW", 10)
+
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("LINGUATUNE_DB_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("LINGUATUNE_DB_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": _env_int("LINGUATUNE_DB_BUSY_TIMEOUT_MS", 5000),
+    "mmap_size": _env_int("LINGUATUNE_DB_MMAP_SIZE", 256 * 1024 * 1024),
+    # Отрицательное значение — размер в KiB, а не в страницах
+    "cache_size": -_env_int("LINGUATUNE_DB_CACHE_SIZE_KIB", 64 * 1024),
+    "temp_store": "MEMORY"
+}
+
+# Режим журнала хранится в самом файле базы, читателю его не поменять
+READ_ONLY_PRAGMAS = {
+    name: value for name, value in SQLITE_PRAGMAS.items()
+    if name not in ("journal_mode", "synchronous")
+}
+READ_ONLY_PRAGMAS["query_only"] = "ON"
+
+DATABASE_URL = f"sqlite:///{DB_PATH}"
+ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{DB_PATH}"
+ASYNC_READ_DATABASE_URL = f"sqlite+aiosqlite:///file:{DB_PATH}?mode=ro&uri=true"
+
+def _apply_pragmas(target_engine, pragmas: dict):
+    """Выставлять PRAGMA на каждом новом соединении пула"""
+    @event.listens_for(target_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+class _CheckoutTimingMixin:
+    """Считает выдачи соединений из пула и время ожидания (для /metrics)"""
+    checkouts = 0
+    checkout_seconds = 0.0
+    timeouts = 0
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.checkout_seconds += time.perf_counter() - started
+        self.checkouts += 1
+        return connection
+
+class TimedQueuePool(_CheckoutTimingMixin, QueuePool):
+    pass
+
+class TimedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+# Синхронный движок: создание таблиц, миграции, seed-скрипты
 engine = create_engine(
     DATABASE_URL,
-    echo=True,
+    echo=DB_ECHO,
+    poolclass=TimedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
     connect_args={"check_same_thread": False}
 )
+_apply_pragmas(engine, SQLITE_PRAGMAS)
+
+# Асинхронный движок для обработчиков запросов (не блокирует event loop)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=DB_ECHO,
+    poolclass=TimedAsyncQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT
+)
+_apply_pragmas(async_engine.sync_engine, SQLITE_PRAGMAS)
+
+# Отдельный пул только для чтения (GET-обработчики)
+async_read_engine = create_async_engine(
+    ASYNC_READ_DATABASE_URL,
+    echo=DB_ECHO,
+    poolclass=TimedAsyncQueuePool,
+    pool_size=DB_READ_POOL_SIZE,
+    max_overflow=DB_READ_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT
+)
+_apply_pragmas(async_read_engine.sync_engine, READ_ONLY_PRAGMAS)
 
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
+    # Переносим старые данные в новые таблицы
+    from database.migrations import run_migrations
+    run_migrations()
 
 def get_session():
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+async def get_async_session():
+    # expire_on_commit=False: после commit атрибуты читаются без
+    # неявного (и невозможного в async) повторного запроса
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+async def get_async_read_session():
+    """Сессия из пула только для чтения; любая запись в ней завершится ошибкой"""
+    async with AsyncSession(async_read_engine, expire_on_commit=False) as session:
+        yield session
@@ -0,0 +1,105 @@
+import sys
+import json
+from pathlib import Path
+
+# Добавляем родительскую директорию в путь Python
+current_dir = Path(__file__).parent
+project_root = current_dir.parent
+sys.path.append(str(project_root))
+
+from typing import Dict, Iterator, List, Type
+from sqlmodel import Session, SQLModel
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models.languages import Language
+from models.artists import Artist
+from models.songs import Song
+from database.languages import link_song_languages
+from database.stats import rebuild_stats
+from database.vocabulary import rebuild_vocabulary_index
+
+# Наборы контента: database/content/<набор>/{languages,artists,songs}.json
+# (JSON-массив) или .ndjson (по объекту в строке)
+PACKS_DIR = current_dir / "content"
+PACK_TABLES = (
+    ("languages", Language),
+    ("artists", Artist),
+    ("songs", Song)
+)
+
+# ========== ЧТЕНИЕ ФАЙЛОВ ==========
+def list_packs() -> List[str]:
+    return sorted(path.name for path in PACKS_DIR.iterdir() if path.is_dir())
+
+def pack_path(pack: str) -> Path:
+    """Набор по имени (из PACKS_DIR) или по пути к каталогу"""
+    path = Path(pack)
+    if not path.is_dir():
+        path = PACKS_DIR / pack
+    if not path.is_dir():
+        raise FileNotFoundError(f"Набор контента '{pack}' не найден")
+    return path
+
+def read_records(path: Path, table: str) -> Iterator[dict]:
+    ndjson = path / f"{table}.ndjson"
+    if ndjson.exists():
+        with open(ndjson, encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        return
+    plain = path / f"{table}.json"
+    if plain.exists():
+        with open(plain, encoding="utf-8") as file:
+            yield from json.load(file)
+
+def model_rows(model: Type[SQLModel], records) -> List[dict]:
+    """Значения колонок через конструктор модели (с ее значениями по умолчанию)"""
+    columns = [column.name for column in model.__table__.columns if not column.primary_key]
+    rows = []
+    for record in records:
+        instance = model(**record)
+        rows.append({name: getattr(instance, name) for name in columns})
+    return rows
+
+# ========== ЗАПИСЬ ==========
+def insert_ignore(session: Session, model: Type[SQLModel], rows: List[dict]) -> int:
+    """INSERT ... ON CONFLICT DO NOTHING одним executemany.
+
+    Строки, нарушающие уникальный ключ (уже загруженные), пропускаются
+    базой без отдельного SELECT. Возвращает число вставленных строк.
+    """
+    if not rows:
+        return 0
+    result = session.exec(
+        sqlite_insert(model.__table__).on_conflict_do_nothing(),
+        params=rows
+    )
+    return result.rowcount
+
+def load_pack(session: Session, pack: str) -> Dict[str, int]:
+    """Загрузить набор контента (идемпотентно): по транзакции на таблицу"""
+    path = pack_path(pack)
+    counts = {}
+    for table, model in PACK_TABLES:
+        counts[table] = insert_ignore(session, model, model_rows(model, read_records(path, table)))
+        session.commit()
+
+    if any(counts.values()):
+        # Связываем новые песни с языками, пересчитываем счетчики и словарный индекс
+        link_song_languages(session)
+        rebuild_stats(session)
+        rebuild_vocabulary_index(session)
+        session.commit()
+    return counts
+
+if __name__ == "__main__":
+    from database.connection import engine
+    import models  # noqa: F401 - регистрируем все таблицы в metadata
+
+    SQLModel.metadata.create_all(engine)
+    packs = sys.argv[1:] or list_packs()
+    with Session(engine) as session:
+        for pack in packs:
+            counts = load_pack(session, pack)
+            print(f"✅ Набор '{pack}': " + ", ".join(f"{table}: {count}" for table, count in counts.items()))
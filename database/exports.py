@@ -0,0 +1,127 @@
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterator, List, Sequence
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database.connection import async_read_engine
+from database.song_import import NDJSON, CSV
+from models.users import User
+from models.songs import Song
+from models.progress import UserSongProgress
+
+# Строк на одну выборку из курсора и на один кусок ответа
+EXPORT_BATCH_ROWS = 1000
+
+USER_COLUMNS = [
+    "id", "email", "full_name", "username", "current_language",
+    "learned_songs_count", "learned_songs"
+]
+PROGRESS_COLUMNS = ["user_id", "email", "song_id", "title", "artist", "learned_at"]
+
+# ========== ЧТЕНИЕ ==========
+# Своя сессия на весь экспорт: ответ еще передается, когда обработчик
+# (и сессия из Depends) уже завершился. session.stream() держит на
+# сервере курсор и отдает строки пачками, вся таблица в памяти не бывает.
+
+async def iter_user_batches() -> AsyncIterator[List[dict]]:
+    """Пользователи по возрастанию ID, пачками, с изученными песнями"""
+    async with AsyncSession(async_read_engine) as session:
+        result = await session.stream(
+            select(User.id, User.email, User.full_name, User.username, User.current_language)
+            .order_by(User.id)
+        )
+        async for users in result.partitions(EXPORT_BATCH_ROWS):
+            # Изученные песни всей пачки одним запросом по диапазону ID
+            learned_by_user = {}
+            progress_rows = (await session.exec(
+                select(UserSongProgress.user_id, UserSongProgress.song_id)
+                .where(UserSongProgress.user_id.between(users[0].id, users[-1].id))
+                .order_by(UserSongProgress.user_id, UserSongProgress.learned_at, UserSongProgress.id)
+            )).all()
+            for user_id, song_id in progress_rows:
+                learned_by_user.setdefault(user_id, []).append(song_id)
+
+            batch = []
+            for user_id, email, full_name, username, current_language in users:
+                learned_songs = learned_by_user.get(user_id, [])
+                batch.append({
+                    "id": user_id,
+                    "email": email,
+                    "full_name": full_name,
+                    "username": username,
+                    "current_language": current_language,
+                    "learned_songs_count": len(learned_songs),
+                    "learned_songs": learned_songs
+                })
+            yield batch
+
+async def iter_progress_batches() -> AsyncIterator[List[dict]]:
+    """Все отметки "изучено" в порядке добавления, пачками"""
+    async with AsyncSession(async_read_engine) as session:
+        result = await session.stream(
+            select(
+                UserSongProgress.user_id, User.email, UserSongProgress.song_id,
+                Song.title, Song.artist, UserSongProgress.learned_at
+            )
+            .join(User, User.id == UserSongProgress.user_id)
+            .join(Song, Song.id == UserSongProgress.song_id)
+            .order_by(UserSongProgress.id)
+        )
+        async for rows in result.partitions(EXPORT_BATCH_ROWS):
+            yield [
+                {
+                    "user_id": user_id,
+                    "email": email,
+                    "song_id": song_id,
+                    "title": title,
+                    "artist": artist,
+                    "learned_at": learned_at.isoformat()
+                }
+                for user_id, email, song_id, title, artist, learned_at in rows
+            ]
+
+# ========== КОДИРОВАНИЕ ==========
+def _csv_value(value):
+    # Списки — через ";", как в CSV для импорта песен
+    if isinstance(value, list):
+        return ";".join(str(item) for item in value)
+    return "" if value is None else value
+
+async def encode_export(
+    batches: AsyncIterator[List[dict]],
+    columns: Sequence[str],
+    export_format: str
+) -> AsyncIterator[bytes]:
+    """Пачки записей -> куски NDJSON или CSV (с заголовком)"""
+    if export_format == CSV:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        async for batch in batches:
+            for record in batch:
+                writer.writerow([_csv_value(record[column]) for column in columns])
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        # Таблица могла оказаться пустой: заголовок все равно нужен
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+        return
+
+    async for batch in batches:
+        yield "".join(
+            json.dumps(record, ensure_ascii=False) + "\n" for record in batch
+        ).encode("utf-8")
+
+async def gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Сжатие на лету: в памяти только текущий кусок"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
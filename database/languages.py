@@ -0,0 +1,104 @@
+import sys
+from pathlib import Path
+
+# Добавляем родительскую директорию в путь Python
+current_dir = Path(__file__).parent
+project_root = current_dir.parent
+sys.path.append(str(project_root))
+
+from typing import Dict, Iterable, Optional
+from sqlmodel import Session, select, update
+
+from models.songs import Song
+from models.languages import Language
+from database.vocabulary import normalize_word
+
+# Самоназвания и английские названия по коду языка. Русские названия
+# и коды берутся из самой таблицы language.
+LANGUAGE_ALIASES = {
+    "en": ["English"],
+    "es": ["Español", "Spanish", "Castellano"],
+    "fr": ["Français", "French"],
+    "de": ["Deutsch", "German"],
+    "it": ["Italiano", "Italian"],
+    "ko": ["한국어", "Korean"],
+    "ja": ["日本語", "Japanese"],
+    "ru": ["Русский", "Russian"],
+    "pt": ["Português", "Portuguese"],
+    "zh": ["中文", "Chinese"]
+}
+
+def language_key(text: str) -> str:
+    """Ключ для сравнения названий: без регистра, диакритики и лишних пробелов"""
+    return normalize_word(text or "")
+
+def build_alias_map(languages: Iterable) -> Dict[str, int]:
+    """Ключ названия/кода -> language.id (для Language и записей каталога)"""
+    aliases = {}
+    for language in languages:
+        names = [language.name, language.code]
+        names += LANGUAGE_ALIASES.get((language.code or "").lower(), [])
+        for name in names:
+            key = language_key(name)
+            if key:
+                # Явное название языка важнее совпадения с чужим алиасом
+                aliases.setdefault(key, language.id)
+    return aliases
+
+def resolve_alias(aliases: Dict[str, int], text: str) -> Optional[int]:
+    """ID языка по коду, русскому или родному названию ("en", "en-US", "English")"""
+    key = language_key(text)
+    if not key:
+        return None
+    if key in aliases:
+        return aliases[key]
+    # Региональные коды: en-us, pt_br -> en, pt
+    for separator in ("-", "_"):
+        if separator in key:
+            return aliases.get(key.split(separator, 1)[0])
+    return None
+
+def find_language(session: Session, text: str) -> Optional[Language]:
+    """Язык по коду или любому названию — для записи песен.
+
+    Читается только таблица language (десятки строк), а не снимок каталога
+    с текстами песен, который после каждой записи пришлось бы загружать заново.
+    """
+    languages = session.exec(select(Language)).all()
+    language_id = resolve_alias(build_alias_map(languages), text)
+    return next((language for language in languages if language.id == language_id), None)
+
+def link_song_languages(session: Session) -> int:
+    """Проставить song.language_id по названию языка у песен, где его нет.
+
+    Название заменяется каноническим (language.name). Возвращает число
+    обновленных песен; нераспознанные названия остаются без language_id.
+    """
+    languages = session.exec(select(Language)).all()
+    aliases = build_alias_map(languages)
+    names = {language.id: language.name for language in languages}
+
+    values = session.exec(
+        select(Song.language).where(Song.language_id == None).distinct()  # noqa: E711
+    ).all()
+
+    linked = 0
+    for value in values:
+        language_id = resolve_alias(aliases, value)
+        if language_id is None:
+            continue
+        result = session.exec(
+            update(Song)
+            .where((Song.language == value) & (Song.language_id == None))  # noqa: E711
+            .values(language_id=language_id, language=names[language_id])
+        )
+        linked += result.rowcount
+    return linked
+
+if __name__ == "__main__":
+    from database.connection import engine
+
+    with Session(engine) as session:
+        linked = link_song_languages(session)
+        session.commit()
+    print(f"✅ Песен привязано к языкам: {linked}")
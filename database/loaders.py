@@ -0,0 +1,36 @@
+from typing import Iterable, List, Type, TypeVar
+from sqlmodel import Session, SQLModel, select
+
+from models.songs import Song
+
+ModelT = TypeVar("ModelT", bound=SQLModel)
+
+# SQLite (до 3.32) ограничивает число параметров запроса 999
+SQLITE_MAX_VARIABLES = 900
+
+def load_by_ids(
+    session: Session,
+    model: Type[ModelT],
+    ids: Iterable[int],
+    chunk_size: int = SQLITE_MAX_VARIABLES
+) -> List[ModelT]:
+    """Загрузить строки по списку ID запросами `id IN (...)`.
+
+    Результат идет в порядке переданных ID; отсутствующие в базе ID
+    пропускаются, повторяющиеся ID не дублируют строки.
+    """
+    ordered_ids = list(dict.fromkeys(ids))
+    if not ordered_ids:
+        return []
+
+    found = {}
+    for start in range(0, len(ordered_ids), chunk_size):
+        chunk = ordered_ids[start:start + chunk_size]
+        for row in session.exec(select(model).where(model.id.in_(chunk))).all():
+            found[row.id] = row
+
+    return [found[row_id] for row_id in ordered_ids if row_id in found]
+
+def load_songs_by_ids(session: Session, song_ids: Iterable[int]) -> List[Song]:
+    """Загрузить песни по ID одним (или несколькими при большом списке) запросом"""
+    return load_by_ids(session, Song, song_ids)
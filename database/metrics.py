@@ -0,0 +1,172 @@
+"""Метрики процесса в текстовом формате Prometheus (без внешних библиотек).
+
+Счетчики живут в памяти процесса и обновляются простым сложением;
+значения, которые и так хранятся в других модулях (пулы соединений,
+кэши), не дублируются, а читаются в момент опроса через CallbackMetric.
+"""
+import math
+from bisect import bisect_left
+from typing import Callable, Sequence
+
+from sqlalchemy import event
+
+from database.connection import engine, async_engine, async_read_engine
+
+# Все объявленные метрики в порядке вывода
+REGISTRY = []
+
+# Границы корзин времени ответа, секунды
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+# ========== ТИПЫ МЕТРИК ==========
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labels)
+        # кортеж значений меток -> значение
+        self._values = {}
+        REGISTRY.append(self)
+
+    def collect(self) -> dict:
+        return self._values
+
+    def render(self, lines: list):
+        lines.append(f"# HELP {self.name} {self.help}")
+        lines.append(f"# TYPE {self.name} {self.kind}")
+        for labels, value in sorted(self.collect().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, *labels):
+        self._values[labels] = value
+
+    def inc(self, *labels, amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels):
+        state = self._values.get(labels)
+        if state is None:
+            # [попадания по корзинам (не накопительно), сумма, количество]
+            state = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            state[0][index] += 1
+        state[1] += value
+        state[2] += 1
+
+    def render(self, lines: list):
+        lines.append(f"# HELP {self.name} {self.help}")
+        lines.append(f"# TYPE {self.name} {self.kind}")
+        for labels, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, hits in zip(self.buckets, counts):
+                cumulative += hits
+                le = _format_labels(self.labelnames, labels, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = _format_labels(self.labelnames, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {count}")
+            plain = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{plain} {_format_value(total)}")
+            lines.append(f"{self.name}_count{plain} {count}")
+
+class CallbackMetric(Metric):
+    """Значения вычисляются при опросе: collect() -> {кортеж меток: значение}"""
+
+    def __init__(self, name: str, help: str, kind: str, labels: Sequence[str], collect: Callable[[], dict]):
+        super().__init__(name, help, labels)
+        self.kind = kind
+        self._collect = collect
+
+    def collect(self) -> dict:
+        return self._collect()
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        metric.render(lines)
+    return "\n".join(lines) + "\n"
+
+# ========== БАЗА ДАННЫХ ==========
+ENGINES = {
+    "write": async_engine.sync_engine,
+    "read": async_read_engine.sync_engine,
+    "sync": engine
+}
+
+DB_BUSY_ERRORS = Counter(
+    "linguatune_db_busy_errors_total",
+    "Выражения, не дождавшиеся блокировки SQLite за busy_timeout",
+    ("pool",)
+)
+
+def _pool_values(read: Callable) -> Callable[[], dict]:
+    # engine.pool читаем при каждом опросе: dispose() заменяет пул новым
+    return lambda: {(name,): read(target.pool) for name, target in ENGINES.items()}
+
+CallbackMetric(
+    "linguatune_db_pool_checkouts_total", "Выдано соединений из пула",
+    "counter", ("pool",), _pool_values(lambda pool: pool.checkouts)
+)
+CallbackMetric(
+    "linguatune_db_pool_checkout_seconds_total", "Суммарное время ожидания соединения из пула",
+    "counter", ("pool",), _pool_values(lambda pool: pool.checkout_seconds)
+)
+CallbackMetric(
+    "linguatune_db_pool_timeouts_total", "Ожиданий соединения, завершившихся по pool_timeout",
+    "counter", ("pool",), _pool_values(lambda pool: pool.timeouts)
+)
+CallbackMetric(
+    "linguatune_db_pool_connections_in_use", "Соединений выдано сейчас",
+    "gauge", ("pool",), _pool_values(lambda pool: pool.checkedout())
+)
+CallbackMetric(
+    "linguatune_db_pool_size", "Размер пула (без overflow)",
+    "gauge", ("pool",), _pool_values(lambda pool: pool.size())
+)
+
+def _listen_busy_errors(name: str, target):
+    @event.listens_for(target, "handle_error")
+    def count_busy_error(context):
+        # Повторы ждет сам SQLite (busy_timeout); сюда доходят только
+        # выражения, так и не дождавшиеся блокировки
+        message = str(context.original_exception).lower()
+        if "database is locked" in message or "database table is locked" in message:
+            DB_BUSY_ERRORS.inc(name)
+
+for _name, _target in ENGINES.items():
+    _listen_busy_errors(_name, _target)
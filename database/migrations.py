@@ -0,0 +1,193 @@
+import sys
+import json
+from datetime import datetime
+from pathlib import Path
+
+# Добавляем родительскую директорию в путь Python
+current_dir = Path(__file__).parent
+project_root = current_dir.parent
+sys.path.append(str(project_root))
+
+from sqlalchemy import text
+from sqlmodel import SQLModel, Session
+from database.connection import engine
+from database.stats import rebuild_stats, stats_initialized
+from database.search import create_song_fts
+from database.catalog import create_catalog_revision
+from database.vocabulary import rebuild_vocabulary_index, vocabulary_index_initialized
+from database.languages import link_song_languages
+from database.sessions import delete_expired_sessions
+from database.reviews import backfill_reviews, reviews_initialized
+import models  # noqa: F401 - регистрируем все таблицы в metadata
+
+def _column_exists(session: Session, table: str, column: str) -> bool:
+    rows = session.exec(text(f"PRAGMA table_info('{table}')")).all()
+    return any(row[1] == column for row in rows)
+
+# ========== МИГРАЦИИ ==========
+def migrate_learned_songs(session: Session) -> int:
+    """Перенос JSON-списка user.learned_songs в таблицу user_song_progress.
+
+    Старая колонка остается в таблице, но после переноса обнуляется,
+    поэтому повторный запуск ничего не делает.
+    """
+    if not _column_exists(session, "user", "learned_songs"):
+        return 0
+
+    rows = session.exec(text(
+        "SELECT id, learned_songs FROM user "
+        "WHERE learned_songs IS NOT NULL AND learned_songs != '[]'"
+    )).all()
+
+    params = []
+    migrated_at = datetime.now()
+    for user_id, raw in rows:
+        try:
+            song_ids = json.loads(raw) if isinstance(raw, str) else raw
+        except ValueError:
+            song_ids = []
+        if not isinstance(song_ids, list):
+            continue
+        for song_id in song_ids:
+            if isinstance(song_id, int):
+                params.append({
+                    "user_id": user_id,
+                    "song_id": song_id,
+                    "learned_at": migrated_at
+                })
+
+    if params:
+        # Песни, которых уже нет в каталоге, не переносим
+        session.exec(
+            text(
+                "INSERT OR IGNORE INTO user_song_progress (user_id, song_id, learned_at) "
+                "SELECT :user_id, id, :learned_at FROM song WHERE id = :song_id"
+            ),
+            params=params
+        )
+
+    session.exec(text("UPDATE user SET learned_songs = NULL WHERE learned_songs IS NOT NULL"))
+    return len(params)
+
+def migrate_song_language_ids(session: Session) -> int:
+    """Добавить song.language_id и связать песни с таблицей language по названию"""
+    if not _column_exists(session, "song", "language_id"):
+        session.exec(text(
+            "ALTER TABLE song ADD COLUMN language_id INTEGER REFERENCES language (id)"
+        ))
+        session.exec(text(
+            "CREATE INDEX IF NOT EXISTS ix_song_language_id ON song (language_id)"
+        ))
+    return link_song_languages(session)
+
+def migrate_vocabulary_language_ids(session: Session) -> int:
+    """Добавить song_vocabulary.language_id (из song) и индекс по нему"""
+    if _column_exists(session, "song_vocabulary", "language_id"):
+        return 0
+    session.exec(text(
+        "ALTER TABLE song_vocabulary ADD COLUMN language_id INTEGER REFERENCES language (id)"
+    ))
+    result = session.exec(text(
+        "UPDATE song_vocabulary SET language_id = "
+        "(SELECT language_id FROM song WHERE song.id = song_vocabulary.song_id)"
+    ))
+    session.exec(text("DROP INDEX IF EXISTS ix_song_vocabulary_word_key_language"))
+    session.exec(text(
+        "CREATE INDEX IF NOT EXISTS ix_song_vocabulary_word_key_language_id "
+        "ON song_vocabulary (word_key, language_id)"
+    ))
+    return result.rowcount
+
+def migrate_song_unique_key(session: Session) -> int:
+    """Удалить дубликаты (title, artist) и создать уникальный индекс.
+
+    Остается песня с наименьшим ID; прогресс пользователей переносится
+    на нее. Возвращает число удаленных дубликатов.
+    """
+    exists = session.exec(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'ux_song_title_artist'"
+    )).first()
+    if exists:
+        return 0
+
+    duplicates = session.exec(text(
+        "SELECT id, keep_id FROM ("
+        "  SELECT id, MIN(id) OVER (PARTITION BY title, artist) AS keep_id FROM song"
+        ") WHERE id != keep_id"
+    )).all()
+    params = [{"song_id": song_id, "keep_id": keep_id} for song_id, keep_id in duplicates]
+    if params:
+        session.exec(
+            text("UPDATE OR IGNORE user_song_progress SET song_id = :keep_id WHERE song_id = :song_id"),
+            params=params
+        )
+        for table in ("user_song_progress", "song_vocabulary", "song"):
+            session.exec(
+                text(f"DELETE FROM {table} WHERE {'id' if table == 'song' else 'song_id'} = :song_id"),
+                params=params
+            )
+
+    session.exec(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_song_title_artist ON song (title, artist)"
+    ))
+    return len(params)
+
+def init_stats(session: Session, force: bool = False) -> bool:
+    """Первичное заполнение таблицы stat_counter"""
+    if stats_initialized(session) and not force:
+        return False
+    rebuild_stats(session)
+    return True
+
+def init_vocabulary_index(session: Session, force: bool = False) -> int:
+    """Первичное заполнение словарного индекса song_vocabulary"""
+    if vocabulary_index_initialized(session) and not force:
+        return 0
+    return rebuild_vocabulary_index(session)
+
+def init_reviews(session: Session) -> int:
+    """Очередь повторения для песен, изученных до появления карточек"""
+    if reviews_initialized(session):
+        return 0
+    return backfill_reviews(session)
+
+def run_migrations():
+    """Применить все миграции данных (идемпотентно)"""
+    with Session(engine) as session:
+        songs_linked = migrate_song_language_ids(session)
+        moved = migrate_learned_songs(session)
+        duplicates_removed = migrate_song_unique_key(session)
+        # Перенесенный прогресс, удаленные дубликаты и канонические названия
+        # языков меняют счетчики, поэтому пересчитываем их
+        stats_rebuilt = init_stats(
+            session, force=moved > 0 or songs_linked > 0 or duplicates_removed > 0
+        )
+        search_index_created = create_song_fts(session)
+        catalog_revision_created = create_catalog_revision(session)
+        # В словарном индексе тоже хранятся название и ID языка
+        vocabulary_linked = migrate_vocabulary_language_ids(session)
+        vocabulary_indexed = init_vocabulary_index(session, force=songs_linked > 0)
+        # Карточки строятся по словарному индексу, поэтому после него
+        reviews_created = init_reviews(session)
+        sessions_expired = delete_expired_sessions(session)
+        session.commit()
+    return {
+        "songs_linked": songs_linked,
+        "learned_songs": moved,
+        "duplicate_songs_removed": duplicates_removed,
+        "stats_rebuilt": stats_rebuilt,
+        "search_index_created": search_index_created,
+        "catalog_revision_created": catalog_revision_created,
+        "vocabulary_linked": vocabulary_linked,
+        "vocabulary_indexed": vocabulary_indexed,
+        "reviews_created": reviews_created,
+        "sessions_expired": sessions_expired
+    }
+
+if __name__ == "__main__":
+    SQLModel.metadata.create_all(engine)
+    result = run_migrations()
+    print(f"✅ Песен привязано к языкам: {result['songs_linked']}")
+    print(f"✅ Перенесено изученных песен: {result['learned_songs']}")
+    print(f"✅ Удалено дубликатов песен: {result['duplicate_songs_removed']}")
+    print(f"✅ Создано карточек для повторения: {result['reviews_created']}")
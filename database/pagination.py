@@ -0,0 +1,28 @@
+from typing import Any, List, Optional, Tuple
+from sqlmodel import Session
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+def paginate(
+    session: Session,
+    statement,
+    key_column,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: Optional[Any] = None
+) -> Tuple[List[Any], Optional[Any]]:
+    """Keyset-пагинация: `WHERE key > after ORDER BY key LIMIT limit + 1`.
+
+    Стоимость не зависит от номера страницы (в отличие от OFFSET).
+    Возвращает (строки страницы, курсор следующей страницы или None).
+    key_column должен быть уникальным (обычно первичный ключ).
+    """
+    if after is not None:
+        statement = statement.where(key_column > after)
+    rows = session.exec(statement.order_by(key_column).limit(limit + 1)).all()
+
+    if len(rows) <= limit:
+        return list(rows), None
+
+    rows = list(rows[:limit])
+    return rows, getattr(rows[-1], key_column.key)
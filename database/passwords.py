@@ -0,0 +1,147 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Формат хэша: scrypt$n$r$p$соль$хэш (соль и хэш в base64).
+# Строки без префикса — старые пароли в открытом виде; они принимаются
+# при входе и сразу перехэшируются.
+SCHEME = "scrypt"
+SCRYPT_N = int(os.getenv("LINGUATUNE_SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = int(os.getenv("LINGUATUNE_SCRYPT_R", "8"))
+SCRYPT_P = int(os.getenv("LINGUATUNE_SCRYPT_P", "1"))
+SALT_BYTES = 16
+HASH_BYTES = 64
+# scrypt требует 128 * r * n байт памяти; берем с запасом
+SCRYPT_MAXMEM = 256 * SCRYPT_R * SCRYPT_N
+
+# hashlib.scrypt отпускает GIL, поэтому хватает пула потоков:
+# хэширование идет параллельно и не блокирует event loop
+PASSWORD_WORKERS = int(os.getenv("LINGUATUNE_PASSWORD_WORKERS", str(os.cpu_count() or 2)))
+# Сколько операций может стоять в очереди пула; остальные ждут в event loop
+PASSWORD_MAX_PENDING = int(os.getenv("LINGUATUNE_PASSWORD_MAX_PENDING", str(PASSWORD_WORKERS * 4)))
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+# ========== СИНХРОННЫЕ ФУНКЦИИ (выполняются в пуле) ==========
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p,
+        maxmem=max(SCRYPT_MAXMEM, 256 * r * n), dklen=HASH_BYTES
+    )
+
+def hash_password_sync(password: str) -> str:
+    salt = secrets.token_bytes(SALT_BYTES)
+    digest = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return f"{SCHEME}${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(digest)}"
+
+def verify_password_sync(password: str, stored: str) -> bool:
+    if not stored:
+        return False
+    if not stored.startswith(SCHEME + "$"):
+        # Старая строка без хэша
+        return hmac.compare_digest(password.encode(), stored.encode())
+    try:
+        _, n, r, p, salt, digest = stored.split("$")
+        expected = base64.b64decode(digest)
+        actual = _scrypt(password, base64.b64decode(salt), int(n), int(r), int(p))
+    except (ValueError, TypeError):
+        return False
+    return hmac.compare_digest(actual, expected)
+
+def needs_rehash(stored: str) -> bool:
+    """True для паролей в открытом виде и хэшей со старыми параметрами"""
+    if not stored or not stored.startswith(SCHEME + "$"):
+        return True
+    return stored.split("$")[1:4] != [str(SCRYPT_N), str(SCRYPT_R), str(SCRYPT_P)]
+
+# ========== ПУЛ ==========
+class PasswordHasherPool:
+    """Пул потоков для scrypt с ограничением очереди и счетчиками"""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password")
+        self._slots = None
+        self.waiting = 0      # ждут места в очереди пула (в event loop)
+        self.pending = 0      # отправлены в пул (в очереди или выполняются)
+        self.max_waiting = 0
+        self.completed = 0
+        self.wait_seconds = 0.0
+        self.run_seconds = 0.0
+
+    async def run(self, func, *args):
+        # Семафор создается при первом вызове, уже внутри event loop
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.pending += 1
+        started_at = time.perf_counter()
+        self.wait_seconds += started_at - queued_at
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+            self.run_seconds += time.perf_counter() - started_at
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "waiting": self.waiting,
+            "pending": self.pending,
+            "max_waiting": self.max_waiting,
+            "completed": self.completed,
+            "avg_wait_ms": round(self.wait_seconds / self.completed * 1000, 2) if self.completed else 0,
+            "avg_run_ms": round(self.run_seconds / self.completed * 1000, 2) if self.completed else 0
+        }
+
+password_pool = PasswordHasherPool(PASSWORD_WORKERS, PASSWORD_MAX_PENDING)
+
+async def hash_password(password: str) -> str:
+    return await password_pool.run(hash_password_sync, password)
+
+async def verify_password(password: str, stored: str) -> bool:
+    if not stored or not stored.startswith(SCHEME + "$"):
+        # Старый пароль в открытом виде: сравнение дешевое, пул не нужен
+        return verify_password_sync(password, stored)
+    return await password_pool.run(verify_password_sync, password, stored)
+
+# ========== В ОБРАБОТЧИКАХ ЗАПРОСОВ ==========
+# scrypt считается десятки миллисекунд, а в очереди пула может ждать и
+# дольше. Открытая читающая транзакция все это время держала бы соединение
+# пула SQLAlchemy, и при волне входов соединения кончились бы у запросов,
+# которым хэширование не нужно. Поэтому перед хэшированием транзакция
+# завершается; загруженные объекты остаются доступны (expire_on_commit=False),
+# запись после хэширования идет в новой транзакции.
+async def hash_released(session: AsyncSession, password: str) -> str:
+    """hash_password, не держа соединение сессии"""
+    await session.commit()
+    return await hash_password(password)
+
+async def verify_released(session: AsyncSession, password: str, stored: str) -> bool:
+    """verify_password, не держа соединение сессии"""
+    await session.commit()
+    return await verify_password(password, stored)
+
+def password_pool_stats() -> dict:
+    return password_pool.stats()
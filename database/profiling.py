@@ -0,0 +1,186 @@
+import time
+from collections import Counter, OrderedDict, deque
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+from database.connection import engine, async_engine, async_read_engine, _env_bool, _env_int
+
+# ========== НАСТРОЙКИ ==========
+PROFILING_ENABLED = _env_bool("LINGUATUNE_PROFILING", True)
+# Запрос попадает в журнал медленных, если превышен любой из порогов
+SLOW_REQUEST_MS = _env_int("LINGUATUNE_SLOW_REQUEST_MS", 500)
+SLOW_REQUEST_QUERIES = _env_int("LINGUATUNE_SLOW_REQUEST_QUERIES", 20)
+# Сколько SQL-выражений одного запроса хранить для журнала
+MAX_RECORDED_STATEMENTS = 100
+# Сколько последних запросов по каждому эндпоинту учитывать в агрегатах
+ROLLING_WINDOW = _env_int("LINGUATUNE_PROFILING_WINDOW", 500)
+MAX_ENDPOINTS = 256
+SLOW_LOG_SIZE = 50
+# Ключ для запросов, не совпавших ни с одним маршрутом: сырой путь дал бы
+# неограниченное число эндпоинтов в агрегатах (и временных рядов в /metrics)
+UNMATCHED_ROUTE = "<unmatched>"
+
+class RequestProfile:
+    """Счетчики одного HTTP-запроса: SQL-выражения, время в базе, строки"""
+    __slots__ = ("started", "queries", "db_seconds", "rows", "statements")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+        self.statements = []
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def is_slow(self, seconds: float) -> bool:
+        return seconds * 1000 >= SLOW_REQUEST_MS or self.queries >= SLOW_REQUEST_QUERIES
+
+    def repeated_statements(self, limit: int = 10) -> list:
+        """Одинаковые выражения с числом повторов — так видно N+1"""
+        counts = Counter(statement for statement, _ in self.statements)
+        return [
+            {"statement": statement, "count": count}
+            for statement, count in counts.most_common(limit)
+        ]
+
+# Профиль текущего запроса; None вне HTTP-запроса (скрипты, миграции)
+_current: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+def start_request() -> RequestProfile:
+    profile = RequestProfile()
+    _current.set(profile)
+    return profile
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current.get()
+
+# ========== СОБЫТИЯ ДВИЖКОВ ==========
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("profiling_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    if profile is None:
+        return
+    started = conn.info["profiling_started"].pop()
+    duration = time.perf_counter() - started
+    profile.queries += 1
+    profile.db_seconds += duration
+    # Адаптер aiosqlite уже выбрал все строки SELECT в cursor._rows;
+    # для INSERT/UPDATE/DELETE считаем затронутые строки
+    rows = getattr(cursor, "_rows", None)
+    if rows is not None:
+        profile.rows += len(rows)
+    elif cursor.rowcount and cursor.rowcount > 0:
+        profile.rows += cursor.rowcount
+    if len(profile.statements) < MAX_RECORDED_STATEMENTS:
+        profile.statements.append((statement, duration))
+
+def _handle_error(context):
+    # after_cursor_execute не вызывается для упавшего выражения
+    if _current.get() is not None and context.connection is not None:
+        started = context.connection.info.get("profiling_started")
+        if started:
+            started.pop()
+
+def install_engine_hooks():
+    for target in (engine, async_engine.sync_engine, async_read_engine.sync_engine):
+        if not event.contains(target, "before_cursor_execute", _before_cursor_execute):
+            event.listen(target, "before_cursor_execute", _before_cursor_execute)
+            event.listen(target, "after_cursor_execute", _after_cursor_execute)
+            event.listen(target, "handle_error", _handle_error)
+
+# ========== АГРЕГАТЫ ==========
+class EndpointStats:
+    """Последние ROLLING_WINDOW запросов эндпоинта и общий счетчик"""
+    __slots__ = ("total", "slow", "samples")
+
+    def __init__(self):
+        self.total = 0
+        self.slow = 0
+        # (время обработки, время в базе, число запросов, строки)
+        self.samples = deque(maxlen=ROLLING_WINDOW)
+
+    def summary(self) -> dict:
+        handler = sorted(sample[0] for sample in self.samples)
+        count = len(self.samples)
+
+        def average(index: int) -> float:
+            return sum(sample[index] for sample in self.samples) / count
+
+        def at(fraction: float) -> float:
+            return handler[min(count - 1, int(round(fraction * (count - 1))))]
+
+        return {
+            "requests_total": self.total,
+            "slow_total": self.slow,
+            "window": count,
+            "handler_ms": {
+                "avg": round(average(0) * 1000, 2),
+                "p50": round(at(0.50) * 1000, 2),
+                "p95": round(at(0.95) * 1000, 2),
+                "max": round(handler[-1] * 1000, 2)
+            },
+            "db_ms_avg": round(average(1) * 1000, 2),
+            "queries_avg": round(average(2), 2),
+            "queries_max": max(sample[2] for sample in self.samples),
+            "rows_avg": round(average(3), 1)
+        }
+
+# "METHOD /route/{param}" -> EndpointStats
+_endpoints = OrderedDict()
+_slow_requests = deque(maxlen=SLOW_LOG_SIZE)
+
+def record_request(endpoint: str, status: int, profile: RequestProfile, seconds: float):
+    stats = _endpoints.get(endpoint)
+    if stats is None:
+        stats = _endpoints[endpoint] = EndpointStats()
+        while len(_endpoints) > MAX_ENDPOINTS:
+            _endpoints.popitem(last=False)
+    stats.total += 1
+    stats.samples.append((seconds, profile.db_seconds, profile.queries, profile.rows))
+
+    if not profile.is_slow(seconds):
+        return
+    stats.slow += 1
+    entry = {
+        "endpoint": endpoint,
+        "status": status,
+        "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "handler_ms": round(seconds * 1000, 2),
+        "db_ms": round(profile.db_seconds * 1000, 2),
+        "queries": profile.queries,
+        "rows": profile.rows,
+        "statements": profile.repeated_statements()
+    }
+    _slow_requests.append(entry)
+    print(
+        f"🐢 Медленный запрос {endpoint} ({status}): {entry['handler_ms']} мс, "
+        f"SQL: {profile.queries} за {entry['db_ms']} мс, строк: {profile.rows}"
+    )
+    for item in entry["statements"][:5]:
+        print(f"   ×{item['count']} {' '.join(item['statement'].split())[:200]}")
+
+def profiling_stats() -> dict:
+    return {
+        "enabled": PROFILING_ENABLED,
+        "thresholds": {"slow_ms": SLOW_REQUEST_MS, "slow_queries": SLOW_REQUEST_QUERIES},
+        "endpoints": {
+            endpoint: stats.summary()
+            for endpoint, stats in sorted(_endpoints.items())
+            if stats.samples
+        },
+        "slow_requests": list(reversed(_slow_requests))
+    }
+
+def reset_profiling_stats():
+    _endpoints.clear()
+    _slow_requests.clear()
+
+if PROFILING_ENABLED:
+    install_engine_hooks()
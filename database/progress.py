@@ -0,0 +1,128 @@
+from typing import List, Set
+from datetime import datetime
+from sqlmodel import Session, select, func, delete
+from sqlalchemy import DateTime, Integer, exists, literal
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import aliased
+
+from models.progress import UserSongProgress
+from models.songs import Song
+from database import stats
+from database.reviews import add_song_reviews
+
+# ========== ЧТЕНИЕ ==========
+def get_learned_song_ids(session: Session, user_id: int) -> List[int]:
+    """ID изученных песен пользователя в порядке изучения"""
+    return list(session.exec(
+        select(UserSongProgress.song_id)
+        .where(UserSongProgress.user_id == user_id)
+        .order_by(UserSongProgress.learned_at, UserSongProgress.id)
+    ).all())
+
+def get_learned_song_id_set(session: Session, user_id: int) -> Set[int]:
+    """Множество ID изученных песен (для проверок `in` на страницах)"""
+    return set(session.exec(
+        select(UserSongProgress.song_id).where(UserSongProgress.user_id == user_id)
+    ).all())
+
+def get_learned_among(session: Session, user_id: int, song_ids: List[int]) -> Set[int]:
+    """Какие из переданных песен изучены (для страницы списка)"""
+    if not song_ids:
+        return set()
+    return set(session.exec(
+        select(UserSongProgress.song_id).where(
+            (UserSongProgress.user_id == user_id) &
+            (UserSongProgress.song_id.in_(song_ids))
+        )
+    ).all())
+
+def count_learned_songs(session: Session, user_id: int) -> int:
+    return session.exec(
+        select(func.count()).select_from(UserSongProgress)
+        .where(UserSongProgress.user_id == user_id)
+    ).one()
+
+def is_song_learned(session: Session, user_id: int, song_id: int) -> bool:
+    return session.exec(
+        select(UserSongProgress.id).where(
+            (UserSongProgress.user_id == user_id) &
+            (UserSongProgress.song_id == song_id)
+        )
+    ).first() is not None
+
+# ========== ЗАПИСЬ ==========
+def mark_learned(session: Session, user_id: int, song_id: int) -> bool:
+    """Отметить песню изученной. Возвращает False, если отметка уже была
+    или песни нет.
+
+    Внешние ключи SQLite не проверяет, поэтому строка вставляется через
+    SELECT из song: отметка о несуществующей песне не появится и не
+    изменит счетчики. Коммит остается за вызывающим кодом; счетчики
+    статистики и новые слова в очереди повторения пишутся в той же
+    транзакции.
+    """
+    result = session.exec(
+        sqlite_insert(UserSongProgress)
+        .from_select(
+            ["user_id", "song_id", "learned_at"],
+            select(literal(user_id, Integer), Song.id, literal(datetime.now(), DateTime))
+            .where(Song.id == song_id)
+        )
+        .on_conflict_do_nothing(index_elements=["user_id", "song_id"])
+    )
+    if result.rowcount == 0:
+        return False
+
+    stats.bump(session, stats.LEARNED_SONGS, 1)
+    if count_learned_songs(session, user_id) == 1:
+        stats.bump(session, stats.USERS_WITH_PROGRESS, 1)
+    # Снятие отметки карточки не удаляет: выученные слова остаются в повторении
+    add_song_reviews(session, user_id, song_id)
+    return True
+
+def unmark_learned(session: Session, user_id: int, song_id: int) -> bool:
+    """Снять отметку. Возвращает False, если песня не была изучена"""
+    result = session.exec(
+        delete(UserSongProgress).where(
+            (UserSongProgress.user_id == user_id) &
+            (UserSongProgress.song_id == song_id)
+        )
+    )
+    if result.rowcount == 0:
+        return False
+
+    stats.bump(session, stats.LEARNED_SONGS, -1)
+    if count_learned_songs(session, user_id) == 0:
+        stats.bump(session, stats.USERS_WITH_PROGRESS, -1)
+    return True
+
+def delete_song_progress(session: Session, song_id: int) -> int:
+    """Удалить отметки о песне у всех пользователей"""
+    # Пользователи, у которых это единственная изученная песня
+    other = aliased(UserSongProgress)
+    users_left_without_progress = session.exec(
+        select(func.count()).select_from(UserSongProgress).where(
+            (UserSongProgress.song_id == song_id) &
+            ~exists().where(
+                (other.user_id == UserSongProgress.user_id) &
+                (other.song_id != song_id)
+            )
+        )
+    ).one()
+
+    result = session.exec(
+        delete(UserSongProgress).where(UserSongProgress.song_id == song_id)
+    )
+    stats.bump(session, stats.LEARNED_SONGS, -result.rowcount)
+    stats.bump(session, stats.USERS_WITH_PROGRESS, -users_left_without_progress)
+    return result.rowcount
+
+def delete_user_progress(session: Session, user_id: int) -> int:
+    """Удалить весь прогресс пользователя"""
+    result = session.exec(
+        delete(UserSongProgress).where(UserSongProgress.user_id == user_id)
+    )
+    if result.rowcount:
+        stats.bump(session, stats.LEARNED_SONGS, -result.rowcount)
+        stats.bump(session, stats.USERS_WITH_PROGRESS, -1)
+    return result.rowcount
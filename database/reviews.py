@@ -0,0 +1,215 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import DateTime, Float, Integer, bindparam, literal, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select, func, delete
+
+from models.reviews import VocabularyReview, ReviewAnswer
+from models.progress import UserSongProgress
+from models.vocabulary import SongVocabulary
+from database.loaders import SQLITE_MAX_VARIABLES
+
+# ========== ПАРАМЕТРЫ SM-2 ==========
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+# Ответ ниже этого качества — "забыл": повторения начинаются заново
+PASSING_QUALITY = 3
+# Интервалы первых двух успешных повторений, дни
+FIRST_INTERVAL_DAYS = 1
+SECOND_INTERVAL_DAYS = 6
+
+DEFAULT_DUE_LIMIT = 20
+MAX_DUE_LIMIT = 200
+
+def schedule_review(
+    ease_factor: float,
+    interval_days: int,
+    repetitions: int,
+    quality: int
+) -> Tuple[float, int, int]:
+    """Следующее состояние карточки по SM-2: (ease_factor, interval_days, repetitions)"""
+    if quality < PASSING_QUALITY:
+        repetitions = 0
+        interval_days = FIRST_INTERVAL_DAYS
+    else:
+        if repetitions == 0:
+            interval_days = FIRST_INTERVAL_DAYS
+        elif repetitions == 1:
+            interval_days = SECOND_INTERVAL_DAYS
+        else:
+            interval_days = max(1, round(interval_days * ease_factor))
+        repetitions += 1
+    miss = 5 - quality
+    ease_factor = max(MIN_EASE, ease_factor + 0.1 - miss * (0.08 + miss * 0.02))
+    return round(ease_factor, 4), interval_days, repetitions
+
+# ========== СОЗДАНИЕ КАРТОЧЕК ==========
+def _new_review_columns(user_id, now: datetime) -> list:
+    """Столбцы SELECT для новых карточек из строк song_vocabulary"""
+    return [
+        user_id,
+        SongVocabulary.word_key,
+        SongVocabulary.word,
+        SongVocabulary.language,
+        literal(DEFAULT_EASE, Float),
+        literal(0, Integer),
+        literal(0, Integer),
+        literal(0, Integer),
+        # Новые слова сразу доступны для повторения
+        literal(now, DateTime),
+        literal(now, DateTime)
+    ]
+
+_REVIEW_INSERT_COLUMNS = [
+    "user_id", "word_key", "word", "language",
+    "ease_factor", "interval_days", "repetitions", "lapses", "due_at", "created_at"
+]
+
+def add_song_reviews(session: Session, user_id: int, song_id: int) -> int:
+    """Поставить в очередь слова изученной песни; уже известные слова пропускаются.
+
+    Одна инструкция INSERT ... SELECT по словарному индексу песни.
+    """
+    result = session.exec(
+        sqlite_insert(VocabularyReview)
+        .from_select(
+            _REVIEW_INSERT_COLUMNS,
+            select(*_new_review_columns(literal(user_id, Integer), datetime.now()))
+            .where(SongVocabulary.song_id == song_id)
+        )
+        .on_conflict_do_nothing()
+    )
+    return result.rowcount
+
+def backfill_reviews(session: Session) -> int:
+    """Карточки для всех уже изученных песен (первичное заполнение)"""
+    result = session.exec(
+        sqlite_insert(VocabularyReview)
+        .from_select(
+            _REVIEW_INSERT_COLUMNS,
+            select(*_new_review_columns(UserSongProgress.user_id, datetime.now()))
+            .join(SongVocabulary, SongVocabulary.song_id == UserSongProgress.song_id)
+            # Одно слово встречается в нескольких песнях пользователя
+            .group_by(UserSongProgress.user_id, SongVocabulary.language, SongVocabulary.word_key)
+        )
+        .on_conflict_do_nothing()
+    )
+    return result.rowcount
+
+def reviews_initialized(session: Session) -> bool:
+    """Есть ли карточки — или нечего заполнять (никто ничего не изучил)"""
+    has_reviews = session.exec(select(VocabularyReview.id).limit(1)).first() is not None
+    has_progress = session.exec(select(UserSongProgress.id).limit(1)).first() is not None
+    return has_reviews or not has_progress
+
+def delete_user_reviews(session: Session, user_id: int) -> int:
+    result = session.exec(
+        delete(VocabularyReview).where(VocabularyReview.user_id == user_id)
+    )
+    return result.rowcount
+
+# ========== ОЧЕРЕДЬ ==========
+def get_due_reviews(session: Session, user_id: int, limit: int, now: Optional[datetime] = None) -> List[VocabularyReview]:
+    """Карточки, которые пора повторить, самые просроченные первыми.
+
+    Условие и сортировка совпадают с индексом (user_id, due_at): это
+    просмотр диапазона индекса, без сортировки и без чтения чужих карточек.
+    """
+    now = now or datetime.now()
+    return list(session.exec(
+        select(VocabularyReview)
+        .where((VocabularyReview.user_id == user_id) & (VocabularyReview.due_at <= now))
+        .order_by(VocabularyReview.due_at)
+        .limit(limit)
+    ).all())
+
+def count_due_reviews(session: Session, user_id: int, now: Optional[datetime] = None) -> int:
+    now = now or datetime.now()
+    return session.exec(
+        select(func.count()).select_from(VocabularyReview)
+        .where((VocabularyReview.user_id == user_id) & (VocabularyReview.due_at <= now))
+    ).one()
+
+def next_due_at(session: Session, user_id: int) -> Optional[datetime]:
+    """Когда станет доступна ближайшая карточка (первый элемент индекса)"""
+    return session.exec(
+        select(func.min(VocabularyReview.due_at)).where(VocabularyReview.user_id == user_id)
+    ).one()
+
+# ========== ОТВЕТЫ ==========
+def answer_reviews(session: Session, user_id: int, answers: List[ReviewAnswer]) -> Tuple[List[dict], List[int]]:
+    """Записать пачку ответов: один SELECT на куски ID и один executemany UPDATE.
+
+    Возвращает новые состояния карточек и ID, которых у пользователя нет.
+    Коммит остается за вызывающим кодом.
+    """
+    now = datetime.now()
+    ids = list(dict.fromkeys(answer.id for answer in answers))
+    states: Dict[int, dict] = {}
+    for start in range(0, len(ids), SQLITE_MAX_VARIABLES):
+        rows = session.exec(
+            select(
+                VocabularyReview.id, VocabularyReview.word, VocabularyReview.language,
+                VocabularyReview.ease_factor, VocabularyReview.interval_days,
+                VocabularyReview.repetitions, VocabularyReview.lapses
+            ).where(
+                (VocabularyReview.user_id == user_id) &
+                (VocabularyReview.id.in_(ids[start:start + SQLITE_MAX_VARIABLES]))
+            )
+        ).all()
+        for review_id, word, language, ease_factor, interval_days, repetitions, lapses in rows:
+            states[review_id] = {
+                "id": review_id,
+                "word": word,
+                "language": language,
+                "ease_factor": ease_factor,
+                "interval_days": interval_days,
+                "repetitions": repetitions,
+                "lapses": lapses
+            }
+
+    # Несколько ответов на одну карточку применяются по порядку
+    missing = []
+    for answer in answers:
+        state = states.get(answer.id)
+        if state is None:
+            missing.append(answer.id)
+            continue
+        state["ease_factor"], state["interval_days"], state["repetitions"] = schedule_review(
+            state["ease_factor"], state["interval_days"], state["repetitions"], answer.quality
+        )
+        if answer.quality < PASSING_QUALITY:
+            state["lapses"] += 1
+        state["quality"] = answer.quality
+        state["due_at"] = now + timedelta(days=state["interval_days"])
+        state["last_reviewed_at"] = now
+
+    updated = [state for state in states.values() if "due_at" in state]
+    if updated:
+        table = VocabularyReview.__table__
+        session.exec(
+            update(table)
+            .where(table.c.id == bindparam("review_id"))
+            .values(
+                ease_factor=bindparam("ease_factor"),
+                interval_days=bindparam("interval_days"),
+                repetitions=bindparam("repetitions"),
+                lapses=bindparam("lapses"),
+                due_at=bindparam("due_at"),
+                last_reviewed_at=bindparam("last_reviewed_at")
+            ),
+            params=[
+                {
+                    "review_id": state["id"],
+                    "ease_factor": state["ease_factor"],
+                    "interval_days": state["interval_days"],
+                    "repetitions": state["repetitions"],
+                    "lapses": state["lapses"],
+                    "due_at": state["due_at"],
+                    "last_reviewed_at": state["last_reviewed_at"]
+                }
+                for state in updated
+            ]
+        )
+    return updated, list(dict.fromkeys(missing))
@@ -0,0 +1,152 @@
+import sys
+import re
+from pathlib import Path
+
+# Добавляем родительскую директорию в путь Python
+current_dir = Path(__file__).parent
+project_root = current_dir.parent
+sys.path.append(str(project_root))
+
+from typing import List, Optional
+from sqlalchemy import text
+from sqlmodel import Session
+
+# Полнотекстовый индекс по песням (FTS5, external content = таблица song).
+# Индекс хранит только токены, сами тексты берутся из song по rowid = song.id.
+SONG_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS song_fts USING fts5(
+        title, artist, lyrics_original, lyrics_translation,
+        content='song', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    # Триггеры держат индекс в синхронизации с таблицей song
+    """
+    CREATE TRIGGER IF NOT EXISTS song_fts_ai AFTER INSERT ON song BEGIN
+        INSERT INTO song_fts(rowid, title, artist, lyrics_original, lyrics_translation)
+        VALUES (new.id, new.title, new.artist, new.lyrics_original, new.lyrics_translation);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS song_fts_ad AFTER DELETE ON song BEGIN
+        INSERT INTO song_fts(song_fts, rowid, title, artist, lyrics_original, lyrics_translation)
+        VALUES ('delete', old.id, old.title, old.artist, old.lyrics_original, old.lyrics_translation);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS song_fts_au
+    AFTER UPDATE OF title, artist, lyrics_original, lyrics_translation ON song BEGIN
+        INSERT INTO song_fts(song_fts, rowid, title, artist, lyrics_original, lyrics_translation)
+        VALUES ('delete', old.id, old.title, old.artist, old.lyrics_original, old.lyrics_translation);
+        INSERT INTO song_fts(rowid, title, artist, lyrics_original, lyrics_translation)
+        VALUES (new.id, new.title, new.artist, new.lyrics_original, new.lyrics_translation);
+    END
+    """
+]
+
+# Веса колонок для bm25: совпадение в названии важнее, чем в тексте
+BM25_WEIGHTS = "10.0, 5.0, 1.0, 1.0"
+
+HIGHLIGHT_OPEN = "<mark>"
+HIGHLIGHT_CLOSE = "</mark>"
+SNIPPET_TOKENS = 12
+
+def song_fts_exists(session: Session) -> bool:
+    return session.exec(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'song_fts'"
+    )).first() is not None
+
+def create_song_fts(session: Session) -> bool:
+    """Создать индекс и триггеры. Возвращает True, если индекс создан впервые"""
+    created = not song_fts_exists(session)
+    for statement in SONG_FTS_DDL:
+        session.exec(text(statement))
+    if created:
+        rebuild_song_fts(session)
+    return created
+
+def rebuild_song_fts(session: Session):
+    """Полностью перестроить индекс по текущему содержимому song"""
+    session.exec(text("INSERT INTO song_fts(song_fts) VALUES ('rebuild')"))
+
+def build_match_query(query: str) -> Optional[str]:
+    """Превратить пользовательский ввод в безопасный запрос FTS5.
+
+    Каждое слово берется в кавычки (операторы FTS5 не интерпретируются),
+    слова объединяются через AND, последнее ищется по префиксу.
+    """
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return None
+    quoted = ['"' + term.replace('"', '""') + '"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+def search_songs(
+    session: Session,
+    query: str,
+    language_id: Optional[int] = None,
+    difficulty: Optional[str] = None,
+    limit: int = 20
+) -> List[dict]:
+    """Поиск песен по названию, исполнителю и текстам с ранжированием bm25.
+
+    Язык задается ID (разрешает вызывающий), сложность — без учета регистра.
+    """
+    match = build_match_query(query)
+    if match is None:
+        return []
+
+    filters = ""
+    params = {
+        "match": match,
+        "limit": limit,
+        "open": HIGHLIGHT_OPEN,
+        "close": HIGHLIGHT_CLOSE,
+        "tokens": SNIPPET_TOKENS
+    }
+    if language_id is not None:
+        filters += " AND song.language_id = :language_id"
+        params["language_id"] = language_id
+    if difficulty:
+        filters += " AND lower(song.difficulty) = :difficulty"
+        params["difficulty"] = difficulty.strip().lower()
+
+    rows = session.exec(text(f"""
+        SELECT song.id, song.title, song.artist, song.language, song.difficulty,
+               highlight(song_fts, 0, :open, :close) AS title_highlight,
+               snippet(song_fts, 2, :open, :close, '…', :tokens) AS lyrics_snippet,
+               snippet(song_fts, 3, :open, :close, '…', :tokens) AS translation_snippet,
+               bm25(song_fts, {BM25_WEIGHTS}) AS rank
+        FROM song_fts
+        JOIN song ON song.id = song_fts.rowid
+        WHERE song_fts MATCH :match{filters}
+        ORDER BY rank
+        LIMIT :limit
+    """), params=params).all()
+
+    return [
+        {
+            "id": row.id,
+            "title": row.title,
+            "artist": row.artist,
+            "language": row.language,
+            "difficulty": row.difficulty,
+            "title_highlight": row.title_highlight,
+            "lyrics_snippet": row.lyrics_snippet,
+            "translation_snippet": row.translation_snippet,
+            # bm25 в SQLite отрицательный: чем меньше, тем релевантнее
+            "score": round(-row.rank, 4)
+        }
+        for row in rows
+    ]
+
+if __name__ == "__main__":
+    from database.connection import engine
+
+    with Session(engine) as session:
+        if not create_song_fts(session):
+            rebuild_song_fts(session)
+        session.commit()
+    print("✅ Поисковый индекс песен перестроен")
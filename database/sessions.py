@@ -0,0 +1,179 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlmodel import Session, select, delete
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database.connection import DB_PATH
+from models.sessions import UserSession
+from models.users import User
+
+SESSION_COOKIE = "linguatune_session"
+SESSION_TTL_DAYS = int(os.getenv("LINGUATUNE_SESSION_TTL_DAYS", "14"))
+SESSION_COOKIE_SECURE = os.getenv("LINGUATUNE_SESSION_COOKIE_SECURE", "").lower() in ("1", "true", "yes", "on")
+# Кэш сессий в памяти процесса. TTL ограничивает, как долго другой воркер
+# будет видеть уже завершенную (logout) сессию или старый профиль.
+SESSION_CACHE_TTL = float(os.getenv("LINGUATUNE_SESSION_CACHE_TTL", "30"))
+SESSION_CACHE_MAX_ENTRIES = 4096
+
+# ========== ПОДПИСЬ COOKIE ==========
+def _load_secret_key() -> bytes:
+    """Ключ подписи: из окружения или из файла рядом с базой.
+
+    Файл создается один раз и читается всеми воркерами, поэтому cookie,
+    выданная одним процессом, принимается и остальными.
+    """
+    secret = os.getenv("LINGUATUNE_SECRET_KEY")
+    if secret:
+        return secret.encode()
+
+    path = f"{DB_PATH}.secret"
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        with open(path, "rb") as file:
+            return file.read().strip()
+    with os.fdopen(fd, "wb") as file:
+        secret = secrets.token_urlsafe(48).encode()
+        file.write(secret)
+    return secret
+
+SECRET_KEY = _load_secret_key()
+
+def _signature(token: str) -> str:
+    digest = hmac.new(SECRET_KEY, token.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+def sign_token(token: str) -> str:
+    return f"{token}.{_signature(token)}"
+
+def unsign_token(cookie: Optional[str]) -> Optional[str]:
+    """Токен из cookie или None, если подпись не сходится (без запроса к базе)"""
+    if not cookie or "." not in cookie:
+        return None
+    token, signature = cookie.rsplit(".", 1)
+    if not hmac.compare_digest(signature, _signature(token)):
+        return None
+    return token
+
+def _token_hash(token: str) -> str:
+    # В базе только хэш: утечка таблицы не дает готовых cookie
+    return hashlib.sha256(token.encode()).hexdigest()
+
+# ========== ПРОФИЛЬ В КЭШЕ ==========
+class SessionUser:
+    """Профиль вошедшего пользователя (то, что нужно страницам)"""
+    __slots__ = ("id", "email", "full_name", "username", "current_language")
+
+    def __init__(self, user: User):
+        self.id = user.id
+        self.email = user.email
+        self.full_name = user.full_name
+        self.username = user.username
+        self.current_language = user.current_language
+
+# token_hash -> (время загрузки, срок сессии, SessionUser)
+_sessions = OrderedDict()
+_cache_counters = {"hits": 0, "misses": 0}
+
+def _cache_put(token_hash: str, expires_at: datetime, user: SessionUser):
+    _sessions[token_hash] = (time.monotonic(), expires_at, user)
+    _sessions.move_to_end(token_hash)
+    while len(_sessions) > SESSION_CACHE_MAX_ENTRIES:
+        _sessions.popitem(last=False)
+
+def session_cache_stats() -> dict:
+    return {"entries": len(_sessions), **_cache_counters}
+
+def clear_session_cache():
+    """Забыть все закэшированные сессии (после восстановления базы из копии)"""
+    _sessions.clear()
+
+def invalidate_user_sessions(user_id: int):
+    """Сбросить закэшированные профили пользователя (после изменения профиля)"""
+    for token_hash in [key for key, (_, _, user) in _sessions.items() if user.id == user_id]:
+        del _sessions[token_hash]
+
+# ========== ХРАНИЛИЩЕ ==========
+def create_session(session: Session, user: User) -> str:
+    """Создать сессию и вернуть значение cookie. Коммит за вызывающим кодом"""
+    token = secrets.token_urlsafe(32)
+    expires_at = datetime.now() + timedelta(days=SESSION_TTL_DAYS)
+    session.add(UserSession(token_hash=_token_hash(token), user_id=user.id, expires_at=expires_at))
+    # В кэш сессия попадет при первом запросе, уже после commit
+    return sign_token(token)
+
+def delete_session(session: Session, cookie: Optional[str]):
+    token = unsign_token(cookie)
+    if token is None:
+        return
+    token_hash = _token_hash(token)
+    _sessions.pop(token_hash, None)
+    session.exec(delete(UserSession).where(UserSession.token_hash == token_hash))
+
+def delete_user_sessions(session: Session, user_id: int):
+    """Завершить все сессии пользователя (удаление, смена пароля).
+
+    Другие воркеры перестанут принимать эти cookie не позже чем через
+    SESSION_CACHE_TTL. Коммит остается за вызывающим кодом.
+    """
+    invalidate_user_sessions(user_id)
+    session.exec(delete(UserSession).where(UserSession.user_id == user_id))
+
+def delete_expired_sessions(session: Session) -> int:
+    result = session.exec(delete(UserSession).where(UserSession.expires_at <= datetime.now()))
+    return result.rowcount
+
+def load_session_user(session: Session, token_hash: str):
+    row = session.exec(
+        select(UserSession.expires_at, User)
+        .join(User, User.id == UserSession.user_id)
+        .where(UserSession.token_hash == token_hash)
+    ).first()
+    if row is None:
+        return None
+    expires_at, user = row
+    return expires_at, SessionUser(user)
+
+async def resolve_session(
+    session: AsyncSession,
+    cookie: Optional[str],
+    fresh: bool = False
+) -> Optional[SessionUser]:
+    """Пользователь по cookie; при попадании в кэш база не читается.
+
+    fresh=True — всегда читать базу (сессия, завершенная в другом воркере,
+    не принимается даже в пределах SESSION_CACHE_TTL).
+    """
+    token = unsign_token(cookie)
+    if token is None:
+        return None
+    token_hash = _token_hash(token)
+
+    cached = None if fresh else _sessions.get(token_hash)
+    if cached is not None and time.monotonic() - cached[0] < SESSION_CACHE_TTL:
+        loaded_at, expires_at, user = cached
+        if expires_at <= datetime.now():
+            _sessions.pop(token_hash, None)
+            return None
+        _sessions.move_to_end(token_hash)
+        _cache_counters["hits"] += 1
+        return user
+
+    _cache_counters["misses"] += 1
+    row = await session.run_sync(load_session_user, token_hash)
+    if row is None:
+        _sessions.pop(token_hash, None)
+        return None
+    expires_at, user = row
+    if expires_at <= datetime.now():
+        return None
+    _cache_put(token_hash, expires_at, user)
+    return user
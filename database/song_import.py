@@ -0,0 +1,192 @@
+import codecs
+import csv
+import json
+from collections import Counter
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlmodel import Session, select
+
+from models.songs import Song
+from database import stats
+from database.loaders import SQLITE_MAX_VARIABLES
+from database.vocabulary import index_song_rows
+
+# Сколько строк файла разбирается и записывается одной транзакцией
+IMPORT_BATCH_ROWS = 1000
+# Больше ошибок в ответ не кладем (общее число все равно считается)
+MAX_REPORTED_ERRORS = 1000
+
+NDJSON = "ndjson"
+CSV = "csv"
+
+# ========== РАЗБОР ПОТОКА ==========
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Строки UTF-8 из потока байтов; чанк может оборваться посреди символа"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    tail = ""
+    async for chunk in chunks:
+        lines = (tail + decoder.decode(chunk)).split("\n")
+        tail = lines.pop()
+        for line in lines:
+            yield line
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+async def iter_ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """(номер строки, объект, ошибка) для каждой непустой строки NDJSON"""
+    line_no = 0
+    async for line in iter_lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"Некорректный JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "Ожидается JSON-объект"
+            continue
+        yield line_no, record, None
+
+def _csv_value(field: str, value: str):
+    if field == "vocabulary":
+        # Список слов: JSON-массив или слова через ";"
+        if value.lstrip().startswith("["):
+            return json.loads(value)
+        return [word.strip() for word in value.split(";") if word.strip()]
+    return value
+
+async def iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """(номер строки, объект, ошибка) для каждой записи CSV с заголовком.
+
+    Текст песни может содержать переводы строк внутри кавычек: строки
+    копятся, пока число кавычек не станет четным (запись закончилась).
+    """
+    header = None
+    line_no = 0
+    record_start = 0
+    buffer = []
+    quotes = 0
+    async for line in iter_lines(chunks):
+        line_no += 1
+        if not buffer:
+            record_start = line_no
+        buffer.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+
+        text, buffer, quotes = "\n".join(buffer), [], 0
+        if not text.strip():
+            continue
+        try:
+            values = next(csv.reader([text]))
+        except csv.Error as e:
+            yield record_start, None, f"Некорректная строка CSV: {e}"
+            continue
+
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield record_start, None, f"Ожидается {len(header)} колонок, получено {len(values)}"
+            continue
+        try:
+            record = {
+                field: _csv_value(field, value)
+                for field, value in zip(header, values)
+                if value != ""
+            }
+        except ValueError as e:
+            yield record_start, None, f"Некорректный словарь: {e}"
+            continue
+        yield record_start, record, None
+
+    if buffer:
+        yield record_start, None, "Незакрытые кавычки в конце файла"
+
+# ========== ЗАПИСЬ ==========
+def find_existing_songs(session: Session, keys: List[Tuple[str, str]], with_ids: bool = False):
+    """Какие пары (title, artist) уже есть в базе — запросами по индексу title.
+
+    С with_ids возвращает словарь (title, artist) -> id.
+    """
+    titles = list({title for title, _ in keys})
+    existing = {}
+    for start in range(0, len(titles), SQLITE_MAX_VARIABLES):
+        for song_id, title, artist in session.exec(
+            select(Song.id, Song.title, Song.artist)
+            .where(Song.title.in_(titles[start:start + SQLITE_MAX_VARIABLES]))
+        ).all():
+            existing[(title, artist)] = song_id
+    return existing if with_ids else set(existing)
+
+def import_song_batch(
+    session: Session,
+    rows: List[Tuple[int, dict]],
+    resolve_language: Callable,
+    seen: set
+) -> Dict[str, list]:
+    """Записать пачку уже проверенных песен (line_no, данные SongCreate).
+
+    Дубликаты (в базе, в файле) пропускаются, неизвестные языки идут в
+    ошибки. Если параллельная запись успела вставить ту же пару, уникальный
+    индекс ux_song_title_artist вызовет IntegrityError — пачку можно
+    повторить. Счетчики, словарный индекс и FTS (триггеры) обновляются в
+    той же транзакции; коммит остается за вызывающим кодом.
+    """
+    errors = []
+    duplicates = []
+    candidates = []
+    for line_no, data in rows:
+        language = resolve_language(data["language"])
+        if language is None:
+            errors.append({"line": line_no, "error": f"Неизвестный язык '{data['language']}'"})
+            continue
+        data["language"], data["language_id"] = language.name, language.id
+        candidates.append((line_no, data))
+
+    existing = find_existing_songs(session, [(data["title"], data["artist"]) for _, data in candidates])
+    values = []
+    keys = set()
+    for line_no, data in candidates:
+        key = (data["title"], data["artist"])
+        if key in existing or key in seen or key in keys:
+            duplicates.append(line_no)
+            continue
+        keys.add(key)
+        values.append(data)
+
+    if not values:
+        return {"inserted": [], "duplicates": duplicates, "errors": errors}
+
+    # Обычный executemany (RETURNING в SQLite вставлял бы по одной строке);
+    # ID новых песен читаем тем же пакетным запросом, пары уже уникальны
+    session.exec(insert(Song.__table__), params=values)
+    song_ids_by_key = find_existing_songs(session, [(data["title"], data["artist"]) for data in values], with_ids=True)
+    song_ids = [song_ids_by_key[(data["title"], data["artist"])] for data in values]
+
+    index_song_rows(session, (
+        (song_id, data["language"], data["language_id"], data.get("vocabulary"))
+        for song_id, data in zip(song_ids, values)
+    ))
+
+    by_language = Counter()
+    by_difficulty = Counter()
+    for data in values:
+        by_language[data["language"]] += 1
+        by_difficulty[(data.get("difficulty") or "").lower()] += 1
+
+    stats.bump(session, stats.SONGS, len(song_ids))
+    for language, count in by_language.items():
+        stats.bump(session, stats.SONGS_BY_LANGUAGE, count, key=language)
+    for difficulty, count in by_difficulty.items():
+        stats.bump(session, stats.SONGS_BY_DIFFICULTY, count, key=difficulty)
+
+    # Запоминаем ключи только после успешной записи: при IntegrityError
+    # пачка повторяется целиком
+    seen.update(keys)
+    return {"inserted": song_ids, "duplicates": duplicates, "errors": errors}
@@ -0,0 +1,28 @@
+from typing import Optional
+from sqlmodel import Session, select, delete
+
+from models.songs import Song
+from database import stats
+from database.progress import delete_song_progress
+from database.vocabulary import remove_song_vocabulary
+
+def delete_song(session: Session, song_id: int) -> Optional[dict]:
+    """Удалить песню вместе со всеми ссылками на нее; None, если песни нет.
+
+    Каждая зависимая таблица чистится одним DELETE по индексу song_id,
+    так что затрагиваются только пользователи, изучавшие песню. Строку
+    поискового индекса song_fts удаляет триггер. Коммит остается за
+    вызывающим кодом: вся цепочка и счетчики — одна транзакция.
+    """
+    row = session.exec(
+        select(Song.title, Song.language, Song.difficulty).where(Song.id == song_id)
+    ).first()
+    if row is None:
+        return None
+    title, language, difficulty = row
+
+    progress_removed = delete_song_progress(session, song_id)
+    remove_song_vocabulary(session, song_id)
+    session.exec(delete(Song).where(Song.id == song_id))
+    stats.bump_song(session, language, difficulty, -1)
+    return {"title": title, "progress_removed": progress_removed}
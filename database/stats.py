@@ -0,0 +1,142 @@
+import sys
+from pathlib import Path
+
+# Добавляем родительскую директорию в путь Python
+current_dir = Path(__file__).parent
+project_root = current_dir.parent
+sys.path.append(str(project_root))
+
+from sqlmodel import Session, select, func, delete
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models.stats import StatCounter
+from models.users import User
+from models.songs import Song
+from models.artists import Artist
+from models.languages import Language
+from models.progress import UserSongProgress
+
+# Имена счетчиков
+USERS = "users"
+SONGS = "songs"
+ARTISTS = "artists"
+LANGUAGES = "languages"
+LEARNED_SONGS = "learned_songs"
+USERS_WITH_PROGRESS = "users_with_progress"
+SONGS_BY_LANGUAGE = "songs_by_language"
+SONGS_BY_DIFFICULTY = "songs_by_difficulty"
+
+# ========== ОБНОВЛЕНИЕ ==========
+def bump(session: Session, name: str, delta: int = 1, key: str = ""):
+    """Атомарно изменить счетчик на delta.
+
+    Коммит остается за вызывающим кодом, поэтому счетчик меняется
+    в той же транзакции, что и сами данные.
+    """
+    if not delta:
+        return
+    table = StatCounter.__table__
+    session.exec(
+        sqlite_insert(StatCounter)
+        .values(name=name, key=key, value=delta)
+        .on_conflict_do_update(
+            index_elements=["name", "key"],
+            set_={"value": table.c.value + delta}
+        )
+    )
+
+def bump_song(session: Session, language: str, difficulty: str, delta: int):
+    """Учесть добавление (+1) или удаление (-1) песни"""
+    bump(session, SONGS, delta)
+    bump(session, SONGS_BY_LANGUAGE, delta, key=language)
+    bump(session, SONGS_BY_DIFFICULTY, delta, key=(difficulty or "").lower())
+
+def move_song(
+    session: Session,
+    old_language: str,
+    old_difficulty: str,
+    language: str,
+    difficulty: str
+):
+    """Учесть смену языка или сложности у существующей песни"""
+    if old_language != language:
+        bump(session, SONGS_BY_LANGUAGE, -1, key=old_language)
+        bump(session, SONGS_BY_LANGUAGE, 1, key=language)
+    old_difficulty = (old_difficulty or "").lower()
+    difficulty = (difficulty or "").lower()
+    if old_difficulty != difficulty:
+        bump(session, SONGS_BY_DIFFICULTY, -1, key=old_difficulty)
+        bump(session, SONGS_BY_DIFFICULTY, 1, key=difficulty)
+
+# ========== ЧТЕНИЕ ==========
+def get_stats(session: Session) -> dict:
+    """Все счетчики одним запросом к маленькой таблице"""
+    stats = {
+        USERS: 0,
+        SONGS: 0,
+        ARTISTS: 0,
+        LANGUAGES: 0,
+        LEARNED_SONGS: 0,
+        USERS_WITH_PROGRESS: 0,
+        SONGS_BY_LANGUAGE: {},
+        SONGS_BY_DIFFICULTY: {}
+    }
+    rows = session.exec(
+        select(StatCounter.name, StatCounter.key, StatCounter.value)
+    ).all()
+    for name, key, value in rows:
+        if key:
+            if value > 0:
+                stats.setdefault(name, {})[key] = value
+        else:
+            stats[name] = value
+    return stats
+
+# ========== ПЕРЕСЧЕТ ==========
+def rebuild_stats(session: Session) -> dict:
+    """Пересчитать все счетчики по таблицам (для сверки)"""
+    session.exec(delete(StatCounter))
+
+    def count(model) -> int:
+        return session.exec(select(func.count()).select_from(model)).one()
+
+    totals = {
+        USERS: count(User),
+        SONGS: count(Song),
+        ARTISTS: count(Artist),
+        LANGUAGES: count(Language),
+        LEARNED_SONGS: count(UserSongProgress),
+        USERS_WITH_PROGRESS: session.exec(
+            select(func.count(func.distinct(UserSongProgress.user_id)))
+        ).one()
+    }
+    rows = [{"name": name, "key": "", "value": value} for name, value in totals.items()]
+
+    for language, value in session.exec(
+        select(Song.language, func.count()).group_by(Song.language)
+    ).all():
+        rows.append({"name": SONGS_BY_LANGUAGE, "key": language, "value": value})
+
+    for difficulty, value in session.exec(
+        select(func.lower(Song.difficulty), func.count()).group_by(func.lower(Song.difficulty))
+    ).all():
+        rows.append({"name": SONGS_BY_DIFFICULTY, "key": difficulty, "value": value})
+
+    session.exec(sqlite_insert(StatCounter).values(rows))
+    return get_stats(session)
+
+def stats_initialized(session: Session) -> bool:
+    return session.exec(select(StatCounter.name).limit(1)).first() is not None
+
+if __name__ == "__main__":
+    from sqlmodel import SQLModel
+    from database.connection import engine
+
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        result = rebuild_stats(session)
+        session.commit()
+
+    print("✅ Статистика пересчитана")
+    for name, value in result.items():
+        print(f"   {name}: {value}")
@@ -0,0 +1,184 @@
+import sys
+import unicodedata
+from pathlib import Path
+
+# Добавляем родительскую директорию в путь Python
+current_dir = Path(__file__).parent
+project_root = current_dir.parent
+sys.path.append(str(project_root))
+
+from typing import Iterable, List, Optional, Tuple
+from sqlmodel import Session, select, func, delete
+from sqlalchemy import insert
+
+from models.songs import Song
+from models.vocabulary import SongVocabulary
+
+# Верхняя граница для поиска по префиксу: word_key >= p AND word_key < p + MAX_CHAR
+MAX_CHAR = "\U0010ffff"
+# Сколько строк словаря копить перед executemany при перестройке
+INSERT_BATCH_ROWS = 2000
+
+def normalize_word(word: str) -> str:
+    """Ключ слова: без регистра, диакритики и лишних пробелов (Amór -> amor)"""
+    decomposed = unicodedata.normalize("NFKD", word.casefold())
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.split())
+
+# ========== ОБНОВЛЕНИЕ ИНДЕКСА ==========
+def remove_song_vocabulary(session: Session, song_id: int) -> int:
+    result = session.exec(
+        delete(SongVocabulary).where(SongVocabulary.song_id == song_id)
+    )
+    return result.rowcount
+
+def _vocabulary_rows(
+    song_id: int,
+    language: str,
+    language_id: Optional[int],
+    vocabulary: List[str]
+) -> List[dict]:
+    rows = {}
+    for word in vocabulary or []:
+        key = normalize_word(word)
+        if key and key not in rows:
+            rows[key] = {
+                "song_id": song_id,
+                "word_key": key,
+                "word": word.strip(),
+                "language": language,
+                "language_id": language_id
+            }
+    return list(rows.values())
+
+def _insert_rows(session: Session, rows: List[dict]):
+    # executemany: один подготовленный INSERT, без сборки VALUES на каждую пачку
+    if rows:
+        session.exec(insert(SongVocabulary.__table__), params=rows)
+
+def index_song_vocabulary(session: Session, song: Song) -> int:
+    """Переиндексировать словарь одной песни (при создании и изменении).
+
+    Коммит остается за вызывающим кодом.
+    """
+    if song.id is None:
+        session.flush()
+    remove_song_vocabulary(session, song.id)
+
+    rows = _vocabulary_rows(song.id, song.language, song.language_id, song.vocabulary)
+    _insert_rows(session, rows)
+    return len(rows)
+
+def index_song_rows(session: Session, songs: Iterable[Tuple[int, str, Optional[int], List[str]]]) -> int:
+    """Проиндексировать словари пачки новых песен одним executemany.
+
+    songs — кортежи (song_id, language, language_id, vocabulary); старые
+    строки индекса не удаляются. Коммит остается за вызывающим кодом.
+    """
+    rows = []
+    for song_id, language, language_id, vocabulary in songs:
+        rows.extend(_vocabulary_rows(song_id, language, language_id, vocabulary))
+    _insert_rows(session, rows)
+    return len(rows)
+
+def rebuild_vocabulary_index(session: Session) -> int:
+    """Перестроить индекс по всем песням"""
+    session.exec(delete(SongVocabulary))
+    total = 0
+    batch = []
+    songs = session.exec(
+        select(Song.id, Song.language, Song.language_id, Song.vocabulary).execution_options(yield_per=1000)
+    )
+    for song_id, language, language_id, vocabulary in songs:
+        batch.extend(_vocabulary_rows(song_id, language, language_id, vocabulary))
+        if len(batch) >= INSERT_BATCH_ROWS:
+            _insert_rows(session, batch)
+            total += len(batch)
+            batch = []
+    _insert_rows(session, batch)
+    return total + len(batch)
+
+def vocabulary_index_initialized(session: Session) -> bool:
+    return session.exec(select(SongVocabulary.id).limit(1)).first() is not None
+
+# ========== ПОИСК ==========
+def find_songs_by_word(
+    session: Session,
+    word: str,
+    language_id: Optional[int] = None,
+    limit: int = 50
+) -> List[dict]:
+    """Песни, в словаре которых есть слово (точное совпадение ключа)"""
+    key = normalize_word(word)
+    if not key:
+        return []
+
+    statement = (
+        select(
+            Song.id, Song.title, Song.artist, Song.language, Song.difficulty,
+            SongVocabulary.word
+        )
+        .join(Song, Song.id == SongVocabulary.song_id)
+        .where(SongVocabulary.word_key == key)
+    )
+    if language_id is not None:
+        statement = statement.where(SongVocabulary.language_id == language_id)
+
+    rows = session.exec(statement.order_by(Song.id).limit(limit)).all()
+    return [
+        {
+            "id": song_id,
+            "title": title,
+            "artist": artist,
+            "language": song_language,
+            "difficulty": difficulty,
+            "word": original_word
+        }
+        for song_id, title, artist, song_language, difficulty, original_word in rows
+    ]
+
+def find_words_by_prefix(
+    session: Session,
+    prefix: str,
+    language_id: Optional[int] = None,
+    limit: int = 20
+) -> List[dict]:
+    """Слова словаря, начинающиеся с prefix, с числом песен (range scan по индексу)"""
+    key = normalize_word(prefix)
+    if not key:
+        return []
+
+    statement = (
+        select(
+            SongVocabulary.word_key,
+            func.min(SongVocabulary.word),
+            func.count(SongVocabulary.song_id)
+        )
+        .where(
+            (SongVocabulary.word_key >= key) &
+            (SongVocabulary.word_key < key + MAX_CHAR)
+        )
+    )
+    if language_id is not None:
+        statement = statement.where(SongVocabulary.language_id == language_id)
+
+    rows = session.exec(
+        statement
+        .group_by(SongVocabulary.word_key)
+        .order_by(SongVocabulary.word_key)
+        .limit(limit)
+    ).all()
+    return [
+        {"word": word, "word_key": word_key, "songs_count": songs_count}
+        for word_key, word, songs_count in rows
+    ]
+
+if __name__ == "__main__":
+    from sqlmodel import SQLModel
+    from database.connection import engine
+
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        total = rebuild_vocabulary_index(session)
+        session.commit()
+    print(f"✅ Словарный индекс перестроен, слов: {total}")
@@ -1,13 +1,34 @@
-from fastapi import FastAPI, Request, Form, Depends
+from fastapi import FastAPI, Request, Form, Depends, HTTPException
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse, RedirectResponse
-from sqlmodel import Session, select
-from database.connection import engine, create_db_and_tables, get_session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.connection import create_db_and_tables, get_async_session, get_async_read_session
+from database.loaders import load_songs_by_ids
+from database import stats as catalog_stats
+from database import catalog
+from database.admins import get_admin_principal, VIEW_STATS
+from database.passwords import (
+    hash_password, hash_released, verify_released, needs_rehash
+)
+from database.sessions import (
+    SessionUser, SESSION_COOKIE, SESSION_TTL_DAYS, SESSION_COOKIE_SECURE,
+    resolve_session, create_session, delete_session, delete_user_sessions,
+    invalidate_user_sessions
+)
+from routes.caching import catalog_cache_headers, not_modified, PRIVATE_CACHE
+from routes.profiling import RequestProfilingMiddleware
+from routes.metrics import MetricsMiddleware, metrics_router
+from database.progress import (
+    get_learned_song_ids, get_learned_song_id_set, get_learned_among,
+    is_song_learned, mark_learned
+)
 from models.users import User
 from models.songs import Song
 from models.languages import Language
 from models.artists import Artist
 from routes import auth, music, languages, progress, admin
+from typing import Optional
 import uvicorn
 import os
 
@@ -25,8 +46,15 @@ app = FastAPI(
     version="2.0.0"
 )
 
+# Счетчики SQL и время обработки каждого запроса (Server-Timing)
+app.add_middleware(RequestProfilingMiddleware)
+# Счетчики для Prometheus; добавлен последним, значит снаружи: видит все время запроса
+app.add_middleware(MetricsMiddleware)
+
 templates = Jinja2Templates(directory="templates")
-current_user = None
+
+# Сколько песен показывать на одной странице /songs
+SONGS_PAGE_SIZE = 20
 
 @app.on_event("startup")
 def on_startup():
@@ -37,6 +65,29 @@ app.include_router(music.music_router, prefix="/music")
 app.include_router(languages.language_router, prefix="/languages")
 app.include_router(progress.progress_router, prefix="/progress")
 app.include_router(admin.admin_router)
+app.include_router(metrics_router)
+
+# ========== СЕССИЯ ПОЛЬЗОВАТЕЛЯ ==========
+async def get_current_user(
+    request: Request,
+    session: AsyncSession = Depends(get_async_read_session)
+) -> Optional[SessionUser]:
+    """Вошедший пользователь текущего запроса (по cookie сессии) или None"""
+    return await resolve_session(session, request.cookies.get(SESSION_COOKIE))
+
+def email_of(user: Optional[SessionUser]) -> Optional[str]:
+    return user.email if user else None
+
+def set_session_cookie(response, cookie: str):
+    response.set_cookie(
+        SESSION_COOKIE,
+        cookie,
+        max_age=SESSION_TTL_DAYS * 24 * 60 * 60,
+        httponly=True,
+        samesite="lax",
+        secure=SESSION_COOKIE_SECURE
+    )
+    return response
 
 @app.get("/simple-profile")
 async def redirect_simple_profile():
@@ -47,29 +98,31 @@ async def redirect_old_reset_password():
     return RedirectResponse("/forgot-password", status_code=301)
 
 @app.get("/", response_class=HTMLResponse)
-async def read_root(request: Request, session: Session = Depends(get_session)):
-    global current_user
+async def read_root(
+    request: Request,
+    current_user: Optional[SessionUser] = Depends(get_current_user)
+):
     return templates.TemplateResponse("index.html", {
         "request": request,
-        "user_email": current_user
+        "user_email": email_of(current_user)
     })
 
 @app.get("/register", response_class=HTMLResponse)
 async def register_page(request: Request):
-    global current_user
     return templates.TemplateResponse("register.html", {"request": request})
 
 @app.get("/login", response_class=HTMLResponse)
 async def login_page(request: Request):
-    global current_user
     return templates.TemplateResponse("login.html", {"request": request})
 
 @app.get("/forgot-password", response_class=HTMLResponse)
-async def forgot_password_page(request: Request):
-    global current_user
+async def forgot_password_page(
+    request: Request,
+    current_user: Optional[SessionUser] = Depends(get_current_user)
+):
     return templates.TemplateResponse("forgot_password.html", {
         "request": request,
-        "user_email": current_user
+        "user_email": email_of(current_user)
     })
 
 @app.post("/auth/password/reset/request-web", response_class=HTMLResponse)
@@ -78,19 +131,18 @@ async def reset_password_request(
     email: str = Form(...),
     new_password: str = Form(...),
     confirm_password: str = Form(...),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Optional[SessionUser] = Depends(get_current_user)
 ):
-    global current_user
-    
     statement = select(User).where(User.email == email)
-    db_user = session.exec(statement).first()
+    db_user = (await session.exec(statement)).first()
     
     if not db_user:
         return templates.TemplateResponse("forgot_password.html", {
             "request": request,
             "message": "Пользователь с таким email не найден",
             "message_type": "error",
-            "user_email": current_user
+            "user_email": email_of(current_user)
         })
     
     if new_password != confirm_password:
@@ -98,7 +150,7 @@ async def reset_password_request(
             "request": request,
             "message": "Пароли не совпадают",
             "message_type": "error",
-            "user_email": current_user
+            "user_email": email_of(current_user)
         })
     
     if len(new_password) < 6:
@@ -106,46 +158,36 @@ async def reset_password_request(
             "request": request,
             "message": "Пароль должен быть не менее 6 символов",
             "message_type": "error",
-            "user_email": current_user
+            "user_email": email_of(current_user)
         })
     
-    db_user.password = new_password
+    db_user.password = await hash_released(session, new_password)
     session.add(db_user)
-    session.commit()
+    cookie = await session.run_sync(create_session, db_user)
+    await session.commit()
     
-    current_user = email
-    
-    return templates.TemplateResponse("forgot_password.html", {
+    response = templates.TemplateResponse("forgot_password.html", {
         "request": request,
         "message": f"Пароль для {email} успешно изменен! Вы вошли в систему.",
         "message_type": "success",
-        "user_email": current_user
+        "user_email": email
     })
+    return set_session_cookie(response, cookie)
 
 @app.get("/profile", response_class=HTMLResponse)
 async def profile_page(
     request: Request,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_read_session),
+    current_user: Optional[SessionUser] = Depends(get_current_user)
 ):
-    global current_user
-    
     if not current_user:
         return RedirectResponse("/login", status_code=303)
     
-    statement = select(User).where(User.email == current_user)
-    user = session.exec(statement).first()
-    
-    if not user:
-        return templates.TemplateResponse("error.html", {
-            "request": request,
-            "message": "Пользователь не найден",
-            "user_email": None
-        })
-    
+    # Профиль уже загружен вместе с сессией
     return templates.TemplateResponse("profile.html", {
         "request": request,
-        "user_email": current_user,
-        "user": user
+        "user_email": current_user.email,
+        "user": current_user
     })
 
 @app.post("/profile/update", response_class=HTMLResponse)
@@ -154,15 +196,13 @@ async def update_profile_web(
     full_name: str = Form(None),
     username: str = Form(None),
     current_language: str = Form(None),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Optional[SessionUser] = Depends(get_current_user)
 ):
-    global current_user
-    
     if not current_user:
         return RedirectResponse("/login", status_code=303)
     
-    statement = select(User).where(User.email == current_user)
-    user = session.exec(statement).first()
+    user = await session.get(User, current_user.id)
     
     if user:
         if full_name:
@@ -173,20 +213,23 @@ async def update_profile_web(
             user.current_language = current_language
         
         session.add(user)
-        session.commit()
+        await session.commit()
+        # Закэшированный с сессией профиль устарел
+        invalidate_user_sessions(user.id)
     
     return RedirectResponse("/profile", status_code=303)
 
 @app.get("/change-password", response_class=HTMLResponse)
-async def change_password_page(request: Request):
-    global current_user
-    
+async def change_password_page(
+    request: Request,
+    current_user: Optional[SessionUser] = Depends(get_current_user)
+):
     if not current_user:
         return RedirectResponse("/login", status_code=303)
     
     return templates.TemplateResponse("change_password.html", {
         "request": request,
-        "user_email": current_user
+        "user_email": email_of(current_user)
     })
 
 @app.post("/change-password", response_class=HTMLResponse)
@@ -195,27 +238,25 @@ async def change_password_web(
     current_password: str = Form(...),
     new_password: str = Form(...),
     confirm_password: str = Form(...),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Optional[SessionUser] = Depends(get_current_user)
 ):
-    global current_user
-    
     if not current_user:
         return RedirectResponse("/login", status_code=303)
     
-    statement = select(User).where(User.email == current_user)
-    user = session.exec(statement).first()
+    user = await session.get(User, current_user.id)
     
     if not user:
         return templates.TemplateResponse("error.html", {
             "request": request,
             "message": "Пользователь не найден",
-            "user_email": current_user
+            "user_email": email_of(current_user)
         })
     
-    if user.password != current_password:
+    if not await verify_released(session, current_password, user.password):
         return templates.TemplateResponse("change_password.html", {
             "request": request,
-            "user_email": current_user,
+            "user_email": email_of(current_user),
             "message": "Неверный текущий пароль",
             "message_type": "error"
         })
@@ -223,7 +264,7 @@ async def change_password_web(
     if new_password != confirm_password:
         return templates.TemplateResponse("change_password.html", {
             "request": request,
-            "user_email": current_user,
+            "user_email": email_of(current_user),
             "message": "Новые пароли не совпадают",
             "message_type": "error"
         })
@@ -231,33 +272,36 @@ async def change_password_web(
     if len(new_password) < 6:
         return templates.TemplateResponse("change_password.html", {
             "request": request,
-            "user_email": current_user,
+            "user_email": email_of(current_user),
             "message": "Пароль должен быть не менее 6 символов",
             "message_type": "error"
         })
     
-    user.password = new_password
+    user.password = await hash_password(new_password)
     session.add(user)
-    session.commit()
+    # Сессии со старым паролем (в том числе украденные cookie) завершаются,
+    # этот браузер получает новую
+    await session.run_sync(delete_user_sessions, user.id)
+    cookie = await session.run_sync(create_session, user)
+    await session.commit()
     
-    return templates.TemplateResponse("change_password.html", {
+    response = templates.TemplateResponse("change_password.html", {
         "request": request,
-        "user_email": current_user,
+        "user_email": email_of(current_user),
         "message": "Пароль успешно изменен!",
         "message_type": "success"
     })
+    return set_session_cookie(response, cookie)
 
 @app.get("/auth/signup")
 async def web_signup(
     request: Request,
     email: str,
     password: str,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
-    global current_user
-    
     statement = select(User).where(User.email == email)
-    existing_user = session.exec(statement).first()
+    existing_user = (await session.exec(statement)).first()
     
     if existing_user:
         return templates.TemplateResponse("register.html", {
@@ -268,29 +312,26 @@ async def web_signup(
     
     new_user = User(
         email=email,
-        password=password,
-        learned_songs=[],
-        favorite_songs=[]
+        password=await hash_released(session, password)
     )
     
     session.add(new_user)
-    session.commit()
+    await session.run_sync(catalog_stats.bump, catalog_stats.USERS, 1)
+    await session.flush()
+    cookie = await session.run_sync(create_session, new_user)
+    await session.commit()
     
-    current_user = email
-    
-    return RedirectResponse("/", status_code=303)
+    return set_session_cookie(RedirectResponse("/", status_code=303), cookie)
 
 @app.get("/auth/signin")
 async def web_signin(
     request: Request,
     email: str,
     password: str,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
-    global current_user
-    
     statement = select(User).where(User.email == email)
-    user = session.exec(statement).first()
+    user = (await session.exec(statement)).first()
     
     if not user:
         return templates.TemplateResponse("login.html", {
@@ -299,62 +340,68 @@ async def web_signin(
             "message_type": "error"
         })
     
-    if user.password != password:
+    if not await verify_released(session, password, user.password):
         return templates.TemplateResponse("login.html", {
             "request": request,
             "message": "Неверный пароль",
             "message_type": "error"
         })
     
-    current_user = email
+    # Старые пароли (открытый текст, прежние параметры) перехэшируем при входе
+    if needs_rehash(user.password):
+        user.password = await hash_password(password)
+        session.add(user)
+    
+    cookie = await session.run_sync(create_session, user)
+    await session.commit()
     
-    return RedirectResponse("/", status_code=303)
+    return set_session_cookie(RedirectResponse("/", status_code=303), cookie)
 
 @app.get("/logout")
-async def logout():
-    global current_user
-    current_user = None
-    return RedirectResponse("/", status_code=303)
+async def logout(
+    request: Request,
+    session: AsyncSession = Depends(get_async_session)
+):
+    await session.run_sync(delete_session, request.cookies.get(SESSION_COOKIE))
+    await session.commit()
+    response = RedirectResponse("/", status_code=303)
+    response.delete_cookie(SESSION_COOKIE)
+    return response
 
 @app.get("/learn/{song_id}")
 async def learn_song(
     song_id: int,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Optional[SessionUser] = Depends(get_current_user)
 ):
-    global current_user
-    
     if not current_user:
         return RedirectResponse("/login", status_code=303)
     
-    statement = select(User).where(User.email == current_user)
-    user = session.exec(statement).first()
+    song_exists = (await session.exec(select(Song.id).where(Song.id == song_id))).first()
+    if song_exists is None:
+        raise HTTPException(status_code=404, detail=f"Песня с ID {song_id} не найдена")
     
-    if not user:
-        return RedirectResponse("/login", status_code=303)
-    
-    if song_id not in user.learned_songs:
-        user.learned_songs.append(song_id)
-        session.add(user)
-        session.commit()
+    if await session.run_sync(mark_learned, current_user.id, song_id):
+        await session.commit()
     
     return RedirectResponse("/songs", status_code=303)
 
 @app.get("/songs", response_class=HTMLResponse)
 async def read_songs(
     request: Request,
-    session: Session = Depends(get_session)
+    after: Optional[int] = None,
+    session: AsyncSession = Depends(get_async_read_session),
+    current_user: Optional[SessionUser] = Depends(get_current_user)
 ):
-    global current_user
+    # Одна страница каталога (keyset по ID) из снимка в памяти
+    index = await catalog.get_catalog(session)
+    songs_data, next_cursor = index.page_songs(SONGS_PAGE_SIZE, after)
     
-    statement = select(Song)
-    songs_data = session.exec(statement).all()
-    
-    learned_songs = []
+    learned_songs = set()
     if current_user:
-        user_statement = select(User).where(User.email == current_user)
-        user = session.exec(user_statement).first()
-        if user:
-            learned_songs = user.learned_songs
+        learned_songs = await session.run_sync(
+            get_learned_among, current_user.id, [song.id for song in songs_data]
+        )
     
     songs_with_progress = []
     for song in songs_data:
@@ -365,88 +412,84 @@ async def read_songs(
     return templates.TemplateResponse("songs.html", {
         "request": request, 
         "songs": songs_with_progress,
-        "user_email": current_user
+        "learned_song_ids": learned_songs,
+        "next_cursor": next_cursor,
+        "is_first_page": after is None,
+        "user_email": email_of(current_user)
     })
 
 @app.get("/song/{song_id}", response_class=HTMLResponse)
 async def read_song(
     request: Request,
     song_id: int,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_read_session),
+    current_user: Optional[SessionUser] = Depends(get_current_user)
 ):
-    global current_user
-    
-    statement = select(Song).where(Song.id == song_id)
-    song = session.exec(statement).first()
+    index = await catalog.get_catalog(session)
+    song = index.get_song(song_id)
     
     if not song:
         return templates.TemplateResponse("error.html", {
             "request": request,
             "message": "Песня не найдена",
-            "user_email": current_user
+            "user_email": email_of(current_user)
         })
     
     is_learned = False
-    if current_user:
-        user_statement = select(User).where(User.email == current_user)
-        user = session.exec(user_statement).first()
-        if user and song_id in user.learned_songs:
-            is_learned = True
+    if current_user and await session.run_sync(is_song_learned, current_user.id, song_id):
+        is_learned = True
+    
+    # Страница зависит от каталога и от того, кто ее смотрит
+    headers = catalog_cache_headers(
+        index, PRIVATE_CACHE, variant=f"{email_of(current_user)}:{is_learned}"
+    )
+    headers["Vary"] = "Cookie"
+    cached = not_modified(request, headers)
+    if cached:
+        return cached
     
     song_dict = song.dict()
+    # Полный текст — только здесь, в снимке каталога его нет
+    song_dict.update(await session.run_sync(catalog.load_song_lyrics, song_id) or {})
     song_dict["is_learned"] = is_learned
     
     return templates.TemplateResponse("song_detail.html", {
         "request": request,
         "song": song_dict,
-        "user_email": current_user
-    })
+        "user_email": email_of(current_user)
+    }, headers=headers)
 
 @app.get("/languages", response_class=HTMLResponse)
 async def read_languages(
     request: Request,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_read_session),
+    current_user: Optional[SessionUser] = Depends(get_current_user)
 ):
-    global current_user
-    
-    statement = select(Language)
-    languages_data = session.exec(statement).all()
+    languages_data = (await catalog.get_catalog(session)).languages
     
     return templates.TemplateResponse("languages.html", {
         "request": request,
         "languages": languages_data,
-        "user_email": current_user
+        "user_email": email_of(current_user)
     })
 
 @app.get("/progress", response_class=HTMLResponse)
 async def read_progress(
     request: Request,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_read_session),
+    current_user: Optional[SessionUser] = Depends(get_current_user)
 ):
-    global current_user
-    
     if not current_user:
         return RedirectResponse("/login", status_code=303)
     
-    statement = select(User).where(User.email == current_user)
-    user = session.exec(statement).first()
+    learned_songs = await session.run_sync(get_learned_song_ids, current_user.id)
     
-    if not user:
-        return RedirectResponse("/login", status_code=303)
-    
-    learned_songs = user.learned_songs if user else []
+    total_songs = (await session.run_sync(catalog_stats.get_stats))[catalog_stats.SONGS]
     
-    statement = select(Song)
-    all_songs = session.exec(statement).all()
+    # Загружаем изученные песни одним запросом
+    learned_songs_data = await session.run_sync(load_songs_by_ids, learned_songs)
+    languages_learned = set(song.language for song in learned_songs_data)
     
-    languages_learned = set()
-    for song_id in learned_songs:
-        song_statement = select(Song).where(Song.id == song_id)
-        song = session.exec(song_statement).first()
-        if song:
-            languages_learned.add(song.language)
-    
-    total_songs = len(all_songs)
     completion_percentage = (len(learned_songs) / total_songs) * 100 if total_songs > 0 else 0
     
     stats = {
@@ -456,16 +499,11 @@ async def read_progress(
         "completion_percentage": round(completion_percentage, 1)
     }
     
-    learned_songs_info = []
-    for song_id in learned_songs:
-        song_statement = select(Song).where(Song.id == song_id)
-        song = session.exec(song_statement).first()
-        if song:
-            learned_songs_info.append(song.dict())
+    learned_songs_info = [song.dict() for song in learned_songs_data]
     
     return templates.TemplateResponse("progress.html", {
         "request": request,
-        "user_email": current_user,
+        "user_email": email_of(current_user),
         "stats": stats,
         "learned_songs": learned_songs_info,
         "total_songs": total_songs
@@ -475,19 +513,17 @@ async def read_progress(
 async def read_songs_by_language(
     request: Request,
     language: str,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_read_session),
+    current_user: Optional[SessionUser] = Depends(get_current_user)
 ):
-    global current_user
-    
-    statement = select(Song).where(Song.language == language)
-    filtered_songs = session.exec(statement).all()
+    # Код, русское или родное название -> канонический язык
+    index = await catalog.get_catalog(session)
+    language_record = index.resolve_language(language)
+    filtered_songs = index.songs_for_language(language_record.id) if language_record else []
     
-    learned_songs = []
+    learned_songs = set()
     if current_user:
-        user_statement = select(User).where(User.email == current_user)
-        user = session.exec(user_statement).first()
-        if user:
-            learned_songs = user.learned_songs
+        learned_songs = await session.run_sync(get_learned_song_id_set, current_user.id)
     
     songs_with_progress = []
     for song in filtered_songs:
@@ -498,53 +534,41 @@ async def read_songs_by_language(
     return templates.TemplateResponse("songs.html", {
         "request": request,
         "songs": songs_with_progress,
-        "user_email": current_user
+        "learned_song_ids": learned_songs,
+        "user_email": email_of(current_user)
     })
 
 @app.get("/admin/dashboard", response_class=HTMLResponse)
 async def admin_dashboard_page(
     request: Request,
-    admin_email: str = None,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_read_session),
+    current_user: Optional[SessionUser] = Depends(get_current_user)
 ):
-    global current_user
-    
-    if not admin_email:
-        admin_email = current_user
-    
-    if not admin_email:
+    if not current_user:
         return RedirectResponse("/login", status_code=303)
     
-    is_admin = admin_email == "admin@linguatune.com" or admin_email == "admin@linguature.com"
+    # Права администратора из кэша (таблица admin, право view_stats)
+    principal = await get_admin_principal(session, current_user.id)
     
-    if not is_admin:
-        return templates.TemplateResponse("error.html", {
-            "request": request,
-            "message": "Доступ запрещен. Требуются права администратора.",
-            "user_email": current_user
-        })
-    
-    user_statement = select(User)
-    users = session.exec(user_statement).all()
-    
-    song_statement = select(Song)
-    songs = session.exec(song_statement).all()
+    if principal is None or not principal.has(VIEW_STATS):
+        raise HTTPException(status_code=403, detail="Доступ запрещен. Требуются права администратора.")
     
-    language_statement = select(Language)
-    languages_data = session.exec(language_statement).all()
+    counters = await session.run_sync(catalog_stats.get_stats)
+    index = await catalog.get_catalog(session)
+    languages_data = index.languages
     
     stats = {
         "users": {
-            "total": len(users),
-            "with_progress": len([u for u in users if u.learned_songs]),
-            "active": len([u for u in users if u.learned_songs])
+            "total": counters[catalog_stats.USERS],
+            "with_progress": counters[catalog_stats.USERS_WITH_PROGRESS],
+            "active": counters[catalog_stats.USERS_WITH_PROGRESS]
         },
         "content": {
-            "songs": len(songs),
-            "languages": len(languages_data),
-            "artists": len(set([s.artist for s in songs]))
+            "songs": counters[catalog_stats.SONGS],
+            "languages": counters[catalog_stats.LANGUAGES],
+            "artists": index.artist_names_count()
         },
-        "songs_by_language": {},
+        "songs_by_language": counters[catalog_stats.SONGS_BY_LANGUAGE],
         "songs_by_difficulty": {
             "beginner": 0,
             "intermediate": 0,
@@ -552,16 +576,15 @@ async def admin_dashboard_page(
         }
     }
     
-    for song in songs:
-        lang = song.language
-        stats["songs_by_language"][lang] = stats["songs_by_language"].get(lang, 0) + 1
-        
-        diff = song.difficulty.lower()
+    for diff, count in counters[catalog_stats.SONGS_BY_DIFFICULTY].items():
         if diff in stats["songs_by_difficulty"]:
-            stats["songs_by_difficulty"][diff] += 1
+            stats["songs_by_difficulty"][diff] = count
+    
+    # Последние 10 добавленных песен
+    songs = index.recent_songs(10)
     
     songs_list = []
-    for song in songs[-10:]:
+    for song in songs:
         songs_list.append({
             "id": song.id,
             "title": song.title,
@@ -572,8 +595,7 @@ async def admin_dashboard_page(
     
     languages_list = []
     for lang in languages_data:
-        lang_statement = select(Song).where(Song.language == lang.name)
-        songs_count = len(session.exec(lang_statement).all())
+        songs_count = counters[catalog_stats.SONGS_BY_LANGUAGE].get(lang.name, 0)
         languages_list.append({
             "id": lang.id,
             "name": lang.name,
@@ -584,8 +606,8 @@ async def admin_dashboard_page(
     
     return templates.TemplateResponse("admin_dashboard.html", {
         "request": request,
-        "user_email": current_user,
-        "admin_email": admin_email,
+        "user_email": email_of(current_user),
+        "admin_email": principal.email,
         "stats": stats,
         "songs": songs_list,
         "languages": languages_list
@@ -3,5 +3,10 @@ from .songs import Song
 from .artists import Artist
 from .users import User
 from .admins import Admin
+from .progress import UserSongProgress
+from .stats import StatCounter
+from .vocabulary import SongVocabulary
+from .sessions import UserSession
+from .reviews import VocabularyReview
 
-__all__ = ["Language", "Song", "Artist", "User", "Admin"]
\ No newline at end of file
+__all__ = ["Language", "Song", "Artist", "User", "Admin", "UserSongProgress", "StatCounter", "SongVocabulary", "UserSession", "VocabularyReview"]
\ No newline at end of file
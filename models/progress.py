@@ -0,0 +1,16 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+from sqlalchemy import UniqueConstraint
+
+class UserSongProgress(SQLModel, table=True):
+    """Изученная пользователем песня (одна строка на пару пользователь–песня)"""
+    __tablename__ = "user_song_progress"
+    __table_args__ = (
+        UniqueConstraint("user_id", "song_id", name="uq_user_song_progress_user_song"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id")
+    song_id: int = Field(foreign_key="song.id", index=True)
+    learned_at: datetime = Field(default_factory=datetime.now)
@@ -0,0 +1,43 @@
+from sqlmodel import SQLModel, Field
+from typing import List, Optional
+from datetime import datetime
+from pydantic import BaseModel
+from sqlalchemy import Index, UniqueConstraint
+
+# ========== МОДЕЛЬ ДЛЯ БАЗЫ ДАННЫХ ==========
+class VocabularyReview(SQLModel, table=True):
+    """Слово из словаря изученных песен в очереди повторения (SM-2)"""
+    __tablename__ = "vocabulary_review"
+    __table_args__ = (
+        UniqueConstraint("user_id", "language", "word_key", name="uq_vocabulary_review_user_word"),
+        # Очередь "к повторению" — диапазон по этому индексу
+        Index("ix_vocabulary_review_user_due", "user_id", "due_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # Отдельный индекс не нужен: оба составных индекса начинаются с user_id
+    user_id: int = Field(foreign_key="user.id")
+    # Ключ и написание слова — как в song_vocabulary
+    word_key: str
+    word: str
+    language: str
+
+    # Состояние SM-2
+    ease_factor: float = 2.5
+    interval_days: int = 0
+    repetitions: int = 0
+    lapses: int = 0
+    due_at: datetime = Field(default_factory=datetime.now)
+    last_reviewed_at: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+
+# ========== МОДЕЛИ ДЛЯ ЗАПРОСОВ ==========
+class ReviewAnswer(BaseModel):
+    """Ответ на одно повторение: качество вспоминания по шкале SM-2"""
+    id: int
+    # 0 — не вспомнил, 3 — с трудом, 5 — сразу
+    quality: int = Field(ge=0, le=5)
+
+class ReviewAnswers(BaseModel):
+    """Пачка ответов, записывается одной транзакцией"""
+    answers: List[ReviewAnswer] = Field(min_length=1, max_length=500)
@@ -0,0 +1,11 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+
+class UserSession(SQLModel, table=True):
+    """Сессия входа на сайт. В cookie лежит подписанный токен, здесь — его хэш"""
+    __tablename__ = "user_session"
+
+    token_hash: str = Field(primary_key=True)
+    user_id: int = Field(foreign_key="user.id", index=True)
+    created_at: datetime = Field(default_factory=datetime.now)
+    expires_at: datetime = Field(index=True)
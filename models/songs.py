@@ -1,6 +1,6 @@
 from sqlmodel import SQLModel, Field, Column
 from typing import List, Optional
-from sqlalchemy import JSON
+from sqlalchemy import JSON, Index
 
 class SongBase(SQLModel):
     title: str
@@ -13,10 +13,17 @@ class SongBase(SQLModel):
     duration: int
 
 class Song(SongBase, table=True):
+    # Одна песня на пару (название, исполнитель): дубликаты отсекает сама база
+    __table_args__ = (
+        Index("ux_song_title_artist", "title", "artist", unique=True),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str = Field(index=True)
     artist: str = Field(index=True)
     language: str = Field(index=True)
+    # Канонический язык песни; language хранит его название для отображения
+    language_id: Optional[int] = Field(default=None, foreign_key="language.id", index=True)
     lyrics_original: str
     lyrics_translation: str
     difficulty: str = Field(default="intermediate")
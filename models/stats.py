@@ -0,0 +1,11 @@
+from sqlmodel import SQLModel, Field
+
+class StatCounter(SQLModel, table=True):
+    """Материализованный счетчик для статистики (обновляется при записи)"""
+    __tablename__ = "stat_counter"
+
+    # Имя счетчика: "users", "songs", "songs_by_language", ...
+    name: str = Field(primary_key=True)
+    # Ключ группировки (название языка, сложность); "" для общих итогов
+    key: str = Field(default="", primary_key=True)
+    value: int = Field(default=0)
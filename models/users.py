@@ -1,6 +1,5 @@
-from sqlmodel import SQLModel, Field, Column
-from typing import Optional, List
-from sqlalchemy import JSON
+from sqlmodel import SQLModel, Field
+from typing import Optional
 from pydantic import BaseModel
 
 # ========== МОДЕЛЬ ДЛЯ БАЗЫ ДАННЫХ ==========
@@ -13,11 +12,7 @@ class User(SQLModel, table=True):
     username: Optional[str] = None
     current_language: Optional[str] = None
     
-    # ВАЖНО: Указываем sa_column с JSON для SQLite
-    learned_songs: List[int] = Field(
-        default_factory=list,
-        sa_column=Column(JSON)
-    )
+    # Изученные песни хранятся в таблице user_song_progress (models/progress.py)
 
 
     class Config:
@@ -0,0 +1,21 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from sqlalchemy import Index, UniqueConstraint
+
+class SongVocabulary(SQLModel, table=True):
+    """Обратный индекс словаря: нормализованное слово -> песня"""
+    __tablename__ = "song_vocabulary"
+    __table_args__ = (
+        UniqueConstraint("song_id", "word_key", name="uq_song_vocabulary_song_word"),
+        Index("ix_song_vocabulary_word_key_language_id", "word_key", "language_id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    song_id: int = Field(foreign_key="song.id", index=True)
+    # Слово без регистра и диакритики, по нему идет поиск
+    word_key: str
+    # Слово в исходном написании из Song.vocabulary
+    word: str
+    language: str
+    # Фильтр по языку идет по ID: коды и названия разрешаются каталогом
+    language_id: Optional[int] = Field(default=None, foreign_key="language.id")
@@ -1,7 +1,39 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
-from sqlmodel import Session, select
-from database.connection import get_session
-from pydantic import BaseModel
+import asyncio
+from fastapi import APIRouter, HTTPException, Query, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlmodel import select, func
+from sqlalchemy.exc import IntegrityError
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.connection import get_async_session, get_async_read_session
+from database.progress import delete_user_progress
+from database.reviews import delete_user_reviews
+from database.songs import delete_song
+from database.sessions import (
+    SESSION_COOKIE, resolve_session, delete_user_sessions, clear_session_cache
+)
+from database.backup import (
+    create_backup, list_backups, restore_backup, BackupBusyError, BACKUP_COMPRESS
+)
+from database.passwords import password_pool_stats
+from database.profiling import profiling_stats, reset_profiling_stats
+from database import stats, catalog
+from database.languages import find_language
+from database.vocabulary import index_song_vocabulary
+from database.admins import (
+    AdminPrincipal, get_admin_principal, invalidate_admin,
+    MANAGE_USERS, MANAGE_CONTENT, VIEW_STATS, BACKUP
+)
+from database.pagination import paginate, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from database.song_import import (
+    iter_ndjson_records, iter_csv_records, import_song_batch,
+    IMPORT_BATCH_ROWS, MAX_REPORTED_ERRORS, NDJSON, CSV
+)
+from database.exports import (
+    iter_user_batches, iter_progress_batches, encode_export, gzip_chunks,
+    USER_COLUMNS, PROGRESS_COLUMNS
+)
+from routes.caching import accepts_gzip
+from pydantic import BaseModel, ValidationError
 from typing import List, Optional
 
 from models.users import User
@@ -9,6 +41,7 @@ from models.songs import Song
 from models.languages import Language
 from models.artists import Artist
 from models.admins import Admin
+from models.progress import UserSongProgress
 
 admin_router = APIRouter(prefix="/admin", tags=["Администрирование"])
 
@@ -39,32 +72,44 @@ class ArtistCreate(BaseModel):
     bio: str
 
 # ========== ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ ==========
-def is_admin(email: str, session: Session) -> bool:
-    """Проверка, является ли пользователь админом"""
-    admin = session.exec(
-        select(Admin).where(Admin.user_email == email)
-    ).first()
-    return admin is not None
+def require_permission(permission: Optional[str] = None, fresh: bool = False):
+    """Зависимость: вошедший пользователь (cookie сессии) с правом permission.
+
+    Сессия и права берутся из кэша, поэтому при попадании запросов к базе нет.
+    fresh=True — для разрушительных операций и выгрузки всех данных:
+    сессия и права перечитываются из базы.
+    """
+    async def dependency(
+        request: Request,
+        session: AsyncSession = Depends(get_async_read_session)
+    ) -> AdminPrincipal:
+        user = await resolve_session(session, request.cookies.get(SESSION_COOKIE), fresh)
+        if user is None:
+            raise HTTPException(status_code=401, detail="Требуется вход в систему")
+        principal = await get_admin_principal(session, user.id, fresh)
+        if principal is None:
+            raise HTTPException(status_code=403, detail="Требуются права администратора")
+        if permission and not principal.has(permission):
+            raise HTTPException(status_code=403, detail=f"Недостаточно прав: {permission}")
+        return principal
+    return dependency
 
 # ========== УПРАВЛЕНИЕ ЯЗЫКАМИ ==========
 @admin_router.post("/language")
 async def add_language(
     language_data: LanguageCreate,
-    admin_email: str = Query(..., description="Email администратора"),
-    session: Session = Depends(get_session)
+    admin: AdminPrincipal = Depends(require_permission(MANAGE_CONTENT)),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Добавить новый язык"""
     
-    if not is_admin(admin_email, session):
-        raise HTTPException(status_code=403, detail="Требуются права администратора")
-    
     # Проверяем существование языка
-    existing_language = session.exec(
+    existing_language = (await session.exec(
         select(Language).where(
             (Language.code == language_data.code) | 
             (Language.name == language_data.name)
         )
-    ).first()
+    )).first()
     
     if existing_language:
         raise HTTPException(
@@ -75,8 +120,10 @@ async def add_language(
     # Создаем новый язык
     new_language = Language(**language_data.dict())
     session.add(new_language)
-    session.commit()
-    session.refresh(new_language)
+    await session.run_sync(stats.bump, stats.LANGUAGES, 1)
+    await session.commit()
+    catalog.invalidate()
+    await session.refresh(new_language)
     
     return {
         "success": True,
@@ -87,35 +134,37 @@ async def add_language(
 @admin_router.delete("/language/{language_id}")
 async def delete_language_admin(
     language_id: int,
-    admin_email: str = Query(..., description="Email администратора"),
-    session: Session = Depends(get_session)
+    admin: AdminPrincipal = Depends(require_permission(MANAGE_CONTENT)),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Удалить язык"""
     
-    if not is_admin(admin_email, session):
-        raise HTTPException(status_code=403, detail="Требуются права администратора")
-    
-    language = session.get(Language, language_id)
+    language = await session.get(Language, language_id)
     if not language:
         raise HTTPException(status_code=404, detail="Язык не найден")
     
-    # Проверяем, есть ли песни на этом языке
-    songs_on_language = session.exec(
-        select(Song).where(Song.language == language.name)
-    ).all()
+    # Проверяем, есть ли песни на этом языке (по индексу song.language_id)
+    songs_count = (await session.exec(
+        select(func.count()).select_from(Song).where(Song.language_id == language.id)
+    )).one()
     
-    if songs_on_language:
+    if songs_count:
+        song_titles = (await session.exec(
+            select(Song.title).where(Song.language_id == language.id).limit(5)
+        )).all()
         raise HTTPException(
             status_code=400,
             detail={
-                "error": f"Нельзя удалить язык. Есть {len(songs_on_language)} песен на языке '{language.name}'",
-                "songs_count": len(songs_on_language),
-                "songs": [song.title for song in songs_on_language[:5]]
+                "error": f"Нельзя удалить язык. Есть {songs_count} песен на языке '{language.name}'",
+                "songs_count": songs_count,
+                "songs": list(song_titles)
             }
         )
     
-    session.delete(language)
-    session.commit()
+    await session.delete(language)
+    await session.run_sync(stats.bump, stats.LANGUAGES, -1)
+    await session.commit()
+    catalog.invalidate()
     
     return {
         "success": True,
@@ -127,21 +176,18 @@ async def delete_language_admin(
 @admin_router.post("/song")
 async def add_song(
     song_data: SongCreate,
-    admin_email: str = Query(..., description="Email администратора"),
-    session: Session = Depends(get_session)
+    admin: AdminPrincipal = Depends(require_permission(MANAGE_CONTENT)),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Добавить новую песню"""
     
-    if not is_admin(admin_email, session):
-        raise HTTPException(status_code=403, detail="Требуются права администратора")
-    
     # Проверяем, существует ли уже песня с таким названием и исполнителем
-    existing_song = session.exec(
+    existing_song = (await session.exec(
         select(Song).where(
             (Song.title == song_data.title) & 
             (Song.artist == song_data.artist)
         )
-    ).first()
+    )).first()
     
     if existing_song:
         raise HTTPException(
@@ -151,9 +197,29 @@ async def add_song(
     
     # Создаем новую песню
     new_song = Song(**song_data.dict())
-    session.add(new_song)
-    session.commit()
-    session.refresh(new_song)
+    # Язык может быть задан кодом или любым названием — приводим к каноническому
+    language = await session.run_sync(find_language, new_song.language)
+    if not language:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Неизвестный язык '{new_song.language}'"
+        )
+    new_song.language, new_song.language_id = language.name, language.id
+    
+    try:
+        session.add(new_song)
+        await session.run_sync(stats.bump_song, new_song.language, new_song.difficulty, 1)
+        await session.run_sync(index_song_vocabulary, new_song)
+        await session.commit()
+    except IntegrityError:
+        # Уникальный индекс (title, artist): такую песню уже добавили
+        await session.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Песня с таким названием и исполнителем уже существует"
+        )
+    catalog.invalidate()
+    await session.refresh(new_song)
     
     return {
         "success": True,
@@ -164,60 +230,69 @@ async def add_song(
 @admin_router.delete("/song/{song_id}")
 async def delete_song_admin(
     song_id: int,
-    admin_email: str = Query(..., description="Email администратора"),
-    session: Session = Depends(get_session)
+    admin: AdminPrincipal = Depends(require_permission(MANAGE_CONTENT)),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Удалить песню"""
     
-    if not is_admin(admin_email, session):
-        raise HTTPException(status_code=403, detail="Требуются права администратора")
-    
-    song = session.get(Song, song_id)
-    if not song:
+    deleted = await session.run_sync(delete_song, song_id)
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Песня не найдена")
-    
-    # Удаляем песню из избранного и изученных у всех пользователей
-    users = session.exec(select(User)).all()
-    for user in users:
-        if song_id in (user.learned_songs or []):
-            user.learned_songs.remove(song_id)
-        if song_id in (user.favorite_songs or []):
-            user.favorite_songs.remove(song_id)
-        session.add(user)
-    
-    session.delete(song)
-    session.commit()
+    await session.commit()
+    catalog.invalidate()
     
     return {
         "success": True,
-        "message": f"Песня '{song.title}' удалена",
-        "song_id": song_id
+        "message": f"Песня '{deleted['title']}' удалена",
+        "song_id": song_id,
+        "progress_removed": deleted["progress_removed"]
     }
 
 @admin_router.put("/song/{song_id}")
 async def update_song_admin(
     song_id: int,
     song_update: SongCreate,
-    admin_email: str = Query(..., description="Email администратора"),
-    session: Session = Depends(get_session)
+    admin: AdminPrincipal = Depends(require_permission(MANAGE_CONTENT)),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Обновить песню"""
     
-    if not is_admin(admin_email, session):
-        raise HTTPException(status_code=403, detail="Требуются права администратора")
-    
-    song = session.get(Song, song_id)
+    song = await session.get(Song, song_id)
     if not song:
         raise HTTPException(status_code=404, detail="Песня не найдена")
     
-    # Обновляем поля
+    # Язык может быть задан кодом или любым названием — приводим к каноническому.
+    # Ищем до изменения полей: иначе autoflush отправит незавершенное
+    # обновление в базу раньше времени
     update_data = song_update.dict(exclude_unset=True)
+    language_name = update_data.get("language", song.language)
+    language = await session.run_sync(find_language, language_name)
+    if not language:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Неизвестный язык '{language_name}'"
+        )
+    
+    # Обновляем поля
+    old_language, old_difficulty = song.language, song.difficulty
     for field, value in update_data.items():
         setattr(song, field, value)
-    
-    session.add(song)
-    session.commit()
-    session.refresh(song)
+    song.language, song.language_id = language.name, language.id
+    
+    try:
+        session.add(song)
+        await session.run_sync(stats.move_song, old_language, old_difficulty, song.language, song.difficulty)
+        await session.run_sync(index_song_vocabulary, song)
+        await session.commit()
+    except IntegrityError:
+        # Уникальный индекс (title, artist): такую песню уже добавили
+        await session.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Песня с таким названием и исполнителем уже существует"
+        )
+    catalog.invalidate()
+    await session.refresh(song)
     
     return {
         "success": True,
@@ -225,56 +300,188 @@ async def update_song_admin(
         "song": song
     }
 
+@admin_router.post("/songs/bulk")
+async def bulk_import_songs(
+    request: Request,
+    format: Optional[str] = Query(None, description="ndjson или csv (по умолчанию по Content-Type)"),
+    admin: AdminPrincipal = Depends(require_permission(MANAGE_CONTENT, fresh=True)),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Массовый импорт песен из NDJSON или CSV (тело читается потоком).
+
+    Каждая строка проверяется как SongCreate, дубликаты (title, artist)
+    пропускаются, песни пишутся пачками по IMPORT_BATCH_ROWS — каждая
+    пачка в своей транзакции. Ошибки возвращаются с номерами строк.
+    """
+    content_type = request.headers.get("content-type", "")
+    import_format = (format or (CSV if "csv" in content_type else NDJSON)).lower()
+    if import_format not in (NDJSON, CSV):
+        raise HTTPException(status_code=400, detail="Формат должен быть ndjson или csv")
+    records = iter_csv_records if import_format == CSV else iter_ndjson_records
+
+    index = await catalog.get_catalog(session)
+    # Снимок каталога не меняется во время импорта, читаем языки из него
+    await session.commit()
+
+    seen = set()
+    report = {"rows": 0, "imported": 0, "duplicates": 0, "errors_total": 0}
+    errors = []
+    duplicate_lines = []
+
+    def add_error(line_no: int, error: str):
+        report["errors_total"] += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"line": line_no, "error": error})
+
+    async def flush(batch):
+        try:
+            result = await session.run_sync(import_song_batch, batch, index.resolve_language, seen)
+            await session.commit()
+        except IntegrityError:
+            # Ту же песню успели добавить параллельно: повторная проверка
+            # уже увидит ее в базе и посчитает дубликатом
+            await session.rollback()
+            result = await session.run_sync(import_song_batch, batch, index.resolve_language, seen)
+            await session.commit()
+        report["imported"] += len(result["inserted"])
+        report["duplicates"] += len(result["duplicates"])
+        if len(duplicate_lines) < MAX_REPORTED_ERRORS:
+            duplicate_lines.extend(result["duplicates"][:MAX_REPORTED_ERRORS - len(duplicate_lines)])
+        for error in result["errors"]:
+            add_error(error["line"], error["error"])
+
+    batch = []
+    async for line_no, record, error in records(request.stream()):
+        report["rows"] += 1
+        if error:
+            add_error(line_no, error)
+            continue
+        try:
+            song_data = SongCreate(**record)
+        except ValidationError as e:
+            add_error(line_no, "; ".join(
+                f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+                for item in e.errors()
+            ))
+            continue
+        batch.append((line_no, song_data.dict()))
+        if len(batch) >= IMPORT_BATCH_ROWS:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+
+    if report["imported"]:
+        catalog.invalidate()
+    # Ошибки языка приходят при записи пачки — возвращаем в порядке строк
+    errors.sort(key=lambda error: error["line"])
+
+    return {
+        "success": report["errors_total"] == 0,
+        "format": import_format,
+        **report,
+        "duplicate_lines": duplicate_lines,
+        "errors": errors
+    }
+
 # ========== УПРАВЛЕНИЕ ПОЛЬЗОВАТЕЛЯМИ ==========
 @admin_router.get("/users")
 async def get_users(
-    admin_email: str = Query(..., description="Email администратора"),
-    session: Session = Depends(get_session)
+    admin: AdminPrincipal = Depends(require_permission(MANAGE_USERS)),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = Query(None, description="ID последнего пользователя предыдущей страницы"),
+    session: AsyncSession = Depends(get_async_read_session)
 ):
-    """Получить список пользователей"""
+    """Получить список пользователей (постранично, по возрастанию ID)"""
     
-    if not is_admin(admin_email, session):
-        raise HTTPException(status_code=403, detail="Требуются права администратора")
+    users, next_cursor = await session.run_sync(paginate, select(User), User.id, limit, after)
     
-    users = session.exec(select(User)).all()
+    # Изученные песни пользователей страницы одним запросом
+    learned_by_user = {}
+    progress_rows = (await session.exec(
+        select(UserSongProgress.user_id, UserSongProgress.song_id)
+        .where(UserSongProgress.user_id.in_([user.id for user in users]))
+        .order_by(UserSongProgress.user_id, UserSongProgress.learned_at, UserSongProgress.id)
+    )).all()
+    for user_id, song_id in progress_rows:
+        learned_by_user.setdefault(user_id, []).append(song_id)
     
     users_list = []
     for user in users:
+        learned_songs = learned_by_user.get(user.id, [])
         user_data = {
             "id": user.id,
             "email": user.email,
             "full_name": user.full_name,
             "username": user.username,
             "current_language": user.current_language,
-            "learned_songs_count": len(user.learned_songs) if user.learned_songs else 0,
-            # УБИРАЕМ favorite_songs_count - этого поля больше нет
-            "learned_songs": user.learned_songs or [],
-            # УБИРАЕМ favorite_songs - этого поля больше нет
+            "learned_songs_count": len(learned_songs),
+            "learned_songs": learned_songs,
         }
         users_list.append(user_data)
     
     return {
         "success": True,
-        "total_users": len(users_list),
+        "total_users": (await session.run_sync(stats.get_stats))[stats.USERS],
+        "count": len(users_list),
+        "next_cursor": next_cursor,
         "users": users_list
     }
+
+# ========== ЭКСПОРТ ==========
+def export_response(request: Request, batches, columns, export_format: str, name: str) -> StreamingResponse:
+    """Потоковый ответ: строки читаются и кодируются по мере отправки"""
+    export_format = export_format.lower()
+    if export_format not in (NDJSON, CSV):
+        raise HTTPException(status_code=400, detail="Формат должен быть ndjson или csv")
+
+    chunks = encode_export(batches, columns, export_format)
+    headers = {
+        "Content-Disposition": f'attachment; filename="{name}.{export_format}"',
+        "Vary": "Accept-Encoding"
+    }
+    if accepts_gzip(request):
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    media_type = "text/csv; charset=utf-8" if export_format == CSV else "application/x-ndjson"
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+@admin_router.get("/export/users")
+async def export_users(
+    request: Request,
+    format: str = Query(NDJSON, description="ndjson или csv"),
+    admin: AdminPrincipal = Depends(require_permission(MANAGE_USERS, fresh=True))
+):
+    """Выгрузить всех пользователей с изученными песнями (потоком)"""
+    return export_response(request, iter_user_batches(), USER_COLUMNS, format, "users")
+
+@admin_router.get("/export/progress")
+async def export_progress(
+    request: Request,
+    format: str = Query(NDJSON, description="ndjson или csv"),
+    admin: AdminPrincipal = Depends(require_permission(MANAGE_USERS, fresh=True))
+):
+    """Выгрузить все отметки "изучено" (потоком)"""
+    return export_response(request, iter_progress_batches(), PROGRESS_COLUMNS, format, "progress")
+
 @admin_router.delete("/user/{user_id}")
 async def delete_user_admin(
     user_id: int,
-    admin_email: str = Query(..., description="Email администратора"),
-    session: Session = Depends(get_session)
+    admin: AdminPrincipal = Depends(require_permission(MANAGE_USERS)),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Удалить пользователя"""
     
-    if not is_admin(admin_email, session):
-        raise HTTPException(status_code=403, detail="Требуются права администратора")
-    
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Пользователь не найден")
     
-    session.delete(user)
-    session.commit()
+    await session.run_sync(delete_user_progress, user.id)
+    await session.run_sync(delete_user_reviews, user.id)
+    await session.run_sync(delete_user_sessions, user.id)
+    await session.delete(user)
+    await session.run_sync(stats.bump, stats.USERS, -1)
+    await session.commit()
     
     return {
         "success": True,
@@ -285,22 +492,19 @@ async def delete_user_admin(
 @admin_router.put("/user/{user_id}/admin")
 async def make_user_admin(
     user_id: int,
-    admin_email: str = Query(..., description="Email администратора"),
-    session: Session = Depends(get_session)
+    admin: AdminPrincipal = Depends(require_permission(MANAGE_USERS)),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Сделать пользователя администратором"""
     
-    if not is_admin(admin_email, session):
-        raise HTTPException(status_code=403, detail="Требуются права администратора")
-    
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Пользователь не найден")
     
     # Проверяем, не является ли уже администратором
-    existing_admin = session.exec(
+    existing_admin = (await session.exec(
         select(Admin).where(Admin.user_email == user.email)
-    ).first()
+    )).first()
     
     if existing_admin:
         raise HTTPException(
@@ -321,7 +525,8 @@ async def make_user_admin(
     )
     
     session.add(new_admin)
-    session.commit()
+    await session.commit()
+    invalidate_admin(user.id)
     
     return {
         "success": True,
@@ -332,36 +537,16 @@ async def make_user_admin(
 # ========== СТАТИСТИКА ==========
 @admin_router.get("/stats")
 async def get_admin_stats(
-    admin_email: str = Query(..., description="Email администратора"),
-    session: Session = Depends(get_session)
+    admin: AdminPrincipal = Depends(require_permission(VIEW_STATS)),
+    session: AsyncSession = Depends(get_async_read_session)
 ):
     """Получить статистику системы"""
     
-    if not is_admin(admin_email, session):
-        raise HTTPException(status_code=403, detail="Требуются права администратора")
-    
-    # Подсчеты
-    total_users = session.exec(select(User)).count()
-    total_songs = session.exec(select(Song)).count()
-    total_artists = session.exec(select(Artist)).count()
-    total_languages = session.exec(select(Language)).count()
-    
-    # Пользователи с прогрессом
-    users_with_progress = 0
-    total_learned_songs = 0
-    
-    users = session.exec(select(User)).all()
-    for user in users:
-        if user.learned_songs:
-            users_with_progress += 1
-            total_learned_songs += len(user.learned_songs)
-    
-    # Языки с количеством песен
-    songs = session.exec(select(Song)).all()
-    songs_by_language = {}
-    for song in songs:
-        lang = song.language
-        songs_by_language[lang] = songs_by_language.get(lang, 0) + 1
+    # Счетчики поддерживаются при записи, здесь только чтение
+    counters = await session.run_sync(stats.get_stats)
+    total_users = counters[stats.USERS]
+    users_with_progress = counters[stats.USERS_WITH_PROGRESS]
+    total_learned_songs = counters[stats.LEARNED_SONGS]
     
     return {
         "success": True,
@@ -372,14 +557,75 @@ async def get_admin_stats(
                 "progress_percentage": round((users_with_progress / total_users * 100), 2) if total_users > 0 else 0
             },
             "content": {
-                "songs": total_songs,
-                "artists": total_artists,
-                "languages": total_languages
+                "songs": counters[stats.SONGS],
+                "artists": counters[stats.ARTISTS],
+                "languages": counters[stats.LANGUAGES]
             },
             "learning": {
                 "total_learned_songs": total_learned_songs,
                 "average_songs_per_user": round(total_learned_songs / total_users, 2) if total_users > 0 else 0
             },
-            "songs_by_language": songs_by_language
+            "songs_by_language": counters[stats.SONGS_BY_LANGUAGE],
+            "songs_by_difficulty": counters[stats.SONGS_BY_DIFFICULTY],
+            # Очередь пула хэширования паролей (этого процесса)
+            "password_hashing": password_pool_stats()
         }
-    }
\ No newline at end of file
+    }
+
+@admin_router.get("/profiling")
+async def get_profiling_stats(
+    admin: AdminPrincipal = Depends(require_permission(VIEW_STATS))
+):
+    """Агрегаты по эндпоинтам за последние запросы и журнал медленных запросов"""
+    return {"success": True, **profiling_stats()}
+
+@admin_router.delete("/profiling")
+async def reset_profiling(
+    admin: AdminPrincipal = Depends(require_permission(VIEW_STATS))
+):
+    """Сбросить накопленные агрегаты (например, перед замером)"""
+    reset_profiling_stats()
+    return {"success": True, "message": "Статистика профилирования сброшена"}
+
+# ========== РЕЗЕРВНЫЕ КОПИИ ==========
+@admin_router.post("/backup")
+async def create_database_backup(
+    compress: bool = Query(BACKUP_COMPRESS, description="Сжать копию gzip"),
+    admin: AdminPrincipal = Depends(require_permission(BACKUP, fresh=True))
+):
+    """Снять резервную копию базы (online backup API, без остановки приложения)"""
+    try:
+        # Копирование синхронное и долгое: в отдельном потоке, event loop свободен
+        backup = await asyncio.to_thread(create_backup, compress)
+    except BackupBusyError as error:
+        raise HTTPException(status_code=409, detail=str(error))
+    return {"success": True, "backup": backup}
+
+@admin_router.get("/backups")
+async def get_database_backups(
+    admin: AdminPrincipal = Depends(require_permission(BACKUP))
+):
+    """Список резервных копий, новые первыми"""
+    backups = list_backups()
+    return {"success": True, "count": len(backups), "backups": backups}
+
+@admin_router.post("/backups/{name}/restore")
+async def restore_database_backup(
+    name: str,
+    admin: AdminPrincipal = Depends(require_permission(BACKUP, fresh=True))
+):
+    """Восстановить базу из копии (текущая база сохраняется отдельной копией)"""
+    try:
+        result = await asyncio.to_thread(restore_backup, name)
+    except FileNotFoundError as error:
+        raise HTTPException(status_code=404, detail=str(error))
+    except BackupBusyError as error:
+        raise HTTPException(status_code=409, detail=str(error))
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+
+    # Данные в базе сменились целиком: сбрасываем все кэши процесса
+    catalog.invalidate()
+    invalidate_admin()
+    clear_session_cache()
+    return {"success": True, **result}
@@ -1,6 +1,13 @@
 from fastapi import APIRouter, HTTPException, status, Depends
-from sqlmodel import Session, select
-from database.connection import get_session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.connection import get_async_session, get_async_read_session
+from database.progress import get_learned_song_ids
+from database import stats
+from database.passwords import (
+    hash_password, hash_released, verify_released, needs_rehash
+)
+from database.sessions import delete_user_sessions, invalidate_user_sessions
 from models.users import User
 from pydantic import BaseModel
 from typing import Optional
@@ -28,14 +35,14 @@ class PasswordChangeModel(BaseModel):
 @auth_router.post("/signup")
 async def sign_new_user(
     user_data: User, 
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ) -> dict:
     """Регистрация нового пользователя через API"""
     
     # Проверяем существование пользователя
-    existing_user = session.exec(
+    existing_user = (await session.exec(
         select(User).where(User.email == user_data.email)
-    ).first()
+    )).first()
     
     if existing_user:
         raise HTTPException(
@@ -46,17 +53,16 @@ async def sign_new_user(
     # Создаем нового пользователя
     new_user = User(
         email=user_data.email,
-        password=user_data.password,
+        password=await hash_released(session, user_data.password),
         full_name=user_data.full_name,
         username=user_data.username,
-        current_language=user_data.current_language,
-        learned_songs=user_data.learned_songs or [],
-        favorite_songs=user_data.favorite_songs or []
+        current_language=user_data.current_language
     )
     
     session.add(new_user)
-    session.commit()
-    session.refresh(new_user)
+    await session.run_sync(stats.bump, stats.USERS, 1)
+    await session.commit()
+    await session.refresh(new_user)
     
     return {
         "message": "Пользователь успешно зарегистрирован!",
@@ -67,14 +73,14 @@ async def sign_new_user(
 @auth_router.post("/signin")
 async def sign_user_in(
     user: UserSignIn,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ) -> dict:
     """Вход пользователя через API"""
     
     # Ищем пользователя
-    db_user = session.exec(
+    db_user = (await session.exec(
         select(User).where(User.email == user.email)
-    ).first()
+    )).first()
     
     if not db_user:
         raise HTTPException(
@@ -82,12 +88,18 @@ async def sign_user_in(
             detail="Пользователь не найден"
         )
     
-    if db_user.password != user.password:
+    if not await verify_released(session, user.password, db_user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверный пароль"
         )
     
+    # Старые пароли (открытый текст, прежние параметры) перехэшируем при входе
+    if needs_rehash(db_user.password):
+        db_user.password = await hash_password(user.password)
+        session.add(db_user)
+        await session.commit()
+    
     return {
         "message": "Успешный вход в систему",
         "email": db_user.email,
@@ -100,13 +112,13 @@ async def sign_user_in(
 async def change_password(
     email: str,
     password_data: PasswordChangeModel,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ) -> dict:
     """Смена пароля через API"""
     
-    user = session.exec(
+    user = (await session.exec(
         select(User).where(User.email == email)
-    ).first()
+    )).first()
     
     if not user:
         raise HTTPException(
@@ -115,7 +127,7 @@ async def change_password(
         )
     
     # Проверяем текущий пароль
-    if user.password != password_data.current_password:
+    if not await verify_released(session, password_data.current_password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверный текущий пароль"
@@ -128,11 +140,12 @@ async def change_password(
             detail="Новый пароль должен содержать минимум 6 символов"
         )
     
-    # Меняем пароль
-    user.password = password_data.new_password
+    # Меняем пароль; все сессии со старым паролем завершаются
+    user.password = await hash_password(password_data.new_password)
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await session.run_sync(delete_user_sessions, user.id)
+    await session.commit()
+    await session.refresh(user)
     
     return {
         "success": True,
@@ -143,13 +156,13 @@ async def change_password(
 @auth_router.get("/user/{email}")
 async def get_user_info(
     email: str,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_read_session)
 ) -> dict:
     """Получение информации о пользователе через API"""
     
-    user = session.exec(
+    user = (await session.exec(
         select(User).where(User.email == email)
-    ).first()
+    )).first()
     
     if not user:
         raise HTTPException(
@@ -162,8 +175,7 @@ async def get_user_info(
         "full_name": user.full_name,
         "username": user.username,
         "current_language": user.current_language,
-        "learned_songs": user.learned_songs or [],
-        "favorite_songs": user.favorite_songs or [],
+        "learned_songs": await session.run_sync(get_learned_song_ids, user.id),
         "user_id": user.id
     }
 
@@ -171,13 +183,13 @@ async def get_user_info(
 async def update_user_info(
     email: str, 
     user_data: UserUpdateModel,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ) -> dict:
     """Обновление информации о пользователе через API"""
     
-    user = session.exec(
+    user = (await session.exec(
         select(User).where(User.email == email)
-    ).first()
+    )).first()
     
     if not user:
         raise HTTPException(
@@ -194,8 +206,10 @@ async def update_user_info(
         user.current_language = user_data.current_language
     
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await session.commit()
+    # Закэшированный с сессией профиль устарел
+    invalidate_user_sessions(user.id)
+    await session.refresh(user)
     
     return {
         "success": True,
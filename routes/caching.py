@@ -0,0 +1,186 @@
+import gzip
+import hashlib
+import os
+from collections import OrderedDict
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, Hashable, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from database.catalog import CatalogIndex
+
+# Общие данные каталога: прокси может хранить, но обязан перепроверять
+PUBLIC_CACHE = "public, no-cache"
+# Страницы с данными пользователя (отметки "изучено") — только в браузере
+PRIVATE_CACHE = "private, no-cache"
+
+def catalog_cache_headers(
+    index: CatalogIndex,
+    cache_control: str = PUBLIC_CACHE,
+    variant: Optional[str] = None
+) -> dict:
+    """ETag, Last-Modified и Cache-Control для ответа по снимку каталога.
+
+    variant — то, от чего ответ зависит помимо каталога (например, пользователь).
+    """
+    # Ревизия из базы: ETag одинаков во всех воркерах и после перезапуска
+    tag = index.revision
+    if variant:
+        tag += "-" + hashlib.sha1(variant.encode()).hexdigest()[:12]
+    return {
+        "ETag": f'"{tag}"',
+        "Last-Modified": format_datetime(index.modified_at, usegmt=True),
+        "Cache-Control": cache_control
+    }
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # Для If-None-Match сравнение слабое: W/"x" совпадает с "x"
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+def not_modified(request: Request, headers: dict) -> Optional[Response]:
+    """Ответ 304, если у клиента уже актуальная версия, иначе None"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Если есть If-None-Match, If-Modified-Since не учитывается (RFC 9110)
+        fresh = _etag_matches(if_none_match, headers["ETag"])
+    else:
+        fresh = False
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+                fresh = parsedate_to_datetime(headers["Last-Modified"]) <= since
+            except (TypeError, ValueError):
+                fresh = False
+
+    if fresh:
+        return Response(status_code=304, headers=headers)
+    return None
+
+# ========== КЭШ ГОТОВЫХ ОТВЕТОВ ==========
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("LINGUATUNE_RESPONSE_CACHE_ENTRIES", "256"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("LINGUATUNE_RESPONSE_CACHE_BYTES", str(32 * 1024 * 1024)))
+# Маленькие ответы сжимать невыгодно
+GZIP_MIN_SIZE = 1024
+
+class CachedBody:
+    __slots__ = ("body", "gzipped", "size")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.gzipped = gzip.compress(body, compresslevel=6, mtime=0) if len(body) >= GZIP_MIN_SIZE else None
+        self.size = len(body) + (len(self.gzipped) if self.gzipped else 0)
+
+class ResponseCache:
+    """LRU-кэш уже сериализованных JSON-ответов для одной ревизии каталога.
+
+    При первом обращении с более новой ревизией кэш очищается целиком,
+    так что после записи в каталог старые ответы не отдаются.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.version = None
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def _check_version(self, version: int) -> bool:
+        """Подготовить кэш к ревизии version; False — ревизия уже устарела"""
+        if self.version is None or version > self.version:
+            self.clear()
+            self.version = version
+        # Запрос, начатый до записи, не должен сбрасывать новые ответы
+        return version == self.version
+
+    def get(self, key: Hashable, version: int) -> Optional[CachedBody]:
+        if not self._check_version(version):
+            self.misses += 1
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Hashable, version: int, body: bytes) -> CachedBody:
+        entry = CachedBody(body)
+        # Слишком большой ответ не кэшируем, чтобы не вытеснить все остальное
+        if not self._check_version(version) or entry.size > self.max_bytes:
+            return entry
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size -= old.size
+        self._entries[key] = entry
+        self.size += entry.size
+        while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= evicted.size
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES)
+
+def accepts_gzip(request: Request) -> bool:
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() == "gzip":
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+def cached_json_response(
+    request: Request,
+    index: CatalogIndex,
+    key: Hashable,
+    build: Callable[[], object]
+) -> Response:
+    """JSON-ответ по снимку каталога: 304, готовые байты из кэша или build().
+
+    key должен однозначно определять ответ при данной ревизии каталога
+    (имя обработчика и значения параметров запроса).
+    """
+    use_gzip = accepts_gzip(request)
+    headers = catalog_cache_headers(index)
+    headers["Vary"] = "Accept-Encoding"
+
+    entry = response_cache.get(key, index.version)
+    if entry is None:
+        body = JSONResponse(jsonable_encoder(build())).body
+        entry = response_cache.put(key, index.version, body)
+
+    content = entry.body
+    if use_gzip and entry.gzipped is not None:
+        content = entry.gzipped
+        headers["Content-Encoding"] = "gzip"
+        # Сжатое и несжатое представления — разные байты, значит и разные strong ETag
+        headers["ETag"] = headers["ETag"][:-1] + '-gzip"'
+
+    cached = not_modified(request, headers)
+    if cached:
+        return cached
+    return Response(content=content, media_type="application/json", headers=headers)
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlmodel import Session, select
-from database.connection import get_session
-from models.languages import Language
+from fastapi import APIRouter, HTTPException, Depends, Request
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.connection import get_async_read_session
+from database import catalog
+from routes.caching import cached_json_response
 
 language_router = APIRouter(
     tags=["Языки"],
@@ -9,18 +10,24 @@ language_router = APIRouter(
 )
 
 @language_router.get("/")
-async def get_all_languages(session: Session = Depends(get_session)):
+async def get_all_languages(
+    request: Request,
+    session: AsyncSession = Depends(get_async_read_session)
+):
     """Получить все языки"""
-    languages = session.exec(select(Language)).all()
-    return languages
+    index = await catalog.get_catalog(session)
+    return cached_json_response(
+        request, index, "languages",
+        lambda: [lang.to_dict() for lang in index.languages]
+    )
 
 @language_router.get("/id/{language_id}")
 async def get_language_by_id(
     language_id: int,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_read_session)
 ):
     """Получить язык по ID"""
-    language = session.get(Language, language_id)
+    language = (await catalog.get_catalog(session)).get_language(language_id)
     
     if not language:
         raise HTTPException(
@@ -28,4 +35,4 @@ async def get_language_by_id(
             detail=f"Язык с ID {language_id} не найден"
         )
     
-    return language
\ No newline at end of file
+    return language.to_dict()
\ No newline at end of file
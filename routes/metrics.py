@@ -0,0 +1,125 @@
+import os
+import secrets
+import time
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+
+from database.metrics import Counter, Gauge, Histogram, CallbackMetric, render_metrics
+from database.profiling import current_profile, UNMATCHED_ROUTE
+from database.admins import principal_cache_stats
+from database.sessions import session_cache_stats
+from database.catalog import catalog_stats
+from database.passwords import password_pool
+from routes.caching import response_cache
+
+# Если задан, /metrics требует заголовок "Authorization: Bearer <токен>"
+METRICS_TOKEN = os.getenv("LINGUATUNE_METRICS_TOKEN")
+
+# ========== HTTP ==========
+HTTP_REQUESTS = Counter(
+    "linguatune_http_requests_total", "HTTP-запросы по шаблону маршрута и статусу",
+    ("method", "route", "status")
+)
+HTTP_DURATION = Histogram(
+    "linguatune_http_request_duration_seconds", "Время обработки HTTP-запроса",
+    ("method", "route")
+)
+HTTP_IN_PROGRESS = Gauge(
+    "linguatune_http_requests_in_progress", "HTTP-запросы, обрабатываемые сейчас"
+)
+HTTP_IN_PROGRESS.set(0)
+DB_QUERIES = Counter(
+    "linguatune_db_queries_total", "SQL-выражения, выполненные обработчиками",
+    ("method", "route")
+)
+DB_SECONDS = Counter(
+    "linguatune_db_query_seconds_total", "Время выполнения SQL в обработчиках",
+    ("method", "route")
+)
+
+class MetricsMiddleware:
+    """Счетчики и гистограммы по шаблону маршрута (чистый ASGI)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_PROGRESS.dec()
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            method = scope["method"]
+            HTTP_REQUESTS.inc(method, route, status)
+            HTTP_DURATION.observe(time.perf_counter() - started, method, route)
+            # Профиль запроса заводит RequestProfilingMiddleware
+            profile = current_profile()
+            if profile is not None:
+                DB_QUERIES.inc(method, route, amount=profile.queries)
+                DB_SECONDS.inc(method, route, amount=profile.db_seconds)
+
+# ========== КЭШИ И ПУЛ ХЭШИРОВАНИЯ ==========
+def _cache_values(field: str):
+    def collect():
+        catalog = catalog_stats()
+        values = {
+            "response": response_cache.stats(),
+            "admin_principal": principal_cache_stats(),
+            "session": session_cache_stats(),
+            # Перечитывание снимка каталога — это промах
+            "catalog": {"hits": catalog["hits"], "misses": catalog["loads"], "entries": 1}
+        }
+        return {(name,): stats[field] for name, stats in values.items()}
+    return collect
+
+CallbackMetric(
+    "linguatune_cache_hits_total", "Попадания в кэши процесса",
+    "counter", ("cache",), _cache_values("hits")
+)
+CallbackMetric(
+    "linguatune_cache_misses_total", "Промахи кэшей процесса",
+    "counter", ("cache",), _cache_values("misses")
+)
+CallbackMetric(
+    "linguatune_cache_entries", "Записей в кэше",
+    "gauge", ("cache",), _cache_values("entries")
+)
+CallbackMetric(
+    "linguatune_password_hash_total", "Выполнено хэширований и проверок паролей",
+    "counter", (), lambda: {(): password_pool.completed}
+)
+CallbackMetric(
+    "linguatune_password_hash_wait_seconds_total", "Время ожидания свободного потока хэширования",
+    "counter", (), lambda: {(): password_pool.wait_seconds}
+)
+CallbackMetric(
+    "linguatune_password_hash_queue", "Операции с паролями в очереди пула",
+    "gauge", ("state",), lambda: {("waiting",): password_pool.waiting, ("pending",): password_pool.pending}
+)
+
+# ========== ЭНДПОИНТ ==========
+metrics_router = APIRouter(tags=["Метрики"])
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics(request: Request):
+    """Метрики процесса в формате Prometheus"""
+    if METRICS_TOKEN:
+        expected = f"Bearer {METRICS_TOKEN}"
+        if not secrets.compare_digest(request.headers.get("authorization", ""), expected):
+            raise HTTPException(status_code=401, detail="Неверный токен метрик")
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,12 +1,17 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import HTMLResponse
-from sqlmodel import Session, select
-from database.connection import get_session
-import models
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from sqlmodel import select
+from sqlalchemy.exc import IntegrityError
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.connection import get_async_session, get_async_read_session
+from database.songs import delete_song as delete_song_cascade
+from database import stats, catalog
+from database.languages import find_language
+from database.vocabulary import index_song_vocabulary, find_songs_by_word, find_words_by_prefix
+from database.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from database.search import search_songs
+from routes.caching import cached_json_response
 from models.songs import Song
-from models.artists import Artist
-from models.languages import Language
-from typing import List
+from typing import Optional
 
 music_router = APIRouter(
     tags=["Музыка"],
@@ -14,50 +19,118 @@ music_router = APIRouter(
 )
 
 @music_router.get("/songs")
-async def get_all_songs(session: Session = Depends(get_session)):
-    """Получить все песни"""
-    songs = session.exec(select(Song)).all()
-    return songs
+async def get_all_songs(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = Query(None, description="ID последней песни предыдущей страницы"),
+    session: AsyncSession = Depends(get_async_read_session)
+):
+    """Получить песни (постранично, по возрастанию ID)"""
+    index = await catalog.get_catalog(session)
+    
+    def build():
+        songs, next_cursor = index.page_songs(limit, after)
+        return {
+            "songs": [song.to_dict() for song in songs],
+            "count": len(songs),
+            "next_cursor": next_cursor
+        }
+    
+    return cached_json_response(request, index, ("songs", limit, after), build)
+
+async def resolve_language_filter(session: AsyncSession, language: Optional[str]) -> Optional[int]:
+    """ID языка для фильтра: код, русское или родное название (как /songs/{language})"""
+    if not language:
+        return None
+    language_record = (await catalog.get_catalog(session)).resolve_language(language)
+    if not language_record:
+        raise HTTPException(status_code=400, detail=f"Неизвестный язык '{language}'")
+    return language_record.id
+
+@music_router.get("/search")
+async def search_songs_endpoint(
+    q: str = Query(..., min_length=1, description="Слова из названия, исполнителя или текста"),
+    language: Optional[str] = Query(None, description="Фильтр по языку"),
+    difficulty: Optional[str] = Query(None, description="Фильтр по сложности"),
+    limit: int = Query(20, ge=1, le=100),
+    session: AsyncSession = Depends(get_async_read_session)
+):
+    """Полнотекстовый поиск песен (FTS5, ранжирование bm25)"""
+    language_id = await resolve_language_filter(session, language)
+    results = await session.run_sync(search_songs, q, language_id, difficulty, limit)
+    return {
+        "query": q,
+        "count": len(results),
+        "results": results
+    }
+
+@music_router.get("/vocabulary")
+async def get_vocabulary_words(
+    prefix: str = Query(..., min_length=1, description="Начало слова (регистр и диакритика не важны)"),
+    language: Optional[str] = Query(None, description="Фильтр по языку"),
+    limit: int = Query(20, ge=1, le=100),
+    session: AsyncSession = Depends(get_async_read_session)
+):
+    """Слова из словарей песен по префиксу (для автодополнения)"""
+    language_id = await resolve_language_filter(session, language)
+    words = await session.run_sync(find_words_by_prefix, prefix, language_id, limit)
+    return {
+        "prefix": prefix,
+        "count": len(words),
+        "words": words
+    }
+
+@music_router.get("/vocabulary/{word}")
+async def get_songs_by_word(
+    word: str,
+    language: Optional[str] = Query(None, description="Фильтр по языку"),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    session: AsyncSession = Depends(get_async_read_session)
+):
+    """Песни, в словаре которых есть слово"""
+    language_id = await resolve_language_filter(session, language)
+    songs = await session.run_sync(find_songs_by_word, word, language_id, limit)
+    return {
+        "word": word,
+        "count": len(songs),
+        "songs": songs
+    }
 
 @music_router.get("/songs/{language}")
 async def get_songs_by_language(
     language: str,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_read_session)
 ):
     """Получить песни по языку"""
     
-    songs = session.exec(
-        select(Song).where(Song.language.ilike(f"%{language}%"))
-    ).all()
+    index = await catalog.get_catalog(session)
+    language_record = index.resolve_language(language)
+    songs = index.songs_for_language(language_record.id) if language_record else []
     
     if not songs:
-        # Получаем все доступные языки
-        all_songs = session.exec(select(Song)).all()
-        available_languages = set(song.language for song in all_songs)
-        
         raise HTTPException(
             status_code=404,
             detail={
                 "error": f"Песни на языке '{language}' не найдены",
-                "available_languages": list(available_languages)
+                "available_languages": [lang.name for lang in index.languages]
             }
         )
     
-    return songs
+    return [song.to_dict() for song in songs]
 @music_router.post("/song")
 async def create_song(
     song: Song,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Создать новую песню"""
     
     # Проверяем, не существует ли уже песня с таким названием и исполнителем
-    existing = session.exec(
+    existing = (await session.exec(
         select(Song).where(
             (Song.title == song.title) & 
             (Song.artist == song.artist)
         )
-    ).first()
+    )).first()
     
     if existing:
         raise HTTPException(
@@ -65,9 +138,29 @@ async def create_song(
             detail="Песня с таким названием и исполнителем уже существует"
         )
     
-    session.add(song)
-    session.commit()
-    session.refresh(song)
+    # Язык может быть задан кодом или любым названием — приводим к каноническому
+    language = await session.run_sync(find_language, song.language)
+    if not language:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Неизвестный язык '{song.language}'"
+        )
+    song.language, song.language_id = language.name, language.id
+    
+    try:
+        session.add(song)
+        await session.run_sync(stats.bump_song, song.language, song.difficulty, 1)
+        await session.run_sync(index_song_vocabulary, song)
+        await session.commit()
+    except IntegrityError:
+        # Уникальный индекс (title, artist): такую песню уже добавили
+        await session.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Песня с таким названием и исполнителем уже существует"
+        )
+    catalog.invalidate()
+    await session.refresh(song)
     
     return {
         "message": "Песня успешно создана",
@@ -78,25 +171,49 @@ async def create_song(
 async def update_song(
     song_id: int,
     song_update: Song,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Обновить песню"""
     
-    song = session.get(Song, song_id)
+    song = await session.get(Song, song_id)
     if not song:
         raise HTTPException(
             status_code=404,
             detail=f"Песня с ID {song_id} не найдена"
         )
     
-    # Обновляем поля
+    # Язык может быть задан кодом или любым названием — приводим к каноническому.
+    # Ищем до изменения полей: иначе autoflush отправит незавершенное
+    # обновление в базу раньше времени
     update_data = song_update.dict(exclude_unset=True)
+    language_name = update_data.get("language", song.language)
+    language = await session.run_sync(find_language, language_name)
+    if not language:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Неизвестный язык '{language_name}'"
+        )
+    
+    # Обновляем поля
+    old_language, old_difficulty = song.language, song.difficulty
     for field, value in update_data.items():
         setattr(song, field, value)
+    song.language, song.language_id = language.name, language.id
     
-    session.add(song)
-    session.commit()
-    session.refresh(song)
+    try:
+        session.add(song)
+        await session.run_sync(stats.move_song, old_language, old_difficulty, song.language, song.difficulty)
+        await session.run_sync(index_song_vocabulary, song)
+        await session.commit()
+    except IntegrityError:
+        # Уникальный индекс (title, artist): такую песню уже добавили
+        await session.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Песня с таким названием и исполнителем уже существует"
+        )
+    catalog.invalidate()
+    await session.refresh(song)
     
     return {
         "message": "Песня успешно обновлена",
@@ -106,81 +223,39 @@ async def update_song(
 @music_router.delete("/song/{song_id}")
 async def delete_song(
     song_id: int,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Удалить песню"""
     
-    song = session.get(Song, song_id)
-    if not song:
+    deleted = await session.run_sync(delete_song_cascade, song_id)
+    if deleted is None:
         raise HTTPException(
             status_code=404,
             detail=f"Песня с ID {song_id} не найдена"
         )
-    
-    # Удаляем песню из избранного у всех пользователей
-    from models.users import User
-    users = session.exec(select(User)).all()
-    for user in users:
-        if song_id in (user.favorite_songs or []):
-            user.favorite_songs.remove(song_id)
-        if song_id in (user.learned_songs or []):
-            user.learned_songs.remove(song_id)
-        session.add(user)
-    
-    session.delete(song)
-    session.commit()
+    await session.commit()
+    catalog.invalidate()
     
     return {
-        "message": f"Песня '{song.title}' успешно удалена"
+        "message": f"Песня '{deleted['title']}' успешно удалена"
     }
-@music_router.get("/songs/{language}")
-async def get_songs_by_language(
-    language: str,
-    session: Session = Depends(get_session)
+
+@music_router.get("/artists")
+async def get_all_artists(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = Query(None, description="ID последнего исполнителя предыдущей страницы"),
+    session: AsyncSession = Depends(get_async_read_session)
 ):
-    """Получить песни по языку"""
+    """Получить исполнителей (постранично, по возрастанию ID)"""
+    index = await catalog.get_catalog(session)
     
-    print(f"🔍 Поиск песен на языке: '{language}'")
-    
-    # Получаем все песни
-    all_songs = session.exec(select(Song)).all()
-    print(f"Всего песен в базе: {len(all_songs)}")
-    
-    # Фильтруем песни по языку
-    # Приводим к нижнему регистру для case-insensitive поиска
-    language_lower = language.strip().lower()
-    
-    filtered_songs = []
-    for song in all_songs:
-        if song.language and song.language.lower() == language_lower:
-            filtered_songs.append(song)
-        # Также проверяем по коду языка (если нужно)
-        elif song.language and song.language.lower().startswith(language_lower):
-            filtered_songs.append(song)
-    
-    print(f"Найдено песен: {len(filtered_songs)}")
-    
-    if not filtered_songs:
-        # Получаем уникальные языки из всех песен
-        unique_languages = set()
-        for song in all_songs:
-            if song.language:
-                unique_languages.add(song.language.lower())
-        
-        print(f"Доступные языки: {sorted(unique_languages)}")
-        
-        raise HTTPException(
-            status_code=404,
-            detail={
-                "error": f"Песни на языке '{language}' не найдены",
-                "available_languages": sorted(list(unique_languages)),
-                "total_songs": len(all_songs)
-            }
-        )
+    def build():
+        artists, next_cursor = index.page_artists(limit, after)
+        return {
+            "artists": [artist.to_dict() for artist in artists],
+            "count": len(artists),
+            "next_cursor": next_cursor
+        }
     
-    return filtered_songs
-@music_router.get("/artists")
-async def get_all_artists(session: Session = Depends(get_session)):
-    """Получить всех исполнителей"""
-    artists = session.exec(select(Artist)).all()
-    return artists
\ No newline at end of file
+    return cached_json_response(request, index, ("artists", limit, after), build)
\ No newline at end of file
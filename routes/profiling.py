@@ -0,0 +1,48 @@
+import time
+
+from database.profiling import PROFILING_ENABLED, UNMATCHED_ROUTE, start_request, record_request
+
+class RequestProfilingMiddleware:
+    """Считает SQL-выражения и время каждого HTTP-запроса.
+
+    Итог отдается клиенту в заголовке Server-Timing и копится в агрегатах
+    по эндпоинтам (GET /admin/profiling). Чистый ASGI, без BaseHTTPMiddleware:
+    тот запускает обработчик в отдельной задаче, и профиль из ContextVar
+    до него бы не дошел.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not PROFILING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        profile = start_request()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                # Заголовки уходят до тела: время считаем на этот момент
+                app_ms = profile.elapsed() * 1000
+                db_ms = profile.db_seconds * 1000
+                timing = (
+                    f"app;dur={app_ms:.1f}, "
+                    f'db;dur={db_ms:.1f};desc="{profile.queries} queries, {profile.rows} rows"'
+                )
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timing.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            # Шаблон маршрута вместо пути: /music/songs/{song_id}, а не /music/songs/42.
+            # Несовпавшие пути — один ключ, иначе перебор случайных URL
+            # вытеснил бы настоящие эндпоинты из агрегатов
+            path = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            record_request(f"{scope['method']} {path}", status, profile, profile.elapsed())
@@ -1,8 +1,23 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlmodel import Session, select
-from database.connection import get_session
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.connection import get_async_session, get_async_read_session
+from database.loaders import load_songs_by_ids
+from database import stats, catalog
+from database.recommendations import (
+    get_song_word_matrix, recommend_songs, DEFAULT_LIMIT, MAX_LIMIT
+)
+from database.progress import (
+    get_learned_song_ids, count_learned_songs, mark_learned, unmark_learned
+)
+from database.reviews import (
+    get_due_reviews, count_due_reviews, next_due_at, answer_reviews,
+    DEFAULT_DUE_LIMIT, MAX_DUE_LIMIT
+)
 from models.users import User
 from models.songs import Song
+from models.reviews import ReviewAnswers
+from typing import Optional
 
 progress_router = APIRouter(
     tags=["Прогресс обучения"],
@@ -14,16 +29,16 @@ progress_router = APIRouter(
 async def mark_song_learned(
     email: str,
     song_id: int,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Отметить песню как изученную"""
     
     print(f"🔍 Отмечаем песню {song_id} для {email}")
     
     # 1. Находим пользователя
-    user = session.exec(
+    user = (await session.exec(
         select(User).where(User.email == email)
-    ).first()
+    )).first()
     
     if not user:
         print(f"❌ Пользователь {email} не найден")
@@ -33,13 +48,12 @@ async def mark_song_learned(
         )
     
     print(f"✅ Пользователь найден: {email}")
-    print(f"📊 Текущие изученные песни: {user.learned_songs}")
     
     # 2. Находим песню
-    song = session.get(Song, song_id)
+    song = await session.get(Song, song_id)
     
     if not song:
-        all_songs = session.exec(select(Song)).all()
+        all_songs = (await session.exec(select(Song))).all()
         available_ids = [s.id for s in all_songs if s.id is not None]
         
         print(f"❌ Песня {song_id} не найдена")
@@ -55,25 +69,21 @@ async def mark_song_learned(
     
     print(f"✅ Песня найдена: '{song.title}' (ID: {song.id})")
     
-    # 3. Работаем с learned_songs
-    # Создаем копию текущего списка или новый список
-    current_list = []
-    if user.learned_songs:
-        # Если learned_songs это список, используем его
-        if isinstance(user.learned_songs, list):
-            current_list = user.learned_songs.copy()
-        # Если это строка JSON, парсим
-        elif isinstance(user.learned_songs, str):
-            try:
-                import json
-                current_list = json.loads(user.learned_songs)
-            except:
-                current_list = []
-    
-    print(f"📊 Список после обработки: {current_list}")
-    
-    # 4. Проверяем, не изучена ли уже песня
-    if song_id in current_list:
+    # 3. Добавляем отметку (уникальный ключ user_id + song_id)
+    try:
+        inserted = await session.run_sync(mark_learned, user.id, song_id)
+        await session.commit()
+    except Exception as e:
+        print(f"❌ Ошибка при сохранении: {e}")
+        await session.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ошибка при сохранении: {str(e)}"
+        )
+    
+    learned_song_ids = await session.run_sync(get_learned_song_ids, user.id)
+    
+    if not inserted:
         print(f"ℹ️ Песня уже изучена")
         return {
             "status": "already_learned",
@@ -81,35 +91,10 @@ async def mark_song_learned(
             "email": email,
             "song_id": song_id,
             "song_title": song.title,
-            "total_learned": len(current_list)
+            "total_learned": len(learned_song_ids)
         }
     
-    # 5. Добавляем песню
-    current_list.append(song_id)
-    user.learned_songs = current_list  # Присваиваем новый список
-    
-    print(f"📊 Новый список для сохранения: {user.learned_songs}")
-    
-    # 6. Сохраняем
-    try:
-        session.add(user)
-        session.commit()
-        print(f"💾 Сохранено в БД")
-        
-        # Обновляем объект
-        session.refresh(user)
-        print(f"🔄 Объект обновлен")
-        
-        # Проверяем, что сохранилось
-        print(f"📊 После refresh: {user.learned_songs}")
-        
-    except Exception as e:
-        print(f"❌ Ошибка при сохранении: {e}")
-        session.rollback()
-        raise HTTPException(
-            status_code=500,
-            detail=f"Ошибка при сохранении: {str(e)}"
-        )
+    print(f"💾 Сохранено в БД")
     
     return {
         "status": "success",
@@ -119,21 +104,21 @@ async def mark_song_learned(
         "song_title": song.title,
         "artist": song.artist,
         "language": song.language,
-        "total_learned": len(user.learned_songs),
-        "learned_songs": user.learned_songs  # Показываем текущий список
+        "total_learned": len(learned_song_ids),
+        "learned_songs": learned_song_ids  # Показываем текущий список
     }
 
 @progress_router.delete("/user/{email}/learned/{song_id}")
 async def unmark_song_learned(
     email: str,
     song_id: int,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Убрать отметку 'изучено' с песни"""
     
-    user = session.exec(
+    user = (await session.exec(
         select(User).where(User.email == email)
-    ).first()
+    )).first()
     
     if not user:
         raise HTTPException(
@@ -141,49 +126,32 @@ async def unmark_song_learned(
             detail=f"Пользователь с email {email} не найден"
         )
     
-    # Работаем со списком
-    current_list = []
-    if user.learned_songs:
-        if isinstance(user.learned_songs, list):
-            current_list = user.learned_songs.copy()
-        elif isinstance(user.learned_songs, str):
-            try:
-                import json
-                current_list = json.loads(user.learned_songs)
-            except:
-                current_list = []
-    
-    if song_id not in current_list:
+    if not await session.run_sync(unmark_learned, user.id, song_id):
         raise HTTPException(
             status_code=400,
             detail=f"Песня с ID {song_id} не была изучена"
         )
     
-    current_list.remove(song_id)
-    user.learned_songs = current_list
-    
-    session.add(user)
-    session.commit()
-    session.refresh(user)
+    await session.commit()
     
     return {
         "status": "success",
         "message": f"Песня удалена из изученных",
         "email": email,
         "song_id": song_id,
-        "total_learned": len(user.learned_songs)
+        "total_learned": await session.run_sync(count_learned_songs, user.id)
     }
 
 @progress_router.get("/user/{email}")
 async def get_user_progress(
     email: str,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_read_session)
 ):
     """Получить прогресс пользователя"""
     
-    user = session.exec(
+    user = (await session.exec(
         select(User).where(User.email == email)
-    ).first()
+    )).first()
     
     if not user:
         raise HTTPException(
@@ -195,35 +163,22 @@ async def get_user_progress(
     learned_songs_details = []
     languages_learned = set()
     
-    # Обрабатываем список изученных песен
-    learned_song_ids = []
-    if user.learned_songs:
-        if isinstance(user.learned_songs, list):
-            learned_song_ids = user.learned_songs
-        elif isinstance(user.learned_songs, str):
-            try:
-                import json
-                learned_song_ids = json.loads(user.learned_songs)
-            except:
-                learned_song_ids = []
-    
-    # Получаем детали песен
-    for song_id in learned_song_ids:
-        song = session.get(Song, song_id)
-        if song:
-            learned_songs_details.append({
-                "id": song.id,
-                "title": song.title,
-                "artist": song.artist,
-                "language": song.language,
-                "difficulty": song.difficulty,
-                "duration": song.duration
-            })
-            languages_learned.add(song.language)
+    learned_song_ids = await session.run_sync(get_learned_song_ids, user.id)
+    
+    # Получаем детали песен одним запросом
+    for song in await session.run_sync(load_songs_by_ids, learned_song_ids):
+        learned_songs_details.append({
+            "id": song.id,
+            "title": song.title,
+            "artist": song.artist,
+            "language": song.language,
+            "difficulty": song.difficulty,
+            "duration": song.duration
+        })
+        languages_learned.add(song.language)
     
     # Общая статистика
-    all_songs = session.exec(select(Song)).all()
-    total_songs = len(all_songs)
+    total_songs = (await session.run_sync(stats.get_stats))[stats.SONGS]
     
     learned_count = len(learned_song_ids)
     percentage = round((learned_count / total_songs * 100), 2) if total_songs > 0 else 0
@@ -254,13 +209,13 @@ async def get_user_progress(
 @progress_router.get("/user/{email}/learned")
 async def get_user_learned_songs(
     email: str,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_read_session)
 ):
     """Получить изученные песни пользователя"""
     
-    user = session.exec(
+    user = (await session.exec(
         select(User).where(User.email == email)
-    ).first()
+    )).first()
     
     if not user:
         raise HTTPException(
@@ -268,25 +223,11 @@ async def get_user_learned_songs(
             detail=f"Пользователь с email {email} не найден"
         )
     
-    learned_songs = []
-    
     # Получаем список ID изученных песен
-    learned_song_ids = []
-    if user.learned_songs:
-        if isinstance(user.learned_songs, list):
-            learned_song_ids = user.learned_songs
-        elif isinstance(user.learned_songs, str):
-            try:
-                import json
-                learned_song_ids = json.loads(user.learned_songs)
-            except:
-                learned_song_ids = []
-    
-    # Получаем песни
-    for song_id in learned_song_ids:
-        song = session.get(Song, song_id)
-        if song:
-            learned_songs.append(song)
+    learned_song_ids = await session.run_sync(get_learned_song_ids, user.id)
+    
+    # Получаем песни одним запросом
+    learned_songs = await session.run_sync(load_songs_by_ids, learned_song_ids)
     
     return {
         "email": email,
@@ -295,37 +236,151 @@ async def get_user_learned_songs(
         "songs": learned_songs
     }
 
+# ========== РЕКОМЕНДАЦИИ ==========
+@progress_router.get("/user/{email}/recommendations")
+async def get_song_recommendations(
+    email: str,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    language: Optional[str] = Query(None, description="Только песни на этом языке (код или название)"),
+    session: AsyncSession = Depends(get_async_read_session)
+):
+    """Что изучать дальше: неизученные песни, похожие по словарю на изученные,
+    чуть сложнее текущего уровня и на языках пользователя"""
+    
+    user = (await session.exec(
+        select(User).where(User.email == email)
+    )).first()
+    
+    if not user:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Пользователь с email {email} не найден"
+        )
+    
+    learned_song_ids = await session.run_sync(get_learned_song_ids, user.id)
+    index = await catalog.get_catalog(session)
+    
+    language_id = None
+    if language:
+        language_record = index.resolve_language(language)
+        if not language_record:
+            raise HTTPException(status_code=400, detail=f"Неизвестный язык '{language}'")
+        language_id = language_record.id
+    current_language = index.resolve_language(user.current_language) if user.current_language else None
+    
+    matrix = await get_song_word_matrix(index)
+    result = recommend_songs(
+        index, matrix, learned_song_ids,
+        current_language_id=current_language.id if current_language else None,
+        language_id=language_id,
+        limit=limit
+    )
+    
+    return {
+        "email": email,
+        "learned_count": len(learned_song_ids),
+        "target_difficulty": result["target_difficulty"],
+        "known_words": result["known_words"],
+        "count": len(result["recommendations"]),
+        "recommendations": result["recommendations"]
+    }
+
+# ========== ПОВТОРЕНИЕ СЛОВ ==========
+@progress_router.get("/user/{email}/reviews/due")
+async def get_due_word_reviews(
+    email: str,
+    limit: int = Query(DEFAULT_DUE_LIMIT, ge=1, le=MAX_DUE_LIMIT),
+    session: AsyncSession = Depends(get_async_read_session)
+):
+    """Слова из изученных песен, которые пора повторить (самые просроченные первыми)"""
+    
+    user = (await session.exec(
+        select(User).where(User.email == email)
+    )).first()
+    
+    if not user:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Пользователь с email {email} не найден"
+        )
+    
+    reviews = await session.run_sync(get_due_reviews, user.id, limit)
+    # Полный подсчет нужен, только если очередь не уместилась в выборку
+    due_total = len(reviews)
+    if due_total == limit:
+        due_total = await session.run_sync(count_due_reviews, user.id)
+    next_due = None if reviews else await session.run_sync(next_due_at, user.id)
+    
+    return {
+        "email": email,
+        "due_total": due_total,
+        "count": len(reviews),
+        "next_due_at": next_due,
+        "reviews": [
+            {
+                "id": review.id,
+                "word": review.word,
+                "language": review.language,
+                "repetitions": review.repetitions,
+                "interval_days": review.interval_days,
+                "lapses": review.lapses,
+                "due_at": review.due_at,
+                "last_reviewed_at": review.last_reviewed_at
+            }
+            for review in reviews
+        ]
+    }
+
+@progress_router.post("/user/{email}/reviews")
+async def answer_word_reviews(
+    email: str,
+    data: ReviewAnswers,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Записать ответы на повторения пачкой, одной транзакцией"""
+    
+    user = (await session.exec(
+        select(User).where(User.email == email)
+    )).first()
+    
+    if not user:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Пользователь с email {email} не найден"
+        )
+    
+    updated, not_found = await session.run_sync(answer_reviews, user.id, data.answers)
+    await session.commit()
+    
+    return {
+        "email": email,
+        "updated": len(updated),
+        "not_found": not_found,
+        "reviews": [
+            {
+                "id": state["id"],
+                "word": state["word"],
+                "quality": state["quality"],
+                "ease_factor": state["ease_factor"],
+                "interval_days": state["interval_days"],
+                "repetitions": state["repetitions"],
+                "lapses": state["lapses"],
+                "due_at": state["due_at"]
+            }
+            for state in updated
+        ]
+    }
+
 # ========== СТАТИСТИКА ==========
 @progress_router.get("/stats/overall")
-async def get_overall_progress_stats(session: Session = Depends(get_session)):
+async def get_overall_progress_stats(session: AsyncSession = Depends(get_async_read_session)):
     """Статистика прогресса всех пользователей"""
     
-    users = session.exec(select(User)).all()
-    songs = session.exec(select(Song)).all()
-    
-    total_users = len(users)
-    total_songs = len(songs)
-    
-    total_learned = 0
-    users_with_progress = 0
-    
-    for user in users:
-        # Считаем изученные песни
-        learned_count = 0
-        if user.learned_songs:
-            if isinstance(user.learned_songs, list):
-                learned_count = len(user.learned_songs)
-            elif isinstance(user.learned_songs, str):
-                try:
-                    import json
-                    learned_list = json.loads(user.learned_songs)
-                    learned_count = len(learned_list) if isinstance(learned_list, list) else 0
-                except:
-                    learned_count = 0
-        
-        total_learned += learned_count
-        if learned_count > 0:
-            users_with_progress += 1
+    counters = await session.run_sync(stats.get_stats)
+    total_users = counters[stats.USERS]
+    total_songs = counters[stats.SONGS]
+    total_learned = counters[stats.LEARNED_SONGS]
+    users_with_progress = counters[stats.USERS_WITH_PROGRESS]
     
     return {
         "total_users": total_users,
@@ -0,0 +1,58 @@
+import os
+import sqlite3
+
+import pytest
+
+from database import backup
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    path = str(tmp_path / "linguatune.db")
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE song (id INTEGER PRIMARY KEY, title TEXT)")
+    connection.execute("INSERT INTO song (title) VALUES ('before')")
+    connection.commit()
+    connection.close()
+    monkeypatch.setattr(backup, "DB_PATH", path)
+    monkeypatch.setattr(backup, "BACKUP_DIR", str(tmp_path / "backups"))
+    return path
+
+def _titles(path):
+    connection = sqlite3.connect(path)
+    try:
+        return [row[0] for row in connection.execute("SELECT title FROM song ORDER BY id")]
+    finally:
+        connection.close()
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_restore_right_after_backup(database, monkeypatch, compress):
+    monkeypatch.setattr(backup, "BACKUP_COMPRESS", compress)
+    created = backup.create_backup(compress=compress, keep=0)
+
+    connection = sqlite3.connect(database)
+    connection.execute("INSERT INTO song (title) VALUES ('after')")
+    connection.commit()
+    connection.close()
+
+    # В ту же секунду: страховочная копия не должна затереть восстанавливаемую
+    result = backup.restore_backup(created["name"])
+
+    assert result["restored"] == created["name"]
+    assert result["safety_backup"] != created["name"]
+    assert _titles(database) == ["before"]
+    names = {item["name"] for item in backup.list_backups()}
+    assert names == {created["name"], result["safety_backup"]}
+
+def test_existing_backup_is_not_overwritten(database, monkeypatch):
+    os.makedirs(backup.BACKUP_DIR)
+    taken = os.path.join(backup.BACKUP_DIR, backup.BACKUP_PREFIX + "taken.db")
+    with open(taken, "wb") as file:
+        file.write(b"old")
+    monkeypatch.setattr(backup, "_backup_name", lambda compress: os.path.basename(taken))
+
+    with pytest.raises(FileExistsError):
+        backup.create_backup(compress=False, keep=0)
+    with open(taken, "rb") as file:
+        assert file.read() == b"old"
+    # Временные файлы убраны
+    assert os.listdir(backup.BACKUP_DIR) == [os.path.basename(taken)]